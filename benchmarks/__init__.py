@@ -0,0 +1,2 @@
+# Este arquivo faz do diretório 'benchmarks' um pacote Python.
+# Contém scripts de medição de desempenho, executados com 'python -m benchmarks.<nome>'.
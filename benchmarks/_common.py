@@ -0,0 +1,41 @@
+# benchmarks/_common.py
+
+import argparse
+import statistics
+import time
+
+
+def base_parser(description):
+    """
+    Parser de argumentos comum aos benchmarks.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--user-id', type=int, required=True,
+                        help='Usuário cujos dados serão consultados.')
+    parser.add_argument('--repeticoes', type=int, default=20,
+                        help='Número de execuções medidas (padrão: 20).')
+    return parser
+
+
+def measure(func, repeticoes):
+    """
+    Executa func uma vez para aquecimento e depois 'repeticoes' vezes,
+    retornando a lista de tempos em milissegundos.
+    """
+    func()
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        func()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return tempos
+
+
+def report(nome, tempos):
+    """
+    Imprime mediana, p95 e mínimo de uma série de tempos (ms).
+    """
+    ordenados = sorted(tempos)
+    p95 = ordenados[max(0, int(len(ordenados) * 0.95) - 1)]
+    print(f"{nome:<40} mediana {statistics.median(ordenados):8.2f} ms"
+          f"   p95 {p95:8.2f} ms   mín {ordenados[0]:8.2f} ms")
@@ -0,0 +1,79 @@
+# benchmarks/bench_async_views.py
+"""
+Compara o tempo de parede das consultas das páginas com várias buscas
+independentes: as mesmas consultas em lote sobre o pool assíncrono,
+aguardadas uma após a outra e combinadas com asyncio.gather. Assim a
+diferença medida é só a da concorrência, não a do número de consultas.
+
+    python -m benchmarks.bench_async_views --user-id 1
+"""
+
+import asyncio
+from datetime import date
+
+from benchmarks._common import base_parser, measure, report
+from models.conta_bancaria_model import ContaBancaria
+from models.crediario_model import Crediario
+from models.grupo_crediario_model import GrupoCrediario
+from models.movimento_bancario_model import MovimentoBancario
+from models.movimento_crediario_model import MovimentoCrediario
+from models.transacao_bancaria_model import TransacaoBancaria
+
+
+def consultas_lista_bancaria(user_id):
+    return [
+        lambda: MovimentoBancario.get_all_by_user_async(user_id),
+        lambda: ContaBancaria.get_all_by_user_async(user_id),
+        lambda: TransacaoBancaria.get_all_by_user_async(user_id),
+    ]
+
+
+def consultas_extrato_crediario(user_id, crediario_id, year, month):
+    return [
+        lambda: Crediario.get_by_id_async(crediario_id, user_id),
+        lambda: MovimentoCrediario.get_by_crediario_and_month_async(
+            user_id, crediario_id, year, month),
+        lambda: GrupoCrediario.get_all_by_user_async(user_id),
+    ]
+
+
+async def em_sequencia(consultas):
+    for consulta in consultas:
+        await consulta()
+
+
+async def concorrentes(consultas):
+    await asyncio.gather(*(consulta() for consulta in consultas))
+
+
+def comparar(nome, consultas, repeticoes):
+    report(f'{nome} (em sequência)', measure(
+        lambda: asyncio.run(em_sequencia(consultas)), repeticoes))
+    report(f'{nome} (asyncio.gather)', measure(
+        lambda: asyncio.run(concorrentes(consultas)), repeticoes))
+
+
+def main():
+    parser = base_parser(__doc__)
+    parser.add_argument('--ano', type=int, default=None)
+    parser.add_argument('--mes', type=int, default=None)
+    args = parser.parse_args()
+
+    hoje = date.today()
+    ano = args.ano or hoje.year
+    mes = args.mes or hoje.month
+
+    comparar('movimentos bancários',
+             consultas_lista_bancaria(args.user_id), args.repeticoes)
+
+    crediarios = Crediario.get_all_by_user(args.user_id)
+    if not crediarios:
+        print('Usuário sem crediários; extrato de crediário não medido.')
+        return
+    comparar('extrato de crediário',
+             consultas_extrato_crediario(args.user_id, crediarios[0].id, ano, mes),
+             args.repeticoes)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# benchmarks/bench_model_memory.py
+"""
+Memória e tempo de construção de 100 mil movimentos bancários, comparando a
+classe do model (com __slots__) com uma classe equivalente com __dict__.
+Não acessa o banco: as linhas são geradas em memória.
+
+    python -m benchmarks.bench_model_memory --linhas 100000
+"""
+
+import argparse
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from models.movimento_bancario_model import MovimentoBancario
+
+
+class MovimentoComDict:
+    """Mesmo construtor de MovimentoBancario, sem __slots__."""
+    __init__ = MovimentoBancario.__init__
+
+
+def gerar_linhas(quantidade):
+    inicio = date(2015, 1, 1)
+    return [
+        (i, 1, i % 5 + 1, i % 20 + 1, inicio + timedelta(days=i % 3650),
+         Decimal(f"{(i % 100000) / 100:.2f}"), 'Despesa' if i % 3 else 'Receita')
+        for i in range(quantidade)
+    ]
+
+
+def medir(cls, linhas):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    objetos = [cls(*row) for row in linhas]
+    duracao = (time.perf_counter() - inicio) * 1000
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return duracao, memoria
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--linhas', type=int, default=100000)
+    args = parser.parse_args()
+
+    linhas = gerar_linhas(args.linhas)
+    for nome, cls in (('com __dict__', MovimentoComDict),
+                      ('com __slots__', MovimentoBancario)):
+        duracao, memoria = medir(cls, linhas)
+        print(f"{nome:<15} {duracao:8.1f} ms   {memoria / 1024 / 1024:7.1f} MiB"
+              f"   {memoria / len(linhas):6.0f} bytes/objeto")
+
+
+if __name__ == '__main__':
+    main()
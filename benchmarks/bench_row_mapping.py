@@ -0,0 +1,59 @@
+# benchmarks/bench_row_mapping.py
+"""
+Compara a montagem de objetos MovimentoBancario em uma busca grande:
+tuplas convertidas com Decimal(str(...)) linha a linha (forma antiga) e
+row factory do psycopg (args_row), que recebe o NUMERIC já como Decimal.
+As linhas são geradas pelo próprio PostgreSQL com generate_series.
+
+    python -m benchmarks.bench_row_mapping --linhas 200000
+"""
+
+import argparse
+from decimal import Decimal
+
+from psycopg.rows import args_row
+
+from benchmarks._common import measure, report
+from database.db_manager import open_connection
+from models.movimento_bancario_model import MovimentoBancario
+
+QUERY = """
+SELECT i, 1, i %% 5 + 1, i %% 20 + 1, DATE '2015-01-01' + (i %% 3650),
+       ((i %% 100000) / 100.0)::NUMERIC(15, 2),
+       CASE WHEN i %% 3 = 0 THEN 'Receita' ELSE 'Despesa' END
+FROM generate_series(1, %s) AS i
+"""
+
+
+def com_conversao(conn, linhas):
+    with conn.cursor() as cursor:
+        cursor.execute(QUERY, (linhas,))
+        return [MovimentoBancario(row[0], row[1], row[2], row[3], row[4],
+                                  Decimal(str(row[5])), row[6])
+                for row in cursor.fetchall()]
+
+
+def com_row_factory(conn, linhas):
+    with conn.cursor(row_factory=args_row(MovimentoBancario)) as cursor:
+        cursor.execute(QUERY, (linhas,))
+        return cursor.fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--linhas', type=int, default=200000)
+    parser.add_argument('--repeticoes', type=int, default=10)
+    args = parser.parse_args()
+
+    conn = open_connection()
+    try:
+        report('Decimal(str(...)) por linha', measure(
+            lambda: com_conversao(conn, args.linhas), args.repeticoes))
+        report('row factory (args_row)', measure(
+            lambda: com_row_factory(conn, args.linhas), args.repeticoes))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_write_latency.py
+"""
+Latência de uma transação com vários comandos (como a edição de um
+movimento: estorno, UPDATE do movimento, novo ajuste e COMMIT), enviados
+um a um e em modo pipeline. Usa uma tabela
+temporária, sem tocar nos dados da aplicação.
+
+O ganho aparece com latência de rede. Para simulá-la em um PostgreSQL local
+(Linux, como root), adicione atraso à interface de loopback antes de rodar
+e remova-o depois:
+
+    tc qdisc add dev lo root netem delay 5ms
+    python -m benchmarks.bench_write_latency --comandos 4
+    tc qdisc del dev lo root netem
+"""
+
+import argparse
+
+from benchmarks._common import measure, report
+from database.db_manager import open_connection
+
+UPDATE_SALDO = "UPDATE bench_contas SET saldo = saldo + %s WHERE id = %s"
+
+
+def preparar(conn):
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "CREATE TEMP TABLE bench_contas (id INTEGER PRIMARY KEY, saldo NUMERIC(15, 2))")
+        cursor.execute(
+            "INSERT INTO bench_contas SELECT i, 0 FROM generate_series(1, 10) AS i")
+    conn.commit()
+
+
+def sequencial(conn, comandos):
+    with conn.cursor() as cursor:
+        for i in range(comandos):
+            cursor.execute(UPDATE_SALDO, (1, i % 10 + 1))
+    conn.commit()
+
+
+def pipeline(conn, comandos):
+    with conn.pipeline(), conn.cursor() as cursor:
+        for i in range(comandos):
+            cursor.execute(UPDATE_SALDO, (1, i % 10 + 1))
+        conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--comandos', type=int, default=4,
+                        help='Comandos por transação (padrão: 4).')
+    parser.add_argument('--repeticoes', type=int, default=50)
+    args = parser.parse_args()
+
+    conn = open_connection()
+    try:
+        preparar(conn)
+        report(f'{args.comandos} comandos, um a um', measure(
+            lambda: sequencial(conn, args.comandos), args.repeticoes))
+        report(f'{args.comandos} comandos, pipeline', measure(
+            lambda: pipeline(conn, args.comandos), args.repeticoes))
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -20,3 +20,43 @@ class Config:
         'host': os.getenv('DB_HOST'),
         'port': os.getenv('DB_PORT')
     }
+
+    # Build de assets estáticos (flask assets build)
+    NODE_MODULES_DIR = os.getenv('NODE_MODULES_DIR', 'node_modules')
+    TAILWIND_BIN = os.getenv('TAILWIND_BIN', os.path.join(
+        NODE_MODULES_DIR, '.bin', 'tailwindcss'))
+    ASSETS_MAX_AGE = 31536000  # 1 ano, para arquivos com hash no nome
+
+    # Compressão e ETag das respostas dinâmicas (utils/compression.py)
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 5
+    COMPRESS_MIMETYPES = ('text/html', 'text/plain', 'text/csv',
+                          'application/json')
+
+    # Cache de bytecode dos templates Jinja (flask templates compile)
+    JINJA_CACHE_DIR = os.getenv('JINJA_CACHE_DIR', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '.jinja_cache'))
+    # Compila e renderiza os templates na inicialização de cada processo
+    TEMPLATE_WARMUP = os.getenv('TEMPLATE_WARMUP', 'false').lower() in (
+        '1', 'true', 'yes')
+
+    # Linhas buscadas por lote nos cursores do servidor (iter_query)
+    DB_ITERSIZE = int(os.getenv('DB_ITERSIZE', 2000))
+
+    # Pool de conexões assíncronas usado pelas views async (database/async_db_manager.py)
+    ASYNC_POOL_MIN_SIZE = int(os.getenv('ASYNC_POOL_MIN_SIZE', 1))
+    ASYNC_POOL_MAX_SIZE = int(os.getenv('ASYNC_POOL_MAX_SIZE', 10))
+    # Segundos para o pool abrir suas primeiras conexões antes de desistir
+    ASYNC_POOL_OPEN_TIMEOUT = float(os.getenv('ASYNC_POOL_OPEN_TIMEOUT', 10))
+
+    # Margem da reconciliação incremental de saldos (flask contas reconcile)
+    RECONCILIACAO_MARGEM_MINUTOS = int(
+        os.getenv('RECONCILIACAO_MARGEM_MINUTOS', 5))
+
+    # Cache por usuário do resumo da página inicial (utils/cache.py)
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', 300))
+    USER_CACHE_MAX_ENTRIES = int(os.getenv('USER_CACHE_MAX_ENTRIES', 1024))
+
+    # Intervalo mínimo (segundos) entre atualizações do resumo mensal pedidas pela página
+    RESUMO_INTERVALO_MINIMO = int(os.getenv('RESUMO_INTERVALO_MINIMO', 60))
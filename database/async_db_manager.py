@@ -0,0 +1,127 @@
+# database/async_db_manager.py
+
+import asyncio
+import threading
+
+from psycopg.conninfo import make_conninfo
+from psycopg.errors import OperationalError, UniqueViolation, UndefinedTable
+from psycopg_pool import AsyncConnectionPool
+from config import Config
+
+
+class _AsyncDatabase:
+    """
+    Mantém o pool assíncrono (AsyncConnectionPool) em um loop de eventos
+    dedicado, executado em uma thread própria.
+
+    As views assíncronas do Flask rodam cada requisição em um loop de eventos
+    novo; como um pool fica preso ao loop em que foi aberto, as consultas são
+    despachadas para este loop permanente e aguardadas pela view. Assim o pool
+    é compartilhado entre requisições e várias consultas independentes podem
+    rodar ao mesmo tempo (asyncio.gather), cada uma em sua própria conexão.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._pool = None
+
+    def _start(self):
+        with self._lock:
+            if self._loop is not None:
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(
+                target=loop.run_forever, name='async-db', daemon=True)
+            thread.start()
+
+            db_config = Config.DATABASE
+            pool = AsyncConnectionPool(
+                make_conninfo(
+                    dbname=db_config['dbname'],
+                    user=db_config['user'],
+                    password=db_config['password'],
+                    host=db_config['host'],
+                    port=db_config['port']
+                ),
+                min_size=Config.ASYNC_POOL_MIN_SIZE,
+                max_size=Config.ASYNC_POOL_MAX_SIZE,
+                open=False
+            )
+            # Com wait=True a abertura só retorna com min_size conexões prontas;
+            # se o banco não responder no prazo, o pool é fechado e PoolTimeout
+            # (uma OperationalError) é lançado.
+            try:
+                asyncio.run_coroutine_threadsafe(
+                    pool.open(wait=True, timeout=Config.ASYNC_POOL_OPEN_TIMEOUT), loop).result()
+            except OperationalError as e:
+                print(f"Erro ao abrir o pool assíncrono do PostgreSQL: {e}")
+                loop.call_soon_threadsafe(loop.stop)
+                raise RuntimeError(
+                    "Não foi possível conectar ao banco de dados. Verifique as configurações e o status do PostgreSQL.") from e
+
+            self._pool = pool
+            self._loop = loop
+            return loop
+
+    async def run(self, coro_factory):
+        """
+        Executa coro_factory(pool) no loop do pool e aguarda o resultado a
+        partir do loop de eventos atual.
+        """
+        loop = self._loop or self._start()
+        future = asyncio.run_coroutine_threadsafe(
+            coro_factory(self._pool), loop)
+        return await asyncio.wrap_future(future)
+
+
+_database = _AsyncDatabase()
+
+
+async def _execute(pool, query, params, fetchone, fetchall, commit, row_factory):
+    async with pool.connection() as conn:
+        async with conn.cursor(row_factory=row_factory) as cursor:
+            await cursor.execute(query, params)
+
+            result = None
+            if fetchone:
+                result = await cursor.fetchone()
+            elif fetchall:
+                result = await cursor.fetchall()
+
+            if commit:
+                await conn.commit()
+                if not (fetchone or fetchall):
+                    result = (cursor.rowcount > 0)
+            else:
+                if not (fetchone or fetchall):
+                    result = True
+                await conn.rollback()
+
+            return result
+
+
+async def async_execute_query(query, params=None, fetchone=False, fetchall=False, commit=False,
+                              row_factory=None):
+    """
+    Versão assíncrona de execute_query. Cada chamada usa uma conexão do pool,
+    então chamadas independentes podem ser combinadas com asyncio.gather.
+    """
+    try:
+        return await _database.run(
+            lambda pool: _execute(pool, query, params, fetchone, fetchall, commit, row_factory))
+    except OperationalError as e:
+        print(f"Erro de operação no banco de dados: {e}")
+        raise
+    except UniqueViolation as e:
+        print(f"Erro de violação de unicidade: {e}")
+        raise ValueError(
+            "Violação de unicidade de dados. Este registro já existe.") from e
+    except UndefinedTable as e:
+        print(f"Erro: Tabela não definida: {e}")
+        raise RuntimeError(
+            "Erro no esquema do banco de dados. Tabela não encontrada.") from e
+    except Exception as e:
+        print(f"Erro inesperado ao executar consulta: {e}")
+        raise
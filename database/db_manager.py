@@ -1,5 +1,7 @@
 # database/db_manager.py
 
+import uuid
+
 import psycopg
 from psycopg.errors import OperationalError, UniqueViolation, UndefinedTable
 from config import Config
@@ -26,10 +28,16 @@ def open_connection():
             "Erro inesperado ao conectar ao banco de dados.") from e
 
 
-def execute_query(query, params=None, fetchone=False, fetchall=False, commit=False, connection=None, cursor=None):
+def execute_query(query, params=None, fetchone=False, fetchall=False, commit=False, connection=None, cursor=None,
+                  row_factory=None):
+    """
+    Executa uma consulta. Com row_factory (ex.: psycopg.rows.args_row(Model)),
+    as linhas retornadas já são os objetos do model, montados pelo psycopg.
+    """
     _conn = connection
     _cursor = cursor
     close_internally = False
+    previous_row_factory = None
 
     try:
         if _conn is None:
@@ -37,6 +45,10 @@ def execute_query(query, params=None, fetchone=False, fetchall=False, commit=Fal
             _cursor = _conn.cursor()
             close_internally = True
 
+        if row_factory is not None:
+            previous_row_factory = _cursor.row_factory
+            _cursor.row_factory = row_factory
+
         _cursor.execute(query, params)
 
         result = None
@@ -79,7 +91,47 @@ def execute_query(query, params=None, fetchone=False, fetchall=False, commit=Fal
         raise
 
     finally:
+        if previous_row_factory is not None and not close_internally:
+            _cursor.row_factory = previous_row_factory
         if close_internally and _cursor:
             _cursor.close()
         if close_internally and _conn:
             _conn.close()
+
+
+def iter_query(query, params=None, itersize=None, row_factory=None):
+    """
+    Executa uma consulta em um cursor nomeado (server-side) e devolve as
+    linhas uma a uma, buscando-as do servidor em lotes de 'itersize'
+    (padrão Config.DB_ITERSIZE). A memória usada fica limitada ao tamanho do
+    lote, independentemente do número de linhas do resultado.
+
+    A conexão fica aberta enquanto o gerador estiver sendo consumido e é
+    fechada ao final da iteração (ou quando o gerador é descartado).
+    """
+    _conn = open_connection()
+    _cursor = None
+    try:
+        _cursor = _conn.cursor(
+            name=f"iter_{uuid.uuid4().hex}", row_factory=row_factory)
+        _cursor.itersize = itersize or Config.DB_ITERSIZE
+        _cursor.execute(query, params)
+        for row in _cursor:
+            yield row
+
+    except OperationalError as e:
+        print(f"Erro de operação no banco de dados: {e}")
+        raise
+    except UndefinedTable as e:
+        print(f"Erro: Tabela não definida: {e}")
+        raise RuntimeError(
+            "Erro no esquema do banco de dados. Tabela não encontrada.") from e
+    except Exception as e:
+        print(f"Erro inesperado ao executar consulta: {e}")
+        raise
+
+    finally:
+        if _cursor:
+            _cursor.close()
+        _conn.rollback()
+        _conn.close()
@@ -0,0 +1,131 @@
+# models/busca_model.py
+
+from database.db_manager import execute_query
+from psycopg.rows import args_row
+
+ROTAS_EDICAO = {
+    'bancario': ('movimento_bancario.edit_movimento', 'movimento_id'),
+    'crediario': ('movimento_crediario.edit_movimento_crediario', 'movimento_id'),
+    'fixa': ('despesa_fixa.edit_despesa_fixa', 'despesa_fixa_id'),
+    'renda': ('movimento_renda.edit_movimento_renda', 'movimento_id'),
+}
+
+
+def _escape_like(termo):
+    return termo.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+class ResultadoBusca:
+    """
+    Lançamento encontrado pela busca textual, de qualquer origem:
+    movimento bancário (pelo nome da transação), compra no crediário (pela
+    descrição), despesa fixa (pela despesa/receita) ou renda (pela descrição).
+    """
+
+    __slots__ = ('origem', 'id', 'data', 'descricao', 'categoria', 'valor', 'relevancia', 'total')
+
+    def __init__(self, origem, id, data, descricao, categoria, valor, relevancia, total):
+        self.origem = origem
+        self.id = id
+        self.data = data
+        self.descricao = descricao
+        self.categoria = categoria
+        self.valor = valor
+        self.relevancia = relevancia
+        self.total = total
+
+    @staticmethod
+    def create_table():
+        """
+        Cria as extensões pg_trgm e unaccent, a função f_unaccent (versão
+        IMMUTABLE de unaccent, exigida em índices) e os índices GIN de
+        trigramas sobre os textos pesquisados.
+        """
+        query = """
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE EXTENSION IF NOT EXISTS unaccent;
+
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+            LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS
+        $$ SELECT public.unaccent('public.unaccent'::regdictionary, lower($1)) $$;
+
+        CREATE INDEX IF NOT EXISTS idx_movimentos_crediario_descricao_trgm
+            ON movimentos_crediario USING gin (f_unaccent(descricao) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_transacoes_bancarias_transacao_trgm
+            ON transacoes_bancarias USING gin (f_unaccent(transacao) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_despesas_receitas_despesa_receita_trgm
+            ON despesas_receitas USING gin (f_unaccent(despesa_receita) gin_trgm_ops);
+        CREATE INDEX IF NOT EXISTS idx_renda_descricao_trgm
+            ON renda USING gin (f_unaccent(descricao) gin_trgm_ops);
+
+        CREATE INDEX IF NOT EXISTS idx_movimentos_bancarios_transacao_data
+            ON movimentos_bancarios (transacao_bancaria_id, data);
+        """
+        try:
+            execute_query(query, commit=True)
+            print("Índices de busca textual verificados/criados com sucesso.")
+        except Exception as e:
+            print(f"Erro ao criar índices de busca textual: {e}")
+            raise
+
+    @classmethod
+    def buscar(cls, user_id, termo, limite=25, offset=0):
+        """
+        Busca o termo (sem diferenciar maiúsculas nem acentos) em todas as
+        origens. Um texto casa quando contém o termo ou quando alguma de suas
+        palavras é parecida com ele (operador <% do pg_trgm); os dois testes
+        usam os índices GIN. Os resultados vêm ordenados por relevância
+        (word_similarity) e data, e cada linha traz o total de resultados.
+        """
+        query = """
+            WITH q AS (
+                SELECT f_unaccent(%(termo)s) AS termo, f_unaccent(%(padrao)s) AS padrao
+            ), resultados AS (
+                SELECT 'crediario' AS origem, mc.id, mc.data_compra AS data, mc.descricao,
+                       g.grupo AS categoria, mc.valor_total AS valor,
+                       word_similarity(q.termo, f_unaccent(mc.descricao)) AS relevancia
+                FROM q, movimentos_crediario mc
+                JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+                WHERE mc.user_id = %(user_id)s
+                  AND (f_unaccent(mc.descricao) LIKE q.padrao OR q.termo <%% f_unaccent(mc.descricao))
+                UNION ALL
+                SELECT 'bancario', m.id, m.data, t.transacao, cb.banco, m.valor,
+                       word_similarity(q.termo, f_unaccent(t.transacao))
+                FROM q, transacoes_bancarias t
+                JOIN movimentos_bancarios m ON m.transacao_bancaria_id = t.id
+                JOIN contas_bancarias cb ON cb.id = m.conta_bancaria_id
+                WHERE t.user_id = %(user_id)s
+                  AND (f_unaccent(t.transacao) LIKE q.padrao OR q.termo <%% f_unaccent(t.transacao))
+                UNION ALL
+                SELECT 'fixa', df.id, df.mes_ano, dr.despesa_receita, dr.tipo, df.valor,
+                       word_similarity(q.termo, f_unaccent(dr.despesa_receita))
+                FROM q, despesas_receitas dr
+                JOIN despesas_fixas df ON df.despesa_receita_id = dr.id
+                WHERE dr.user_id = %(user_id)s
+                  AND (f_unaccent(dr.despesa_receita) LIKE q.padrao
+                       OR q.termo <%% f_unaccent(dr.despesa_receita))
+                UNION ALL
+                SELECT 'renda', mr.id, mr.mes_pagto, r.descricao, r.tipo, mr.valor,
+                       word_similarity(q.termo, f_unaccent(r.descricao))
+                FROM q, renda r
+                JOIN movimentos_renda mr ON mr.renda_id = r.id
+                WHERE r.user_id = %(user_id)s
+                  AND (f_unaccent(r.descricao) LIKE q.padrao OR q.termo <%% f_unaccent(r.descricao))
+            )
+            SELECT origem, id, data, descricao, categoria, valor, relevancia, COUNT(*) OVER () AS total
+            FROM resultados
+            ORDER BY relevancia DESC, data DESC, origem, id
+            LIMIT %(limite)s OFFSET %(offset)s
+        """
+        params = {
+            'user_id': user_id,
+            'termo': termo,
+            'padrao': f"%{_escape_like(termo)}%",
+            'limite': limite,
+            'offset': offset,
+        }
+        try:
+            return execute_query(query, params, fetchall=True, row_factory=args_row(cls))
+        except Exception as e:
+            print(f"Erro ao buscar lançamentos: {e}")
+            raise
@@ -1,7 +1,9 @@
 # models/conta_bancaria_model.py
 
 from database.db_manager import execute_query
+from database.async_db_manager import async_execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 from decimal import Decimal
 
 
@@ -10,6 +12,11 @@ class ContaBancaria:
     Representa uma conta bancária de um usuário no sistema.
     """
 
+    __slots__ = (
+        'id', 'user_id', 'banco', 'agencia', 'conta', 'tipo', 'saldo_inicial',
+        'saldo_atual', 'limite'
+    )
+
     def __init__(self, id, user_id, banco, agencia, conta, tipo, saldo_inicial, saldo_atual, limite):
         self.id = id
         self.user_id = user_id
@@ -38,12 +45,37 @@ class ContaBancaria:
             saldo_inicial NUMERIC(15, 2) NOT NULL DEFAULT 0.00,
             saldo_atual NUMERIC(15, 2) NOT NULL DEFAULT 0.00,
             limite NUMERIC(15, 2) NOT NULL DEFAULT 0.00,
+            alterado_em TIMESTAMPTZ NOT NULL DEFAULT now(),
             UNIQUE (user_id, banco, agencia, conta, tipo),
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE RESTRICT
         );
         """
+        # alterado_em marca as contas cujo saldo mudou, para que a reconciliação
+        # (models/reconciliacao_model.py) verifique apenas essas contas.
+        alterado_em_query = """
+        ALTER TABLE contas_bancarias
+            ADD COLUMN IF NOT EXISTS alterado_em TIMESTAMPTZ NOT NULL DEFAULT now();
+        CREATE INDEX IF NOT EXISTS idx_contas_bancarias_alterado_em
+            ON contas_bancarias (alterado_em);
+
+        CREATE OR REPLACE FUNCTION contas_bancarias_marcar_alteracao() RETURNS trigger AS $$
+        BEGIN
+            IF NEW.saldo_atual IS DISTINCT FROM OLD.saldo_atual
+               OR NEW.saldo_inicial IS DISTINCT FROM OLD.saldo_inicial THEN
+                NEW.alterado_em := now();
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_contas_bancarias_alterado_em ON contas_bancarias;
+        CREATE TRIGGER trg_contas_bancarias_alterado_em
+            BEFORE UPDATE ON contas_bancarias
+            FOR EACH ROW EXECUTE FUNCTION contas_bancarias_marcar_alteracao();
+        """
         try:
             execute_query(query, commit=True)
+            execute_query(alterado_em_query, commit=True)
             print("Tabela 'contas_bancarias' verificada/criada com sucesso.")
         except Exception as e:
             print(
@@ -58,27 +90,57 @@ class ContaBancaria:
         rows = execute_query(
             "SELECT id, user_id, banco, agencia, conta, tipo, saldo_inicial, saldo_atual, limite FROM contas_bancarias WHERE user_id = %s ORDER BY banco, tipo",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
-    def get_by_id(cls, conta_id, user_id):
+    def get_by_id(cls, conta_id, user_id, for_update=False, connection=None, cursor=None):
         """
         Retorna uma conta bancária pelo seu ID e ID do usuário, garantindo que o usuário é o proprietário.
+        Com connection/cursor, a leitura é feita na transação do chamador; for_update
+        bloqueia a linha da conta até o fim dessa transação.
         """
+        query = "SELECT id, user_id, banco, agencia, conta, tipo, saldo_inicial, saldo_atual, limite " \
+                "FROM contas_bancarias WHERE id = %s AND user_id = %s"
+        if for_update:
+            query += " FOR UPDATE"
         row = execute_query(
+            query,
+            (conta_id, user_id),
+            fetchone=True,
+            connection=connection,
+            cursor=cursor,
+            row_factory=args_row(cls)
+        )
+        return row
+
+    @classmethod
+    async def get_all_by_user_async(cls, user_id):
+        """
+        Versão assíncrona de get_all_by_user.
+        """
+        rows = await async_execute_query(
+            "SELECT id, user_id, banco, agencia, conta, tipo, saldo_inicial, saldo_atual, limite FROM contas_bancarias WHERE user_id = %s ORDER BY banco, tipo",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+        return rows
+
+    @classmethod
+    async def get_by_id_async(cls, conta_id, user_id):
+        """
+        Versão assíncrona de get_by_id.
+        """
+        row = await async_execute_query(
             "SELECT id, user_id, banco, agencia, conta, tipo, saldo_inicial, saldo_atual, limite FROM contas_bancarias WHERE id = %s AND user_id = %s",
             (conta_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
         )
-        if row:
-            row_list = list(row)
-            row_list[6] = Decimal(str(row_list[6]))
-            row_list[7] = Decimal(str(row_list[7]))
-            row_list[8] = Decimal(str(row_list[8]))
-            return cls(*row_list)
-        return None
+        return row
 
     @classmethod
     def add(cls, user_id, banco, agencia, conta, tipo, saldo_inicial=Decimal('0.00'), saldo_atual=Decimal('0.00'), limite=Decimal('0.00')):
@@ -112,29 +174,28 @@ class ContaBancaria:
             raise
 
     @classmethod
-    def update(cls, conta_id, user_id, banco, agencia, conta, tipo, saldo_inicial, saldo_atual, limite):
+    def update(cls, conta_id, user_id, banco, agencia, conta, tipo, saldo_inicial, limite):
         """
         Atualiza as informações de uma conta bancária existente.
-        O saldo_atual NÃO é atualizado aqui diretamente, pois é gerenciado por movimentos bancários.
-        Você pode ajustar o saldo_inicial e o limite.
+        O saldo_atual NÃO é gravado a partir do formulário, pois é gerenciado por
+        movimentos bancários: uma alteração do saldo_inicial desloca o saldo_atual
+        pela mesma diferença, no próprio UPDATE.
         Levanta ValueError em caso de violação de unicidade ou se a conta não for encontrada.
         """
-        existing_conta = cls.get_by_id(conta_id, user_id)
-        if not existing_conta:
-            return None
-
         try:
             query = """
                 UPDATE contas_bancarias
-                SET banco = %s, agencia = %s, conta = %s, tipo = %s, saldo_inicial = %s, saldo_atual = %s, limite = %s
+                SET banco = %s, agencia = %s, conta = %s, tipo = %s,
+                    saldo_atual = saldo_atual + (%s - saldo_inicial),
+                    saldo_inicial = %s, limite = %s
                 WHERE id = %s AND user_id = %s
+                RETURNING id, user_id, banco, agencia, conta, tipo, saldo_inicial, saldo_atual, limite
             """
-            params = (banco, agencia, conta, tipo, saldo_inicial, saldo_atual,
+            params = (banco, agencia, conta, tipo, saldo_inicial, saldo_inicial,
                       limite, conta_id, user_id)
-            if execute_query(query, params, commit=True):
-                return cls.get_by_id(conta_id, user_id)
-            return None
-        except UniqueViolation as e:
+            return execute_query(query, params, fetchone=True, commit=True,
+                                 row_factory=args_row(cls))
+        except ValueError as e:
             raise ValueError(
                 "Erro: Já existe outra conta bancária com esta combinação de banco, agência, conta e tipo para este usuário."
             ) from e
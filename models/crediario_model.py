@@ -1,7 +1,9 @@
 # models/crediario_model.py
 
 from database.db_manager import execute_query
+from database.async_db_manager import async_execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 from decimal import Decimal
 
 
@@ -10,6 +12,8 @@ class Crediario:
     Representa um item de crediário de um usuário no sistema.
     """
 
+    __slots__ = ('id', 'user_id', 'crediario', 'tipo', 'final', 'limite')
+
     def __init__(self, id, user_id, crediario, tipo, final, limite):
         self.id = id
         self.user_id = user_id
@@ -55,9 +59,10 @@ class Crediario:
         rows = execute_query(
             "SELECT id, user_id, crediario, tipo, final, limite FROM crediarios WHERE user_id = %s ORDER BY crediario, tipo",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
     def get_by_id(cls, crediario_id, user_id):
@@ -67,9 +72,36 @@ class Crediario:
         row = execute_query(
             "SELECT id, user_id, crediario, tipo, final, limite FROM crediarios WHERE id = %s AND user_id = %s",
             (crediario_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
+        )
+        return row
+
+    @classmethod
+    async def get_all_by_user_async(cls, user_id):
+        """
+        Versão assíncrona de get_all_by_user.
+        """
+        rows = await async_execute_query(
+            "SELECT id, user_id, crediario, tipo, final, limite FROM crediarios WHERE user_id = %s ORDER BY crediario, tipo",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+        return rows
+
+    @classmethod
+    async def get_by_id_async(cls, crediario_id, user_id):
+        """
+        Versão assíncrona de get_by_id.
+        """
+        row = await async_execute_query(
+            "SELECT id, user_id, crediario, tipo, final, limite FROM crediarios WHERE id = %s AND user_id = %s",
+            (crediario_id, user_id),
+            fetchone=True,
+            row_factory=args_row(cls)
         )
-        return cls(*row) if row else None
+        return row
 
     @classmethod
     def add(cls, user_id, crediario, tipo, final, limite):
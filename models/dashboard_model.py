@@ -0,0 +1,131 @@
+# models/dashboard_model.py
+
+from datetime import date
+from decimal import Decimal
+
+from database.db_manager import execute_query
+from psycopg.rows import args_row
+
+
+class Dashboard:
+    """
+    Resumo financeiro do usuário exibido na página inicial.
+    Todos os totais são calculados por uma única consulta (get_for_user).
+    """
+
+    __slots__ = (
+        'saldo_total', 'limite_total', 'qtd_contas', 'renda_mes', 'despesas_fixas_mes',
+        'parcelas_mes', 'qtd_parcelas_mes', 'divida_aberta', 'qtd_parcelas_vencidas',
+        'valor_vencido', 'movimentos_recentes'
+    )
+
+    def __init__(self, saldo_total, limite_total, qtd_contas, renda_mes, despesas_fixas_mes,
+                 parcelas_mes, qtd_parcelas_mes, divida_aberta, qtd_parcelas_vencidas,
+                 valor_vencido, movimentos_recentes):
+        self.saldo_total = saldo_total
+        self.limite_total = limite_total
+        self.qtd_contas = qtd_contas
+        self.renda_mes = renda_mes
+        self.despesas_fixas_mes = despesas_fixas_mes
+        self.parcelas_mes = parcelas_mes
+        self.qtd_parcelas_mes = qtd_parcelas_mes
+        self.divida_aberta = divida_aberta
+        self.qtd_parcelas_vencidas = qtd_parcelas_vencidas
+        self.valor_vencido = valor_vencido
+        # O valor vem como texto no JSON para não passar por float.
+        for movimento in movimentos_recentes:
+            movimento['valor'] = Decimal(movimento['valor'])
+        self.movimentos_recentes = movimentos_recentes
+
+    @property
+    def saldo_disponivel(self):
+        return self.saldo_total + self.limite_total
+
+    @property
+    def resultado_mes(self):
+        return self.renda_mes - self.despesas_fixas_mes - self.parcelas_mes
+
+    @classmethod
+    def get_for_user(cls, user_id, year, month, recentes=10):
+        """
+        Calcula o resumo do mês (year, month) para o usuário em uma consulta
+        com um CTE por área: contas, renda, despesas fixas, parcelas de
+        crediário do mês, saldo devedor do crediário (só parcelas em aberto,
+        pelo índice parcial) e os últimos movimentos bancários (agregados em JSON).
+        Parcelas de grupos 'Estorno' entram com sinal negativo nos totais.
+        """
+        inicio = date(year, month, 1)
+        fim = date(year + month // 12, month % 12 + 1, 1)
+
+        query = """
+            WITH contas AS (
+                SELECT COALESCE(SUM(saldo_atual), 0) AS saldo_total,
+                       COALESCE(SUM(limite), 0) AS limite_total,
+                       COUNT(*) AS qtd_contas
+                FROM contas_bancarias
+                WHERE user_id = %(user_id)s
+            ), renda AS (
+                SELECT COALESCE(SUM(valor), 0) AS total
+                FROM movimentos_renda
+                WHERE user_id = %(user_id)s AND mes_pagto >= %(inicio)s AND mes_pagto < %(fim)s
+            ), fixas AS (
+                SELECT COALESCE(SUM(df.valor), 0) AS total
+                FROM despesas_fixas df
+                JOIN despesas_receitas dr ON dr.id = df.despesa_receita_id
+                WHERE df.user_id = %(user_id)s AND dr.tipo = 'Despesa'
+                  AND df.mes_ano >= %(inicio)s AND df.mes_ano < %(fim)s
+            ), parcelas AS (
+                SELECT COALESCE(SUM(CASE WHEN g.tipo = 'Estorno' THEN -p.valor_parcela
+                                         ELSE p.valor_parcela END), 0) AS total,
+                       COUNT(*) AS qtd
+                FROM movimentos_crediario mc
+                JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+                JOIN parcelas_crediario p ON p.movimento_crediario_id = mc.id
+                WHERE mc.user_id = %(user_id)s
+                  AND p.vencimento_ano = %(ano)s AND p.vencimento_mes = %(mes)s
+            ), abertas AS (
+                SELECT COALESCE(SUM(v.valor), 0) AS total,
+                       COUNT(*) FILTER (WHERE v.vencida) AS qtd_vencidas,
+                       COALESCE(SUM(v.valor) FILTER (WHERE v.vencida), 0) AS total_vencido
+                FROM (
+                    SELECT CASE WHEN g.tipo = 'Estorno' THEN -p.valor_parcela ELSE p.valor_parcela END AS valor,
+                           (p.vencimento_ano, p.vencimento_mes) < (%(ano)s, %(mes)s) AS vencida
+                    FROM movimentos_crediario mc
+                    JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+                    JOIN parcelas_crediario p ON p.movimento_crediario_id = mc.id
+                    WHERE mc.user_id = %(user_id)s AND p.paga_em IS NULL
+                ) AS v
+            ), recentes AS (
+                SELECT m.id, m.data, m.valor, m.tipo, cb.banco, tb.transacao
+                FROM movimentos_bancarios m
+                JOIN contas_bancarias cb ON cb.id = m.conta_bancaria_id
+                JOIN transacoes_bancarias tb ON tb.id = m.transacao_bancaria_id
+                WHERE m.user_id = %(user_id)s
+                ORDER BY m.data DESC, m.id DESC
+                LIMIT %(recentes)s
+            )
+            SELECT contas.saldo_total, contas.limite_total, contas.qtd_contas,
+                   renda.total, fixas.total, parcelas.total, parcelas.qtd,
+                   abertas.total, abertas.qtd_vencidas, abertas.total_vencido,
+                   COALESCE((
+                       SELECT json_agg(json_build_object(
+                                  'id', r.id,
+                                  'data', to_char(r.data, 'DD/MM/YYYY'),
+                                  'valor', r.valor::text,
+                                  'tipo', r.tipo,
+                                  'banco', r.banco,
+                                  'transacao', r.transacao
+                              ) ORDER BY r.data DESC, r.id DESC)
+                       FROM recentes r
+                   ), '[]'::json)
+            FROM contas, renda, fixas, parcelas, abertas
+        """
+        params = {
+            'user_id': user_id, 'inicio': inicio, 'fim': fim,
+            'ano': year, 'mes': month, 'recentes': recentes,
+        }
+        try:
+            return execute_query(query, params, fetchone=True, row_factory=args_row(cls))
+        except Exception as e:
+            print(f"Erro ao calcular o resumo do usuário {user_id}: {e}")
+            raise
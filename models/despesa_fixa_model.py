@@ -2,6 +2,7 @@
 
 from database.db_manager import execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 from decimal import Decimal
 from datetime import date, datetime
 
@@ -11,12 +12,20 @@ class DespesaFixa:
     Representa um item de despesa fixa de um usuário no sistema.
     """
 
+    __slots__ = (
+        'id', 'user_id', 'despesa_receita_id', 'mes_ano', 'valor',
+        'despesa_receita_detalhes', 'mes_ano_formatado'
+    )
+
     def __init__(self, id, user_id, despesa_receita_id, mes_ano, valor):
         self.id = id
         self.user_id = user_id
         self.despesa_receita_id = despesa_receita_id
         self.mes_ano = mes_ano
         self.valor = valor
+        # Dados complementares, preenchidos pelas rotas
+        self.despesa_receita_detalhes = None
+        self.mes_ano_formatado = None
 
     @staticmethod
     def create_table():
@@ -55,9 +64,10 @@ class DespesaFixa:
         rows = execute_query(
             "SELECT id, user_id, despesa_receita_id, mes_ano, valor FROM despesas_fixas WHERE user_id = %s ORDER BY despesa_receita_id, mes_ano ASC ",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
     def get_by_id(cls, despesa_fixa_id, user_id):
@@ -67,9 +77,10 @@ class DespesaFixa:
         row = execute_query(
             "SELECT id, user_id, despesa_receita_id, mes_ano, valor FROM despesas_fixas WHERE id = %s AND user_id = %s",
             (despesa_fixa_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
         )
-        return cls(*row) if row else None
+        return row
 
     @classmethod
     def add(cls, user_id, despesa_receita_id, mes_ano_str, valor):
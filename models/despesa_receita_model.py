@@ -2,6 +2,7 @@
 
 from database.db_manager import execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 
 
 class DespesaReceita:
@@ -9,6 +10,8 @@ class DespesaReceita:
     Representa um item de despesa ou receita de um usuário no sistema.
     """
 
+    __slots__ = ('id', 'user_id', 'despesa_receita', 'tipo')
+
     def __init__(self, id, user_id, despesa_receita, tipo):
         self.id = id
         self.user_id = user_id
@@ -50,9 +53,10 @@ class DespesaReceita:
         rows = execute_query(
             "SELECT id, user_id, despesa_receita, tipo FROM despesas_receitas WHERE user_id = %s ORDER BY tipo DESC, despesa_receita",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
     def get_by_id(cls, item_id, user_id):
@@ -62,9 +66,10 @@ class DespesaReceita:
         row = execute_query(
             "SELECT id, user_id, despesa_receita, tipo FROM despesas_receitas WHERE id = %s AND user_id = %s",
             (item_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
         )
-        return cls(*row) if row else None
+        return row
 
     @classmethod
     def add(cls, user_id, despesa_receita, tipo):
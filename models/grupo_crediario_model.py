@@ -1,7 +1,9 @@
 # models/grupo_crediario_model.py
 
 from database.db_manager import execute_query
+from database.async_db_manager import async_execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 
 
 class GrupoCrediario:
@@ -9,6 +11,8 @@ class GrupoCrediario:
     Representa um grupo de crediário de um usuário no sistema.
     """
 
+    __slots__ = ('id', 'user_id', 'grupo', 'tipo')
+
     def __init__(self, id, user_id, grupo, tipo):
         self.id = id
         self.user_id = user_id
@@ -50,9 +54,10 @@ class GrupoCrediario:
         rows = execute_query(
             "SELECT id, user_id, grupo, tipo FROM grupos_crediario WHERE user_id = %s ORDER BY grupo, tipo",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
     def get_by_id(cls, grupo_id, user_id):
@@ -62,9 +67,36 @@ class GrupoCrediario:
         row = execute_query(
             "SELECT id, user_id, grupo, tipo FROM grupos_crediario WHERE id = %s AND user_id = %s",
             (grupo_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
+        )
+        return row
+
+    @classmethod
+    async def get_all_by_user_async(cls, user_id):
+        """
+        Versão assíncrona de get_all_by_user.
+        """
+        rows = await async_execute_query(
+            "SELECT id, user_id, grupo, tipo FROM grupos_crediario WHERE user_id = %s ORDER BY grupo, tipo",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+        return rows
+
+    @classmethod
+    async def get_by_id_async(cls, grupo_id, user_id):
+        """
+        Versão assíncrona de get_by_id.
+        """
+        row = await async_execute_query(
+            "SELECT id, user_id, grupo, tipo FROM grupos_crediario WHERE id = %s AND user_id = %s",
+            (grupo_id, user_id),
+            fetchone=True,
+            row_factory=args_row(cls)
         )
-        return cls(*row) if row else None
+        return row
 
     @classmethod
     def add(cls, user_id, grupo, tipo):
@@ -0,0 +1,121 @@
+# models/linha_do_tempo_model.py
+
+from datetime import date
+
+from database.db_manager import execute_query
+from psycopg.rows import args_row
+
+
+class LancamentoLinhaDoTempo:
+    """
+    Lançamento da linha do tempo financeira do usuário, no formato comum da
+    view 'linha_do_tempo': movimentos bancários, compras no crediário,
+    despesas fixas e rendas. O valor tem sinal (positivo = entrada).
+    """
+
+    __slots__ = ('data', 'origem', 'id', 'categoria', 'descricao', 'valor', 'conta')
+
+    def __init__(self, data, origem, id, categoria, descricao, valor, conta):
+        self.data = data
+        self.origem = origem
+        self.id = id
+        self.categoria = categoria
+        self.descricao = descricao
+        self.valor = valor
+        self.conta = conta
+
+    @property
+    def cursor(self):
+        """
+        Posição deste lançamento na paginação por keyset (data, origem, id).
+        """
+        return f"{self.data.isoformat()}_{self.origem}_{self.id}"
+
+    @staticmethod
+    def parse_cursor(valor):
+        """
+        Converte o texto gerado por cursor em (data, origem, id).
+        Levanta ValueError se o texto for inválido.
+        """
+        data, origem, id_ = valor.split('_')
+        return date.fromisoformat(data), origem, int(id_)
+
+    @staticmethod
+    def create_table():
+        """
+        Cria a view 'linha_do_tempo' (UNION ALL das quatro origens) e os
+        índices (user_id, data, id) de cada ramo, usados pela paginação.
+        """
+        query = """
+        CREATE INDEX IF NOT EXISTS idx_movimentos_crediario_user_data
+            ON movimentos_crediario (user_id, data_compra DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_despesas_fixas_user_mes
+            ON despesas_fixas (user_id, mes_ano DESC, id DESC);
+        CREATE INDEX IF NOT EXISTS idx_movimentos_renda_user_pagto
+            ON movimentos_renda (user_id, mes_pagto DESC, id DESC);
+
+        CREATE OR REPLACE VIEW linha_do_tempo AS
+        SELECT m.user_id, m.data, 'bancario'::text AS origem, m.id,
+               t.transacao::text AS categoria, t.transacao::text AS descricao,
+               CASE WHEN m.tipo = 'Receita' THEN ABS(m.valor) ELSE -ABS(m.valor) END AS valor,
+               cb.banco::text AS conta
+        FROM movimentos_bancarios m
+        JOIN transacoes_bancarias t ON t.id = m.transacao_bancaria_id
+        JOIN contas_bancarias cb ON cb.id = m.conta_bancaria_id
+        UNION ALL
+        SELECT mc.user_id, mc.data_compra, 'crediario', mc.id,
+               g.grupo, mc.descricao,
+               CASE WHEN g.tipo = 'Estorno' THEN ABS(mc.valor_total) ELSE -ABS(mc.valor_total) END,
+               c.crediario
+        FROM movimentos_crediario mc
+        JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+        JOIN crediarios c ON c.id = mc.crediario_id
+        UNION ALL
+        SELECT df.user_id, df.mes_ano, 'fixa', df.id,
+               dr.tipo, dr.despesa_receita,
+               CASE WHEN dr.tipo = 'Receita' THEN ABS(df.valor) ELSE -ABS(df.valor) END,
+               NULL
+        FROM despesas_fixas df
+        JOIN despesas_receitas dr ON dr.id = df.despesa_receita_id
+        UNION ALL
+        SELECT mr.user_id, mr.mes_pagto, 'renda', mr.id,
+               r.tipo, r.descricao, ABS(mr.valor), NULL
+        FROM movimentos_renda mr
+        JOIN renda r ON r.id = mr.renda_id;
+        """
+        try:
+            execute_query(query, commit=True)
+            print("View 'linha_do_tempo' verificada/criada com sucesso.")
+        except Exception as e:
+            print(f"Erro ao criar view 'linha_do_tempo': {e}")
+            raise
+
+    @classmethod
+    def get_page(cls, user_id, limite=50, apos=None, origem=None):
+        """
+        Retorna até 'limite' lançamentos do mais recente para o mais antigo,
+        começando depois da posição 'apos' (data, origem, id), se informada.
+        O filtro por linha (keyset) é levado pelo planejador a cada ramo da
+        view, que lê apenas o trecho necessário do seu índice.
+        """
+        filtros = ["user_id = %(user_id)s"]
+        params = {'user_id': user_id, 'limite': limite}
+        if origem:
+            filtros.append("origem = %(origem)s")
+            params['origem'] = origem
+        if apos:
+            filtros.append("(data, origem, id) < (%(data)s, %(origem_apos)s, %(id)s)")
+            params['data'], params['origem_apos'], params['id'] = apos
+
+        query = f"""
+            SELECT data, origem, id, categoria, descricao, valor, conta
+            FROM linha_do_tempo
+            WHERE {' AND '.join(filtros)}
+            ORDER BY data DESC, origem DESC, id DESC
+            LIMIT %(limite)s
+        """
+        try:
+            return execute_query(query, params, fetchall=True, row_factory=args_row(cls))
+        except Exception as e:
+            print(f"Erro ao buscar a linha do tempo: {e}")
+            raise
@@ -2,14 +2,44 @@
 
 from database.db_manager import open_connection
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 from decimal import Decimal
 from datetime import date, datetime, timedelta
 from models.conta_bancaria_model import ContaBancaria
-from database.db_manager import execute_query
+from database.db_manager import execute_query, iter_query
+from database.async_db_manager import async_execute_query
+
+# Efeito de um movimento no saldo da conta: receitas somam, despesas subtraem.
+EFEITO_SALDO_SQL = "CASE WHEN tipo = 'Receita' THEN ABS(valor) ELSE -ABS(valor) END"
+
+
+class LinhaExtrato:
+    """
+    Linha de um extrato bancário, com o saldo acumulado após o movimento.
+    O valor já tem o sinal do efeito no saldo (receitas positivas).
+    """
+
+    __slots__ = ('id', 'data', 'conta_bancaria_id', 'banco', 'transacao', 'tipo', 'valor', 'saldo')
+
+    def __init__(self, id, data, conta_bancaria_id, banco, transacao, tipo, valor, saldo):
+        self.id = id
+        self.data = data
+        self.conta_bancaria_id = conta_bancaria_id
+        self.banco = banco
+        self.transacao = transacao
+        self.tipo = tipo
+        self.valor = valor
+        self.saldo = saldo
 
 
 class MovimentoBancario:
-    def __init__(self, id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo):
+    __slots__ = (
+        'id', 'user_id', 'conta_bancaria_id', 'transacao_bancaria_id', 'data', 'valor',
+        'tipo', 'transferencia_id', 'conta_detalhes', 'transacao_detalhes', 'data_formatada'
+    )
+
+    def __init__(self, id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo,
+                 transferencia_id=None):
         self.id = id
         self.user_id = user_id
         self.conta_bancaria_id = conta_bancaria_id
@@ -17,6 +47,12 @@ class MovimentoBancario:
         self.data = data
         self.valor = valor
         self.tipo = tipo
+        # As duas pernas de uma transferência entre contas compartilham este id
+        self.transferencia_id = transferencia_id
+        # Dados complementares, preenchidos pelas rotas
+        self.conta_detalhes = None
+        self.transacao_detalhes = None
+        self.data_formatada = None
 
     @staticmethod
     def create_table():
@@ -37,8 +73,40 @@ class MovimentoBancario:
             FOREIGN KEY (transacao_bancaria_id) REFERENCES transacoes_bancarias(id) ON DELETE RESTRICT
         );
         """
+        index_query = """
+        ALTER TABLE movimentos_bancarios ADD COLUMN IF NOT EXISTS transferencia_id UUID;
+        CREATE INDEX IF NOT EXISTS idx_movimentos_bancarios_transferencia
+            ON movimentos_bancarios (transferencia_id) WHERE transferencia_id IS NOT NULL;
+
+        CREATE INDEX IF NOT EXISTS idx_movimentos_bancarios_conta_data
+            ON movimentos_bancarios (conta_bancaria_id, data);
+        CREATE INDEX IF NOT EXISTS idx_movimentos_bancarios_user_data
+            ON movimentos_bancarios (user_id, data DESC, id DESC);
+
+        -- Qualquer escrita em movimentos (inclusive fora da aplicação) marca as
+        -- contas envolvidas para a próxima reconciliação incremental.
+        CREATE OR REPLACE FUNCTION movimentos_bancarios_marcar_contas() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE contas_bancarias SET alterado_em = now()
+                WHERE id = OLD.conta_bancaria_id AND alterado_em < now();
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                UPDATE contas_bancarias SET alterado_em = now()
+                WHERE id = NEW.conta_bancaria_id AND alterado_em < now();
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_movimentos_bancarios_marcar_contas ON movimentos_bancarios;
+        CREATE TRIGGER trg_movimentos_bancarios_marcar_contas
+            AFTER INSERT OR UPDATE OR DELETE ON movimentos_bancarios
+            FOR EACH ROW EXECUTE FUNCTION movimentos_bancarios_marcar_contas();
+        """
         try:
             execute_query(query, commit=True)
+            execute_query(index_query, commit=True)
             print("Tabela 'movimentos_bancarios' verificada/criada com sucesso.")
         except Exception as e:
             print(
@@ -48,68 +116,104 @@ class MovimentoBancario:
     @classmethod
     def get_all_by_user(cls, user_id):
         rows = execute_query(
-            "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo "
-            "FROM movimentos_bancarios WHERE user_id = %s ORDER BY data DESC, conta_bancaria_id",
+            "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo, "
+            "transferencia_id FROM movimentos_bancarios WHERE user_id = %s ORDER BY data DESC, conta_bancaria_id",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        if rows:
-            return [cls(row[0], row[1], row[2], row[3], row[4], Decimal(str(row[5])), row[6]) for row in rows]
-        return []
+        return rows
 
     @classmethod
-    def get_by_id(cls, movimento_id, user_id):
+    async def get_all_by_user_async(cls, user_id):
+        """
+        Versão assíncrona de get_all_by_user.
+        """
+        rows = await async_execute_query(
+            "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo, "
+            "transferencia_id FROM movimentos_bancarios WHERE user_id = %s ORDER BY data DESC, conta_bancaria_id",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+        return rows
+
+    @classmethod
+    def iter_by_user(cls, user_id, itersize=None):
+        """
+        Gerador equivalente a get_all_by_user, lendo os movimentos por um
+        cursor do servidor em lotes, sem montar a lista completa em memória.
+        """
+        return iter_query(
+            "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo, "
+            "transferencia_id FROM movimentos_bancarios WHERE user_id = %s ORDER BY data DESC, conta_bancaria_id",
+            (user_id,),
+            itersize=itersize,
+            row_factory=args_row(cls)
+        )
+
+    @classmethod
+    def get_by_id(cls, movimento_id, user_id, for_update=False, connection=None, cursor=None):
+        query = "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo, " \
+                "transferencia_id FROM movimentos_bancarios WHERE id = %s AND user_id = %s"
+        if for_update:
+            query += " FOR UPDATE"
         row = execute_query(
-            "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo "
-            "FROM movimentos_bancarios WHERE id = %s AND user_id = %s",
+            query,
             (movimento_id, user_id),
-            fetchone=True
+            fetchone=True,
+            connection=connection,
+            cursor=cursor,
+            row_factory=args_row(cls)
         )
-        if row:
-            row_list = list(row)
-            row_list[5] = Decimal(str(row_list[5]))
-            return cls(*row_list)
-        return None
+        return row
 
     @classmethod
     def add(cls, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo):
+        """
+        Insere o movimento e ajusta o saldo da conta na mesma transação.
+        A leitura da conta (com bloqueio) é a única ida ao servidor antes das
+        escritas; INSERT, UPDATE do saldo e COMMIT seguem juntos em modo pipeline.
+        """
         conn = None
         try:
             conn = open_connection()
             cursor = conn.cursor()
 
-            conta = ContaBancaria.get_by_id(conta_bancaria_id, user_id)
-            if not conta:
-                raise ValueError("Conta bancária não encontrada.")
+            with conn.pipeline():
+                conta = ContaBancaria.get_by_id(
+                    conta_bancaria_id, user_id, for_update=True, connection=conn, cursor=cursor)
+                if not conta:
+                    raise ValueError("Conta bancária não encontrada.")
 
-            if tipo == 'Receita':
-                ajuste_saldo = valor.copy_abs()
-            else:
-                ajuste_saldo = -valor.copy_abs()
+                if tipo == 'Receita':
+                    ajuste_saldo = valor.copy_abs()
+                else:
+                    ajuste_saldo = -valor.copy_abs()
 
-            saldo_projetado = conta.saldo_atual + ajuste_saldo
+                saldo_projetado = conta.saldo_atual + ajuste_saldo
 
-            if saldo_projetado < Decimal('0.00'):
-                if saldo_projetado < -conta.limite:
-                    conn.rollback()
-                    raise ValueError(
-                        f"Transação excede o limite de cheque especial. "
-                        f"Saldo atual: {conta.saldo_atual:.2f}, Limite: {conta.limite:.2f}, Saldo projetado: {saldo_projetado:.2f}"
-                    )
+                if saldo_projetado < Decimal('0.00'):
+                    if saldo_projetado < -conta.limite:
+                        raise ValueError(
+                            f"Transação excede o limite de cheque especial. "
+                            f"Saldo atual: {conta.saldo_atual:.2f}, Limite: {conta.limite:.2f}, Saldo projetado: {saldo_projetado:.2f}"
+                        )
 
-            insert_query = """
-                INSERT INTO movimentos_bancarios (user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo)
-                VALUES (%s, %s, %s, %s, %s, %s) RETURNING id;
-            """
-            cursor.execute(insert_query, (user_id, conta_bancaria_id,
-                           transacao_bancaria_id, data, valor, tipo))
-            movimento_id = cursor.fetchone()[0]
+                insert_query = """
+                    INSERT INTO movimentos_bancarios (user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo)
+                    VALUES (%s, %s, %s, %s, %s, %s) RETURNING id;
+                """
+                insert_cursor = conn.cursor()
+                insert_cursor.execute(insert_query, (user_id, conta_bancaria_id,
+                                      transacao_bancaria_id, data, valor, tipo))
 
-            ContaBancaria.update_saldo(
-                conta_bancaria_id, user_id, ajuste_saldo, connection=conn, cursor=cursor)
+                ContaBancaria.update_saldo(
+                    conta_bancaria_id, user_id, ajuste_saldo, connection=conn, cursor=cursor)
 
-            conn.commit()
+                conn.commit()
 
+            movimento_id = insert_cursor.fetchone()[0]
             return cls(movimento_id, user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo)
 
         except UniqueViolation as e:
@@ -140,141 +244,467 @@ class MovimentoBancario:
 
     @classmethod
     def update(cls, movimento_id, user_id, nova_conta_bancaria_id, nova_transacao_bancaria_id, nova_data, novo_valor, novo_tipo):
-        conn = None
-        try:
-            conn = open_connection()
-            cursor = conn.cursor()
+        """
+        Atualiza o movimento em um único comando: estorna o efeito antigo na
+        conta original, aplica o novo efeito na conta nova (que pode ser a
+        mesma) e grava o movimento. As contas envolvidas são bloqueadas no
+        próprio comando e o limite de cheque especial é conferido antes de
+        qualquer alteração — ou tudo é aplicado, ou nada.
+
+        Retorna (movimento, saldos), onde saldos mapeia o id de cada conta
+        alterada para o seu novo saldo_atual.
+        """
+        query = f"""
+            WITH antigo AS (
+                SELECT conta_bancaria_id, {EFEITO_SALDO_SQL} AS efeito
+                FROM movimentos_bancarios
+                WHERE id = %(movimento_id)s AND user_id = %(user_id)s
+                FOR UPDATE
+            ),
+            ajustes AS (
+                SELECT conta_id, SUM(ajuste) AS ajuste
+                FROM (
+                    SELECT conta_bancaria_id AS conta_id, -efeito AS ajuste FROM antigo
+                    UNION ALL
+                    SELECT %(conta_id)s::INTEGER,
+                           CASE WHEN %(tipo)s = 'Receita' THEN ABS(%(valor)s::NUMERIC)
+                                ELSE -ABS(%(valor)s::NUMERIC) END
+                    FROM antigo
+                ) a
+                GROUP BY conta_id
+            ),
+            contas AS (
+                SELECT c.id, c.banco, c.limite, a.ajuste,
+                       c.saldo_atual + a.ajuste AS saldo_projetado
+                FROM contas_bancarias c
+                JOIN ajustes a ON a.conta_id = c.id
+                WHERE c.user_id = %(user_id)s
+                FOR UPDATE OF c
+            ),
+            excedida AS (
+                SELECT banco, saldo_projetado, limite
+                FROM contas
+                WHERE ajuste < 0 AND saldo_projetado < -limite
+                LIMIT 1
+            ),
+            permitido AS (
+                SELECT (SELECT COUNT(*) FROM contas) = (SELECT COUNT(*) FROM ajustes)
+                       AND NOT EXISTS (SELECT 1 FROM excedida) AS ok
+            ),
+            saldos AS (
+                UPDATE contas_bancarias c
+                SET saldo_atual = c.saldo_atual + a.ajuste
+                FROM ajustes a, permitido p
+                WHERE c.id = a.conta_id AND c.user_id = %(user_id)s AND p.ok
+                RETURNING c.id, c.saldo_atual
+            ),
+            movimento AS (
+                UPDATE movimentos_bancarios m
+                SET conta_bancaria_id = %(conta_id)s, transacao_bancaria_id = %(transacao_id)s,
+                    data = %(data)s, valor = %(valor)s, tipo = %(tipo)s
+                FROM permitido p
+                WHERE m.id = %(movimento_id)s AND m.user_id = %(user_id)s AND p.ok
+                RETURNING m.id
+            )
+            SELECT EXISTS (SELECT 1 FROM antigo),
+                   (SELECT COUNT(*) FROM contas) = (SELECT COUNT(*) FROM ajustes),
+                   (SELECT banco FROM excedida),
+                   (SELECT saldo_projetado FROM excedida),
+                   (SELECT limite FROM excedida),
+                   EXISTS (SELECT 1 FROM movimento),
+                   ARRAY(SELECT id FROM saldos ORDER BY id),
+                   ARRAY(SELECT saldo_atual FROM saldos ORDER BY id);
+        """
+        params = {
+            'movimento_id': movimento_id,
+            'user_id': user_id,
+            'conta_id': nova_conta_bancaria_id,
+            'transacao_id': nova_transacao_bancaria_id,
+            'data': nova_data,
+            'valor': novo_valor,
+            'tipo': novo_tipo,
+        }
 
-            current_movimento = cls.get_by_id(movimento_id, user_id)
-            if not current_movimento:
-                raise ValueError(
-                    "Movimento bancário não encontrado para atualização ou não autorizado.")
-
-            conta_antiga = ContaBancaria.get_by_id(
-                current_movimento.conta_bancaria_id, user_id)
-            if not conta_antiga:
-                raise ValueError("Conta bancária original não encontrada.")
-
-            conta_nova = conta_antiga
-            if current_movimento.conta_bancaria_id != nova_conta_bancaria_id:
-                conta_nova = ContaBancaria.get_by_id(
-                    nova_conta_bancaria_id, user_id)
-                if not conta_nova:
-                    raise ValueError("Nova conta bancária não encontrada.")
-
-            if current_movimento.tipo == 'Receita':
-                ajuste_reverso_antigo = -current_movimento.valor.copy_abs()
-            else:
-                ajuste_reverso_antigo = current_movimento.valor.copy_abs()
-
-            if novo_tipo == 'Receita':
-                ajuste_novo_saldo = novo_valor.copy_abs()
-            else:
-                ajuste_novo_saldo = -novo_valor.copy_abs()
-
-            saldo_conta_antiga_apos_reversao = conta_antiga.saldo_atual + ajuste_reverso_antigo
-
-            if current_movimento.conta_bancaria_id != nova_conta_bancaria_id:
-                saldo_projetado_conta_nova = conta_nova.saldo_atual + ajuste_novo_saldo
-            else:
-                saldo_projetado_conta_nova = saldo_conta_antiga_apos_reversao + ajuste_novo_saldo
-
-            if saldo_projetado_conta_nova < Decimal('0.00'):
-                if saldo_projetado_conta_nova < -conta_nova.limite:
-                    conn.rollback()
-                    raise ValueError(
-                        f"Atualização excede o limite de cheque especial na conta '{conta_nova.nome_conta}'. "
-                        f"Saldo projetado: {saldo_projetado_conta_nova:.2f}, Limite: {conta_nova.limite:.2f}"
-                    )
-
-            ContaBancaria.update_saldo(current_movimento.conta_bancaria_id,
-                                       user_id, ajuste_reverso_antigo, connection=conn, cursor=cursor)
-
-            update_mov_query = """
-                UPDATE movimentos_bancarios
-                SET conta_bancaria_id = %s, transacao_bancaria_id = %s, data = %s, valor = %s, tipo = %s
-                WHERE id = %s AND user_id = %s;
-            """
-            cursor.execute(update_mov_query, (nova_conta_bancaria_id, nova_transacao_bancaria_id,
-                                              nova_data, novo_valor, novo_tipo, movimento_id, user_id))
-
-            if cursor.rowcount == 0:
-                raise ValueError(
-                    "Falha ao atualizar o registro do movimento bancário.")
-
-            ContaBancaria.update_saldo(
-                nova_conta_bancaria_id, user_id, ajuste_novo_saldo, connection=conn, cursor=cursor)
-
-            conn.commit()
-
-            return cls(movimento_id, user_id, nova_conta_bancaria_id, nova_transacao_bancaria_id, nova_data, novo_valor, novo_tipo)
-
-        except (UniqueViolation, ForeignKeyViolation) as e:
-            if conn:
-                conn.rollback()
-            if isinstance(e, UniqueViolation):
-                raise ValueError(
-                    "Erro: Já existe outro movimento bancário com esta combinação de dados para este usuário.") from e
-            else:
-                raise ValueError(
-                    "Erro: Nova Conta Bancária, Transação ou Usuário não encontrado.") from e
+        try:
+            (encontrado, contas_encontradas, banco_excedido, saldo_projetado, limite,
+             atualizado, contas_ids, contas_saldos) = execute_query(
+                query, params, fetchone=True, commit=True)
         except ValueError as e:
-            if conn:
-                conn.rollback()
-            raise e
+            raise ValueError(
+                "Erro: Já existe outro movimento bancário com esta combinação de dados para este usuário.") from e
+        except ForeignKeyViolation as e:
+            raise ValueError(
+                "Erro: Nova Conta Bancária, Transação ou Usuário não encontrado.") from e
         except Exception as e:
-            if conn:
-                conn.rollback()
             print(f"Erro ao atualizar movimento bancário: {e}")
             raise
 
-        finally:
-            if conn:
-                conn.close()
+        if not encontrado:
+            raise ValueError(
+                "Movimento bancário não encontrado para atualização ou não autorizado.")
+        if not contas_encontradas:
+            raise ValueError("Nova conta bancária não encontrada.")
+        if banco_excedido is not None:
+            raise ValueError(
+                f"Atualização excede o limite de cheque especial na conta '{banco_excedido}'. "
+                f"Saldo projetado: {saldo_projetado:.2f}, Limite: {limite:.2f}"
+            )
+        if not atualizado:
+            raise ValueError(
+                "Falha ao atualizar o registro do movimento bancário.")
+
+        movimento = cls(movimento_id, user_id, nova_conta_bancaria_id,
+                        nova_transacao_bancaria_id, nova_data, novo_valor, novo_tipo)
+        return movimento, dict(zip(contas_ids, contas_saldos))
 
     @classmethod
-    def delete(cls, movimento_id, user_id):
-        conn = None
-        try:
-            conn = open_connection()
-            cursor = conn.cursor()
+    def transferir(cls, user_id, conta_origem_id, conta_destino_id, data, valor):
+        """
+        Transfere 'valor' entre duas contas do usuário em um único comando:
+        bloqueia as duas contas (em ordem de id), confere o limite de cheque
+        especial da conta de origem, grava as duas pernas (uma Despesa na
+        origem e uma Receita no destino, ligadas pelo mesmo transferencia_id)
+        e ajusta os dois saldos — ou tudo é aplicado, ou nada. As transações
+        'Transferência enviada' (Débito) e 'Transferência recebida' (Crédito)
+        são criadas para o usuário na primeira transferência.
+
+        Retorna (transferencia_id, saldos), onde saldos mapeia o id de cada
+        conta para o seu novo saldo_atual.
+        """
+        if conta_origem_id == conta_destino_id:
+            raise ValueError("A conta de origem e a de destino devem ser diferentes.")
+        if not valor:
+            raise ValueError("O valor da transferência deve ser diferente de zero.")
 
-            movimento_a_deletar = cls.get_by_id(movimento_id, user_id)
-            if not movimento_a_deletar:
-                raise ValueError(
-                    "Movimento bancário não encontrado para exclusão ou não autorizado.")
+        query = """
+            WITH contas AS (
+                SELECT id, banco, limite, saldo_atual, id = %(origem_id)s AS origem,
+                       CASE WHEN id = %(origem_id)s THEN -ABS(%(valor)s::NUMERIC)
+                            ELSE ABS(%(valor)s::NUMERIC) END AS ajuste
+                FROM contas_bancarias
+                WHERE id IN (%(origem_id)s, %(destino_id)s) AND user_id = %(user_id)s
+                ORDER BY id
+                FOR UPDATE
+            ),
+            excedida AS (
+                SELECT banco, saldo_atual + ajuste AS saldo_projetado, limite
+                FROM contas
+                WHERE origem AND saldo_atual + ajuste < -limite
+            ),
+            permitido AS (
+                SELECT (SELECT COUNT(*) FROM contas) = 2
+                       AND NOT EXISTS (SELECT 1 FROM excedida) AS ok
+            ),
+            transacoes AS (
+                INSERT INTO transacoes_bancarias (user_id, transacao, tipo)
+                SELECT %(user_id)s, t.transacao, t.tipo
+                FROM (VALUES ('Transferência enviada', 'Débito'),
+                             ('Transferência recebida', 'Crédito')) AS t(transacao, tipo),
+                     permitido p
+                WHERE p.ok
+                ON CONFLICT (user_id, transacao, tipo) DO UPDATE SET transacao = EXCLUDED.transacao
+                RETURNING id, tipo
+            ),
+            grupo AS MATERIALIZED (
+                SELECT gen_random_uuid() AS id
+            ),
+            pernas AS (
+                INSERT INTO movimentos_bancarios
+                    (user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo, transferencia_id)
+                SELECT %(user_id)s, c.id, t.id, %(data)s, c.ajuste,
+                       CASE WHEN c.origem THEN 'Despesa' ELSE 'Receita' END, g.id
+                FROM contas c
+                JOIN transacoes t ON t.tipo = CASE WHEN c.origem THEN 'Débito' ELSE 'Crédito' END
+                CROSS JOIN grupo g
+                RETURNING id
+            ),
+            saldos AS (
+                UPDATE contas_bancarias c
+                SET saldo_atual = c.saldo_atual + x.ajuste
+                FROM contas x, permitido p
+                WHERE c.id = x.id AND p.ok
+                RETURNING c.id, c.saldo_atual
+            )
+            SELECT (SELECT COUNT(*) FROM contas) = 2,
+                   (SELECT banco FROM excedida),
+                   (SELECT saldo_projetado FROM excedida),
+                   (SELECT limite FROM excedida),
+                   (SELECT COUNT(*) FROM pernas) = 2,
+                   (SELECT id FROM grupo),
+                   ARRAY(SELECT id FROM saldos ORDER BY id),
+                   ARRAY(SELECT saldo_atual FROM saldos ORDER BY id);
+        """
+        params = {
+            'user_id': user_id,
+            'origem_id': conta_origem_id,
+            'destino_id': conta_destino_id,
+            'data': data,
+            'valor': valor,
+        }
 
-            if movimento_a_deletar.tipo == 'Receita':
-                ajuste_reverso = -movimento_a_deletar.valor.copy_abs()
-            else:
-                ajuste_reverso = movimento_a_deletar.valor.copy_abs()
+        try:
+            (contas_encontradas, banco_excedido, saldo_projetado, limite,
+             gravada, transferencia_id, contas_ids, contas_saldos) = execute_query(
+                query, params, fetchone=True, commit=True)
+        except ValueError as e:
+            raise ValueError(
+                "Erro: Já existe uma transferência com estes dados nesta data.") from e
+        except Exception as e:
+            print(f"Erro ao transferir entre contas bancárias: {e}")
+            raise
 
-            ContaBancaria.update_saldo(
-                movimento_a_deletar.conta_bancaria_id, user_id, ajuste_reverso, connection=conn, cursor=cursor)
+        if not contas_encontradas:
+            raise ValueError("Conta de origem ou de destino não encontrada.")
+        if banco_excedido is not None:
+            raise ValueError(
+                f"Transferência excede o limite de cheque especial na conta '{banco_excedido}'. "
+                f"Saldo projetado: {saldo_projetado:.2f}, Limite: {limite:.2f}"
+            )
+        if not gravada:
+            raise ValueError("Falha ao gravar a transferência.")
 
-            delete_query = "DELETE FROM movimentos_bancarios WHERE id = %s AND user_id = %s;"
-            cursor.execute(delete_query, (movimento_id, user_id))
+        return transferencia_id, dict(zip(contas_ids, contas_saldos))
 
-            if cursor.rowcount == 0:
-                raise ValueError(
-                    "Falha ao deletar o registro do movimento bancário.")
+    @classmethod
+    def update_transferencia(cls, movimento_id, user_id, nova_conta_bancaria_id, nova_data, novo_valor):
+        """
+        Atualiza uma perna de transferência e a outra perna junto, em um único
+        comando: a perna editada pode mudar de conta; data e valor (com o sinal
+        de cada perna) valem para as duas. Os efeitos antigos são estornados e
+        os novos aplicados por conta, com as contas bloqueadas e o limite de
+        cheque especial conferido antes de qualquer alteração.
 
-            conn.commit()
-            return True
+        Retorna (movimento, saldos), como update().
+        """
+        query = f"""
+            WITH antigos AS (
+                SELECT m.id, m.conta_bancaria_id, m.transacao_bancaria_id, m.tipo,
+                       {EFEITO_SALDO_SQL} AS efeito,
+                       CASE WHEN m.id = %(movimento_id)s THEN %(conta_id)s::INTEGER
+                            ELSE m.conta_bancaria_id END AS nova_conta,
+                       CASE WHEN m.tipo = 'Receita' THEN ABS(%(valor)s::NUMERIC)
+                            ELSE -ABS(%(valor)s::NUMERIC) END AS novo_valor
+                FROM movimentos_bancarios m
+                WHERE m.user_id = %(user_id)s
+                  AND m.transferencia_id = (
+                      SELECT transferencia_id FROM movimentos_bancarios
+                      WHERE id = %(movimento_id)s AND user_id = %(user_id)s)
+                FOR UPDATE OF m
+            ),
+            ajustes AS (
+                SELECT conta_id, SUM(ajuste) AS ajuste
+                FROM (
+                    SELECT conta_bancaria_id AS conta_id, -efeito AS ajuste FROM antigos
+                    UNION ALL
+                    SELECT nova_conta, novo_valor FROM antigos
+                ) a
+                GROUP BY conta_id
+            ),
+            contas AS (
+                SELECT c.id, c.banco, c.limite, a.ajuste,
+                       c.saldo_atual + a.ajuste AS saldo_projetado
+                FROM contas_bancarias c
+                JOIN ajustes a ON a.conta_id = c.id
+                WHERE c.user_id = %(user_id)s
+                ORDER BY c.id
+                FOR UPDATE OF c
+            ),
+            excedida AS (
+                SELECT banco, saldo_projetado, limite
+                FROM contas
+                WHERE ajuste < 0 AND saldo_projetado < -limite
+                LIMIT 1
+            ),
+            distintas AS (
+                SELECT COUNT(DISTINCT nova_conta) = 2 AS ok FROM antigos
+            ),
+            permitido AS (
+                SELECT (SELECT COUNT(*) FROM contas) = (SELECT COUNT(*) FROM ajustes)
+                       AND (SELECT ok FROM distintas)
+                       AND NOT EXISTS (SELECT 1 FROM excedida) AS ok
+            ),
+            saldos AS (
+                UPDATE contas_bancarias c
+                SET saldo_atual = c.saldo_atual + a.ajuste
+                FROM ajustes a, permitido p
+                WHERE c.id = a.conta_id AND c.user_id = %(user_id)s AND p.ok
+                RETURNING c.id, c.saldo_atual
+            ),
+            pernas AS (
+                UPDATE movimentos_bancarios m
+                SET conta_bancaria_id = a.nova_conta, data = %(data)s, valor = a.novo_valor
+                FROM antigos a, permitido p
+                WHERE m.id = a.id AND p.ok
+                RETURNING m.id
+            )
+            SELECT EXISTS (SELECT 1 FROM antigos),
+                   (SELECT COUNT(*) FROM contas) = (SELECT COUNT(*) FROM ajustes),
+                   (SELECT ok FROM distintas),
+                   (SELECT banco FROM excedida),
+                   (SELECT saldo_projetado FROM excedida),
+                   (SELECT limite FROM excedida),
+                   (SELECT COUNT(*) FROM pernas) = 2,
+                   (SELECT transacao_bancaria_id FROM antigos WHERE id = %(movimento_id)s),
+                   (SELECT tipo FROM antigos WHERE id = %(movimento_id)s),
+                   (SELECT novo_valor FROM antigos WHERE id = %(movimento_id)s),
+                   ARRAY(SELECT id FROM saldos ORDER BY id),
+                   ARRAY(SELECT saldo_atual FROM saldos ORDER BY id);
+        """
+        params = {
+            'movimento_id': movimento_id,
+            'user_id': user_id,
+            'conta_id': nova_conta_bancaria_id,
+            'data': nova_data,
+            'valor': novo_valor,
+        }
 
+        try:
+            (encontrado, contas_encontradas, contas_distintas, banco_excedido, saldo_projetado,
+             limite, atualizado, transacao_id, tipo, valor, contas_ids, contas_saldos) = execute_query(
+                query, params, fetchone=True, commit=True)
         except ValueError as e:
-            if conn:
-                conn.rollback()
-            raise e
+            raise ValueError(
+                "Erro: Já existe outro movimento bancário com esta combinação de dados para este usuário.") from e
+        except Exception as e:
+            print(f"Erro ao atualizar transferência: {e}")
+            raise
+
+        if not encontrado:
+            raise ValueError(
+                "Transferência não encontrada para atualização ou não autorizada.")
+        if not contas_encontradas:
+            raise ValueError("Nova conta bancária não encontrada.")
+        if not contas_distintas:
+            raise ValueError("A conta de origem e a de destino devem ser diferentes.")
+        if banco_excedido is not None:
+            raise ValueError(
+                f"Atualização excede o limite de cheque especial na conta '{banco_excedido}'. "
+                f"Saldo projetado: {saldo_projetado:.2f}, Limite: {limite:.2f}"
+            )
+        if not atualizado:
+            raise ValueError("Falha ao atualizar as pernas da transferência.")
+
+        movimento = cls(movimento_id, user_id, nova_conta_bancaria_id, transacao_id,
+                        nova_data, valor, tipo)
+        return movimento, dict(zip(contas_ids, contas_saldos))
+
+    @classmethod
+    def delete(cls, movimento_id, user_id):
+        """
+        Deleta um movimento bancário e estorna seu efeito no saldo da conta
+        em um único comando (DELETE ... RETURNING encadeado com o UPDATE do saldo).
+        Se o movimento for uma perna de transferência, a outra perna também é
+        deletada e o saldo das duas contas é estornado.
+
+        Retorna a lista de ids dos movimentos deletados (dois, para uma
+        transferência).
+        """
+        query = f"""
+            WITH alvo AS (
+                SELECT id, transferencia_id
+                FROM movimentos_bancarios
+                WHERE id = %(movimento_id)s AND user_id = %(user_id)s
+            ),
+            removidos AS (
+                DELETE FROM movimentos_bancarios m
+                USING alvo a
+                WHERE m.user_id = %(user_id)s
+                  AND (m.id = a.id OR m.transferencia_id = a.transferencia_id)
+                RETURNING m.id, m.conta_bancaria_id, {EFEITO_SALDO_SQL} AS efeito
+            ),
+            ajustes AS (
+                SELECT conta_bancaria_id, SUM(efeito) AS efeito
+                FROM removidos
+                GROUP BY conta_bancaria_id
+            ),
+            atualizadas AS (
+                UPDATE contas_bancarias c
+                SET saldo_atual = c.saldo_atual - a.efeito
+                FROM ajustes a
+                WHERE c.id = a.conta_bancaria_id AND c.user_id = %(user_id)s
+                RETURNING c.id
+            )
+            SELECT ARRAY(SELECT id FROM removidos ORDER BY id);
+        """
+        try:
+            removidos, = execute_query(
+                query, {'movimento_id': movimento_id, 'user_id': user_id},
+                fetchone=True, commit=True)
         except Exception as e:
-            if conn:
-                conn.rollback()
             print(f"Erro ao deletar movimento bancário: {e}")
             raise
 
-        finally:
-            if conn:
-                conn.close()
+        if not removidos:
+            raise ValueError(
+                "Movimento bancário não encontrado para exclusão ou não autorizado.")
+        return removidos
+
+    @classmethod
+    def delete_many(cls, movimento_ids, user_id):
+        """
+        Deleta vários movimentos de uma vez e estorna, por conta, a soma dos
+        seus efeitos no saldo — um único comando, em uma transação. Pernas de
+        transferência levam junto a outra perna. Retorna a quantidade de
+        movimentos deletados.
+        """
+        query = f"""
+            WITH removidos AS (
+                DELETE FROM movimentos_bancarios
+                WHERE user_id = %(user_id)s
+                  AND (id = ANY(%(ids)s) OR transferencia_id IN (
+                      SELECT transferencia_id FROM movimentos_bancarios
+                      WHERE user_id = %(user_id)s AND id = ANY(%(ids)s)
+                        AND transferencia_id IS NOT NULL))
+                RETURNING conta_bancaria_id, {EFEITO_SALDO_SQL} AS efeito
+            ),
+            ajustes AS (
+                SELECT conta_bancaria_id, SUM(efeito) AS efeito, COUNT(*) AS quantidade
+                FROM removidos
+                GROUP BY conta_bancaria_id
+            ),
+            contas AS (
+                UPDATE contas_bancarias c
+                SET saldo_atual = c.saldo_atual - a.efeito
+                FROM ajustes a
+                WHERE c.id = a.conta_bancaria_id AND c.user_id = %(user_id)s
+            )
+            SELECT COALESCE(SUM(quantidade), 0) FROM ajustes;
+        """
+        try:
+            result = execute_query(
+                query, {'user_id': user_id, 'ids': list(movimento_ids)}, fetchone=True, commit=True)
+        except Exception as e:
+            print(f"Erro ao deletar movimentos bancários em lote: {e}")
+            raise
+        return int(result[0])
+
+    @classmethod
+    def update_transacao_many(cls, movimento_ids, user_id, transacao_bancaria_id):
+        """
+        Recategoriza vários movimentos para a transação informada em um único
+        UPDATE. Só são alterados os movimentos cujo tipo corresponde ao da
+        transação (Crédito -> Receita, Débito -> Despesa), para não mudar o
+        efeito dos movimentos no saldo; pernas de transferência são mantidas.
+        Retorna a quantidade alterada.
+        """
+        query = """
+            UPDATE movimentos_bancarios m
+            SET transacao_bancaria_id = t.id
+            FROM transacoes_bancarias t
+            WHERE t.id = %s AND t.user_id = %s
+              AND m.user_id = %s AND m.id = ANY(%s)
+              AND m.tipo = CASE t.tipo WHEN 'Crédito' THEN 'Receita' ELSE 'Despesa' END
+              AND m.transferencia_id IS NULL
+            RETURNING m.id;
+        """
+        try:
+            rows = execute_query(
+                query, (transacao_bancaria_id, user_id, user_id, list(movimento_ids)),
+                fetchall=True, commit=True)
+        except Exception as e:
+            print(f"Erro ao recategorizar movimentos bancários: {e}")
+            raise
+        return len(rows)
 
     @classmethod
     def get_by_account_and_month(cls, user_id, conta_bancaria_id, year, month):
@@ -288,15 +718,10 @@ class MovimentoBancario:
             "FROM movimentos_bancarios WHERE user_id = %s AND conta_bancaria_id = %s "
             "AND data >= %s AND data < %s ORDER BY data, id",
             (user_id, conta_bancaria_id, start_date, end_date_exclusive),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        if rows:
-            return [
-                cls(row[0], row[1], row[2], row[3],
-                    row[4], Decimal(str(row[5])), row[6])
-                for row in rows
-            ]
-        return []
+        return rows
 
     @classmethod
     def get_balance_up_to_date(cls, user_id, conta_bancaria_id, end_date_exclusive):
@@ -307,8 +732,8 @@ class MovimentoBancario:
         initial_balance_from_account = conta.saldo_inicial if conta.saldo_inicial is not None else Decimal(
             '0.00')
 
-        query = """
-        SELECT SUM(CASE WHEN tipo = 'Receita' THEN valor ELSE -valor END)
+        query = f"""
+        SELECT SUM({EFEITO_SALDO_SQL})
         FROM movimentos_bancarios
         WHERE user_id = %s AND conta_bancaria_id = %s AND data < %s;
         """
@@ -320,3 +745,75 @@ class MovimentoBancario:
             '0.00')
 
         return initial_balance_from_account + movements_balance
+
+    @staticmethod
+    def _extrato_query(user_id, data_inicio, data_fim, conta_bancaria_id):
+        """
+        Monta a consulta do extrato entre data_inicio e data_fim (inclusive)
+        de uma conta ou, com conta_bancaria_id=None, de todas as contas do
+        usuário (extrato consolidado). O saldo de abertura (saldos iniciais +
+        movimentos anteriores ao período) vem na primeira coluna de todas as
+        linhas, e o saldo de cada linha é calculado pela função de janela
+        SUM() OVER (ORDER BY data, id) a partir dele. Sem movimentos no
+        período, retorna uma única linha com as demais colunas nulas.
+        """
+        query = f"""
+            WITH contas AS (
+                SELECT id, banco, saldo_inicial
+                FROM contas_bancarias
+                WHERE user_id = %(user_id)s
+                  AND (%(conta_id)s::integer IS NULL OR id = %(conta_id)s)
+            ), anteriores AS (
+                SELECT SUM({EFEITO_SALDO_SQL}) AS total
+                FROM movimentos_bancarios
+                WHERE conta_bancaria_id IN (SELECT id FROM contas) AND data < %(inicio)s
+            ), abertura AS (
+                SELECT COALESCE((SELECT SUM(saldo_inicial) FROM contas), 0)
+                       + COALESCE((SELECT total FROM anteriores), 0) AS saldo
+            ), periodo AS (
+                SELECT id, conta_bancaria_id, transacao_bancaria_id, data, tipo,
+                       {EFEITO_SALDO_SQL} AS efeito
+                FROM movimentos_bancarios
+                WHERE conta_bancaria_id IN (SELECT id FROM contas)
+                  AND data >= %(inicio)s AND data <= %(fim)s
+            )
+            SELECT a.saldo, p.id, p.data, p.conta_bancaria_id, c.banco, t.transacao, p.tipo, p.efeito,
+                   a.saldo + SUM(p.efeito) OVER (ORDER BY p.data, p.id)
+            FROM abertura a
+            LEFT JOIN (
+                periodo p
+                JOIN contas c ON c.id = p.conta_bancaria_id
+                JOIN transacoes_bancarias t ON t.id = p.transacao_bancaria_id
+            ) ON TRUE
+            ORDER BY p.data, p.id
+        """
+        params = {
+            'user_id': user_id, 'conta_id': conta_bancaria_id,
+            'inicio': data_inicio, 'fim': data_fim,
+        }
+        return query, params
+
+    @staticmethod
+    def _montar_extrato(rows):
+        if not rows:
+            return Decimal('0.00'), []
+        linhas = [LinhaExtrato(*row[1:]) for row in rows if row[1] is not None]
+        return rows[0][0], linhas
+
+    @classmethod
+    def get_extrato(cls, user_id, data_inicio, data_fim, conta_bancaria_id=None):
+        """
+        Retorna (saldo_abertura, linhas) do extrato do período, em uma consulta.
+        """
+        query, params = cls._extrato_query(
+            user_id, data_inicio, data_fim, conta_bancaria_id)
+        return cls._montar_extrato(execute_query(query, params, fetchall=True))
+
+    @classmethod
+    async def get_extrato_async(cls, user_id, data_inicio, data_fim, conta_bancaria_id=None):
+        """
+        Versão assíncrona de get_extrato.
+        """
+        query, params = cls._extrato_query(
+            user_id, data_inicio, data_fim, conta_bancaria_id)
+        return cls._montar_extrato(await async_execute_query(query, params, fetchall=True))
@@ -1,12 +1,13 @@
 # models/movimento_crediario_model.py
 
-from database.db_manager import execute_query
-from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from database.db_manager import execute_query, iter_query, open_connection
+from database.async_db_manager import async_execute_query
+from psycopg.errors import UniqueViolation, ForeignKeyViolation, CheckViolation
+from psycopg.rows import args_row
 from decimal import Decimal
 from datetime import date
 from dateutil.relativedelta import relativedelta
 from models.parcela_crediario_model import ParcelaCrediario
-from calendar import monthrange
 
 
 class MovimentoCrediario:
@@ -14,6 +15,13 @@ class MovimentoCrediario:
     Representa um movimento de crediário (parcelado) de um usuário no sistema.
     """
 
+    __slots__ = (
+        'id', 'user_id', 'grupo_crediario_id', 'crediario_id', 'data_compra',
+        'descricao', 'valor_total', 'num_parcelas', 'primeira_parcela',
+        'ultima_parcela', 'valor_parcela_mensal', 'grupo_detalhes',
+        'crediario_detalhes', 'data_compra_formatada'
+    )
+
     def __init__(self, id, user_id, grupo_crediario_id, crediario_id, data_compra, descricao,
                  valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal):
         self.id = id
@@ -27,6 +35,10 @@ class MovimentoCrediario:
         self.primeira_parcela = primeira_parcela
         self.ultima_parcela = ultima_parcela
         self.valor_parcela_mensal = valor_parcela_mensal
+        # Dados complementares, preenchidos pelas rotas
+        self.grupo_detalhes = None
+        self.crediario_detalhes = None
+        self.data_compra_formatada = None
 
     @staticmethod
     def create_table():
@@ -77,23 +89,76 @@ class MovimentoCrediario:
             "valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal "
             "FROM movimentos_crediario WHERE user_id = %s ORDER BY data_compra DESC",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
-    def get_by_id(cls, movimento_id, user_id):
+    def get_by_id(cls, movimento_id, user_id, for_update=False, connection=None, cursor=None):
         """
         Retorna um movimento de crediário pelo seu ID e ID do usuário.
+        Com connection/cursor, a leitura é feita na transação do chamador.
         """
+        query = "SELECT id, user_id, grupo_crediario_id, crediario_id, data_compra, descricao, " \
+                "valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal " \
+                "FROM movimentos_crediario WHERE id = %s AND user_id = %s"
+        if for_update:
+            query += " FOR UPDATE"
         row = execute_query(
+            query,
+            (movimento_id, user_id),
+            fetchone=True,
+            connection=connection,
+            cursor=cursor,
+            row_factory=args_row(cls)
+        )
+        return row
+
+    @classmethod
+    async def get_all_by_user_async(cls, user_id):
+        """
+        Versão assíncrona de get_all_by_user.
+        """
+        rows = await async_execute_query(
+            "SELECT id, user_id, grupo_crediario_id, crediario_id, data_compra, descricao, "
+            "valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal "
+            "FROM movimentos_crediario WHERE user_id = %s ORDER BY data_compra DESC",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+        return rows
+
+    @classmethod
+    def iter_by_user(cls, user_id, itersize=None):
+        """
+        Gerador equivalente a get_all_by_user, lendo os movimentos por um
+        cursor do servidor em lotes, sem montar a lista completa em memória.
+        """
+        return iter_query(
+            "SELECT id, user_id, grupo_crediario_id, crediario_id, data_compra, descricao, "
+            "valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal "
+            "FROM movimentos_crediario WHERE user_id = %s ORDER BY data_compra DESC",
+            (user_id,),
+            itersize=itersize,
+            row_factory=args_row(cls)
+        )
+
+    @classmethod
+    async def get_by_id_async(cls, movimento_id, user_id):
+        """
+        Versão assíncrona de get_by_id.
+        """
+        row = await async_execute_query(
             "SELECT id, user_id, grupo_crediario_id, crediario_id, data_compra, descricao, "
             "valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal "
             "FROM movimentos_crediario WHERE id = %s AND user_id = %s",
             (movimento_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
         )
-        return cls(*row) if row else None
+        return row
 
     @classmethod
     def _calculate_derived_fields(cls, valor_total, num_parcelas, primeira_parcela):
@@ -120,121 +185,309 @@ class MovimentoCrediario:
             valor_total, num_parcelas, primeira_parcela):
         """
         Adiciona um novo movimento de crediário, calcula os campos derivados
-        e gera as parcelas associadas.
+        e gera as parcelas associadas, tudo em uma única transação. Em modo
+        pipeline, as parcelas e o COMMIT são enviados juntos logo após o INSERT.
         """
+        conn = None
         try:
             ultima_parcela, valor_parcela_mensal = cls._calculate_derived_fields(
                 valor_total, num_parcelas, primeira_parcela
             )
 
-            result = execute_query(
-                "INSERT INTO movimentos_crediario (user_id, grupo_crediario_id, crediario_id, data_compra, descricao, "
-                "valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal) "
-                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id",
-                (user_id, grupo_crediario_id, crediario_id, data_compra, descricao,
-                 valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal),
-                fetchone=True,
-                commit=True
-            )
-            if result:
-                movimento_id_inserido = result[0]
-
-                dia_base_parcela = data_compra.day
-
-                for i in range(num_parcelas):
-                    mes_parcela = primeira_parcela.month + i
-                    ano_parcela = primeira_parcela.year + \
-                        (mes_parcela - 1) // 12
-                    mes_parcela = (mes_parcela - 1) % 12 + 1
-
-                    max_dia_mes = monthrange(ano_parcela, mes_parcela)[1]
-                    dia_ajustado = min(dia_base_parcela, max_dia_mes)
-
-                    ParcelaCrediario.add(
-                        movimento_crediario_id=movimento_id_inserido,
-                        numero_parcela=i + 1,
-                        vencimento_mes=mes_parcela,
-                        vencimento_ano=ano_parcela,
-                        valor_parcela=valor_parcela_mensal
-                    )
+            conn = open_connection()
+            cursor = conn.cursor()
+
+            with conn.pipeline():
+                cursor.execute(
+                    "INSERT INTO movimentos_crediario (user_id, grupo_crediario_id, crediario_id, data_compra, descricao, "
+                    "valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id",
+                    (user_id, grupo_crediario_id, crediario_id, data_compra, descricao,
+                     valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal)
+                )
+                movimento_id_inserido = cursor.fetchone()[0]
+
+                ParcelaCrediario.gerar(
+                    movimento_id_inserido, num_parcelas, primeira_parcela, valor_parcela_mensal,
+                    connection=conn, cursor=cursor
+                )
+                conn.commit()
 
-                return cls(movimento_id_inserido, user_id, grupo_crediario_id, crediario_id, data_compra,
-                           descricao, valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal)
-            return None
+            return cls(movimento_id_inserido, user_id, grupo_crediario_id, crediario_id, data_compra,
+                       descricao, valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal)
         except UniqueViolation as e:
+            if conn:
+                conn.rollback()
             raise ValueError(
                 "Erro: Já existe um movimento de crediário com esta combinação de dados para este usuário."
             ) from e
         except ForeignKeyViolation as e:
+            if conn:
+                conn.rollback()
             raise ValueError(
                 "Erro: Grupo de Crediário, Crediário ou Usuário não encontrado."
             ) from e
         except Exception as e:
+            if conn:
+                conn.rollback()
             print(f"Erro ao adicionar movimento de crediário: {e}")
             raise
+        finally:
+            if conn:
+                conn.close()
 
     @classmethod
     def update(cls, movimento_id, user_id, grupo_crediario_id, crediario_id, data_compra, descricao,
                valor_total, num_parcelas, primeira_parcela):
         """
-        Atualiza um movimento de crediário existente, recalcula os campos derivados
-        e atualiza as parcelas associadas (deletando e recriando).
+        Atualiza um movimento de crediário existente. O UPDATE, a exclusão e a
+        recriação das parcelas e o COMMIT seguem juntos em modo pipeline.
+        As parcelas (e os campos derivados ultima_parcela e valor_parcela_mensal)
+        só são recalculadas se o valor, o número de parcelas ou a primeira
+        parcela mudarem, e nunca se alguma delas já estiver paga; caso
+        contrário, os valores gravados são mantidos.
         """
-        existing_movimento = cls.get_by_id(movimento_id, user_id)
-        if not existing_movimento:
-            return None
-
+        conn = None
         try:
-            ultima_parcela, valor_parcela_mensal = cls._calculate_derived_fields(
-                valor_total, num_parcelas, primeira_parcela
-            )
+            conn = open_connection()
+            cursor = conn.cursor()
+
+            with conn.pipeline():
+                existing_movimento = cls.get_by_id(
+                    movimento_id, user_id, for_update=True, connection=conn, cursor=cursor)
+                if not existing_movimento:
+                    return None
+
+                recriar_parcelas = (
+                    (existing_movimento.valor_total, existing_movimento.num_parcelas,
+                     existing_movimento.primeira_parcela)
+                    != (valor_total, num_parcelas, primeira_parcela))
+                if recriar_parcelas:
+                    cursor.execute(
+                        "SELECT EXISTS (SELECT 1 FROM parcelas_crediario "
+                        "WHERE movimento_crediario_id = %s AND paga_em IS NOT NULL)",
+                        (movimento_id,))
+                    if cursor.fetchone()[0]:
+                        raise ValueError(
+                            "Este movimento tem parcelas pagas; o valor, o número de parcelas "
+                            "e a primeira parcela não podem mais ser alterados.")
+                    ultima_parcela, valor_parcela_mensal = cls._calculate_derived_fields(
+                        valor_total, num_parcelas, primeira_parcela
+                    )
+                else:
+                    # As parcelas gravadas continuam valendo (após uma renegociação
+                    # elas não seguem a divisão padrão), assim como os campos derivados.
+                    ultima_parcela = existing_movimento.ultima_parcela
+                    valor_parcela_mensal = existing_movimento.valor_parcela_mensal
+
+                query = "UPDATE movimentos_crediario SET grupo_crediario_id = %s, crediario_id = %s, " \
+                        "data_compra = %s, descricao = %s, valor_total = %s, num_parcelas = %s, " \
+                        "primeira_parcela = %s, ultima_parcela = %s, valor_parcela_mensal = %s " \
+                        "WHERE id = %s AND user_id = %s"
+
+                params = (grupo_crediario_id, crediario_id, data_compra, descricao,
+                          valor_total, num_parcelas, primeira_parcela, ultima_parcela,
+                          valor_parcela_mensal, movimento_id, user_id)
 
-            query = "UPDATE movimentos_crediario SET grupo_crediario_id = %s, crediario_id = %s, " \
-                    "data_compra = %s, descricao = %s, valor_total = %s, num_parcelas = %s, " \
-                    "primeira_parcela = %s, ultima_parcela = %s, valor_parcela_mensal = %s " \
-                    "WHERE id = %s AND user_id = %s"
-
-            params = (grupo_crediario_id, crediario_id, data_compra, descricao,
-                      valor_total, num_parcelas, primeira_parcela, ultima_parcela,
-                      valor_parcela_mensal, movimento_id, user_id)
-
-            if execute_query(query, params, commit=True):
-                if not ParcelaCrediario.delete_by_movimento_id(movimento_id):
-                    raise Exception(
-                        "Falha ao deletar parcelas existentes para o movimento de crediário.")
-
-                dia_base_parcela = data_compra.day
-
-                for i in range(num_parcelas):
-                    mes_parcela = primeira_parcela.month + i
-                    ano_parcela = primeira_parcela.year + \
-                        (mes_parcela - 1) // 12
-                    mes_parcela = (mes_parcela - 1) % 12 + 1
-
-                    max_dia_mes = monthrange(ano_parcela, mes_parcela)[1]
-                    dia_ajustado = min(dia_base_parcela, max_dia_mes)
-
-                    ParcelaCrediario.add(
-                        movimento_crediario_id=movimento_id,
-                        numero_parcela=i + 1,
-                        vencimento_mes=mes_parcela,
-                        vencimento_ano=ano_parcela,
-                        valor_parcela=valor_parcela_mensal
+                cursor.execute(query, params)
+                if recriar_parcelas:
+                    ParcelaCrediario.delete_by_movimento_id(
+                        movimento_id, connection=conn, cursor=cursor)
+                    ParcelaCrediario.gerar(
+                        movimento_id, num_parcelas, primeira_parcela, valor_parcela_mensal,
+                        connection=conn, cursor=cursor
                     )
-                return cls(movimento_id, user_id, grupo_crediario_id, crediario_id, data_compra,
-                           descricao, valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal)
-            return None
+                conn.commit()
+
+            return cls(movimento_id, user_id, grupo_crediario_id, crediario_id, data_compra,
+                       descricao, valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal)
         except UniqueViolation as e:
+            if conn:
+                conn.rollback()
             raise ValueError(
                 "Erro: Já existe outro movimento de crediário com esta combinação de dados para este usuário."
             ) from e
         except ForeignKeyViolation as e:
+            if conn:
+                conn.rollback()
             raise ValueError(
                 "Erro: Grupo de Crediário, Crediário ou Usuário não encontrado."
             ) from e
         except Exception as e:
+            if conn:
+                conn.rollback()
             print(f"Erro ao atualizar movimento de crediário: {e}")
             raise
+        finally:
+            if conn:
+                conn.close()
+
+    @classmethod
+    def renegociar(cls, movimento_id, user_id, num_parcelas, mes_inicio, taxa_desconto=None):
+        """
+        Renegocia as parcelas restantes de um movimento (as que vencem a partir
+        de mes_inicio, que não pode ser anterior ao mês atual) em um único
+        comando: o saldo restante é trazido a valor presente em mes_inicio pela
+        taxa de desconto mensal (em %, opcional) e redistribuído em num_parcelas
+        parcelas mensais iguais a partir de mes_inicio (tabela Price com a mesma
+        taxa; sem taxa, o saldo é dividido igualmente). A última parcela absorve
+        o arredondamento. As parcelas existentes são reaproveitadas por UPDATE,
+        as que sobram são removidas por DELETE e as que faltam são criadas por
+        INSERT; as parcelas anteriores a mes_inicio não são tocadas.
+        num_parcelas, ultima_parcela, valor_total (soma das parcelas) e
+        valor_parcela_mensal (valor da nova parcela) do movimento são
+        atualizados na mesma transação, assim como primeira_parcela quando a
+        parcela 1 está entre as renegociadas (compra cuja primeira parcela
+        ainda não venceu).
+
+        Retorna (movimento, saldo_nominal, saldo_presente).
+        """
+        if num_parcelas < 1:
+            raise ValueError("O número de parcelas deve ser maior que zero.")
+        hoje = date.today()
+        mes_inicio = mes_inicio.replace(day=1)
+        if mes_inicio < hoje.replace(day=1):
+            raise ValueError("A renegociação não pode começar em um mês anterior ao atual.")
+        taxa = (Decimal(taxa_desconto) if taxa_desconto else Decimal('0')) / 100
+        if taxa < 0:
+            raise ValueError("A taxa de desconto não pode ser negativa.")
+
+        query = """
+            WITH mov AS (
+                SELECT id
+                FROM movimentos_crediario
+                WHERE id = %(movimento_id)s AND user_id = %(user_id)s
+                FOR UPDATE
+            ),
+            restantes AS (
+                SELECT p.id, p.numero_parcela, p.valor_parcela, p.paga_em,
+                       p.vencimento_ano * 12 + p.vencimento_mes - 1 - %(mes_ref)s AS meses
+                FROM parcelas_crediario p
+                JOIN mov ON mov.id = p.movimento_crediario_id
+                WHERE p.vencimento_ano * 12 + p.vencimento_mes - 1 >= %(mes_ref)s
+                FOR UPDATE OF p
+            ),
+            saldo AS (
+                SELECT MIN(numero_parcela) AS primeira,
+                       COUNT(*) AS quantidade,
+                       COUNT(*) FILTER (WHERE paga_em IS NOT NULL) AS pagas,
+                       SUM(valor_parcela) AS nominal,
+                       SUM(valor_parcela / POWER(1 + %(taxa)s::numeric, meses)) AS presente
+                FROM restantes
+            ),
+            plano AS (
+                SELECT s.primeira, s.presente,
+                       ROUND(x.prestacao, 2) AS valor,
+                       ROUND(x.prestacao * %(n)s, 2) AS total
+                FROM saldo s
+                CROSS JOIN LATERAL (
+                    SELECT CASE WHEN %(taxa)s::numeric = 0 THEN s.presente / %(n)s
+                                ELSE s.presente * %(taxa)s::numeric
+                                     / ((1 - POWER(1 + %(taxa)s::numeric, -%(n)s))
+                                        * (1 + %(taxa)s::numeric))
+                           END AS prestacao
+                ) AS x
+                WHERE EXISTS (SELECT 1 FROM mov) AND s.quantidade > 0 AND s.pagas = 0
+            ),
+            novas AS (
+                SELECT p.primeira + j AS numero_parcela,
+                       (%(mes_ref)s + j) %% 12 + 1 AS vencimento_mes,
+                       (%(mes_ref)s + j) / 12 AS vencimento_ano,
+                       CASE WHEN j = %(n)s - 1 THEN p.total - p.valor * (%(n)s - 1)
+                            ELSE p.valor END AS valor_parcela
+                FROM plano p, generate_series(0, %(n)s - 1) AS j
+            ),
+            atualizadas AS (
+                UPDATE parcelas_crediario p
+                SET vencimento_mes = n.vencimento_mes,
+                    vencimento_ano = n.vencimento_ano,
+                    valor_parcela = n.valor_parcela
+                FROM restantes r
+                JOIN novas n ON n.numero_parcela = r.numero_parcela
+                WHERE p.id = r.id
+                RETURNING p.id
+            ),
+            removidas AS (
+                DELETE FROM parcelas_crediario p
+                USING restantes r, plano pl
+                WHERE p.id = r.id AND r.numero_parcela >= pl.primeira + %(n)s
+                RETURNING p.id
+            ),
+            inseridas AS (
+                INSERT INTO parcelas_crediario
+                    (movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela)
+                SELECT mov.id, n.numero_parcela, n.vencimento_mes, n.vencimento_ano, n.valor_parcela
+                FROM mov, novas n
+                WHERE NOT EXISTS (SELECT 1 FROM restantes r WHERE r.numero_parcela = n.numero_parcela)
+                RETURNING id
+            ),
+            movimento AS (
+                UPDATE movimentos_crediario m
+                SET num_parcelas = pl.primeira - 1 + %(n)s,
+                    primeira_parcela = CASE WHEN pl.primeira = 1
+                                            THEN make_date(%(mes_ref)s / 12, %(mes_ref)s %% 12 + 1, 1)
+                                            ELSE m.primeira_parcela END,
+                    ultima_parcela = make_date((%(mes_ref)s + %(n)s - 1) / 12,
+                                               (%(mes_ref)s + %(n)s - 1) %% 12 + 1, 1),
+                    valor_total = pl.total + (
+                        SELECT COALESCE(SUM(p.valor_parcela), 0)
+                        FROM parcelas_crediario p
+                        WHERE p.movimento_crediario_id = m.id
+                          AND p.id NOT IN (SELECT id FROM restantes)),
+                    valor_parcela_mensal = pl.valor
+                FROM plano pl
+                WHERE m.id = %(movimento_id)s AND m.user_id = %(user_id)s
+                RETURNING m.id
+            )
+            SELECT EXISTS (SELECT 1 FROM mov),
+                   s.quantidade, s.pagas, s.nominal, ROUND(s.presente, 2),
+                   (SELECT COUNT(*) FROM atualizadas) + (SELECT COUNT(*) FROM inseridas),
+                   (SELECT COUNT(*) FROM removidas),
+                   EXISTS (SELECT 1 FROM movimento)
+            FROM saldo s;
+        """
+        params = {
+            'movimento_id': movimento_id,
+            'user_id': user_id,
+            'mes_ref': mes_inicio.year * 12 + mes_inicio.month - 1,
+            'n': num_parcelas,
+            'taxa': taxa,
+        }
+
+        try:
+            (encontrado, quantidade, pagas, nominal, presente,
+             gravadas, _, atualizado) = execute_query(
+                query, params, fetchone=True, commit=True)
+        except ValueError as e:
+            raise ValueError(
+                "Erro: Já existe outro movimento de crediário com esta combinação de dados para este usuário."
+            ) from e
+        except CheckViolation as e:
+            raise ValueError(
+                "A renegociação ultrapassa o limite de 360 parcelas ou o ano de 2100.") from e
+        except Exception as e:
+            print(f"Erro ao renegociar movimento de crediário: {e}")
+            raise
+
+        if not encontrado:
+            raise ValueError("Movimento de crediário não encontrado.")
+        if not quantidade:
+            raise ValueError("Não há parcelas a partir do mês informado.")
+        if pagas:
+            raise ValueError(
+                "Há parcelas pagas a partir do mês informado; renegocie a partir do mês seguinte.")
+        if gravadas != num_parcelas or not atualizado:
+            raise ValueError("Falha ao gravar as novas parcelas.")
+
+        return cls.get_by_id(movimento_id, user_id), nominal, presente
+
+    @classmethod
+    def quitar(cls, movimento_id, user_id, mes_quitacao, taxa_desconto=None):
+        """
+        Quitação antecipada: renegocia as parcelas restantes em uma única
+        parcela em mes_quitacao, com o desconto da taxa mensal informada.
+        """
+        return cls.renegociar(movimento_id, user_id, 1, mes_quitacao, taxa_desconto)
 
     @classmethod
     def delete(cls, movimento_id, user_id):
@@ -248,6 +501,44 @@ class MovimentoCrediario:
         params = (movimento_id, user_id)
         return execute_query(query, params, commit=True)
 
+    @classmethod
+    def delete_many(cls, movimento_ids, user_id):
+        """
+        Deleta vários movimentos de crediário em um único comando (as parcelas
+        são removidas em cascata). Retorna a quantidade de movimentos deletados.
+        """
+        query = "DELETE FROM movimentos_crediario WHERE user_id = %s AND id = ANY(%s) RETURNING id"
+        try:
+            rows = execute_query(
+                query, (user_id, list(movimento_ids)), fetchall=True, commit=True)
+        except Exception as e:
+            print(f"Erro ao deletar movimentos de crediário em lote: {e}")
+            raise
+        return len(rows)
+
+    @classmethod
+    def update_grupo_many(cls, movimento_ids, user_id, grupo_crediario_id):
+        """
+        Move vários movimentos de crediário para o grupo informado em um único
+        UPDATE (o grupo precisa pertencer ao usuário). Retorna a quantidade alterada.
+        """
+        query = """
+            UPDATE movimentos_crediario m
+            SET grupo_crediario_id = g.id
+            FROM grupos_crediario g
+            WHERE g.id = %s AND g.user_id = %s
+              AND m.user_id = %s AND m.id = ANY(%s)
+            RETURNING m.id;
+        """
+        try:
+            rows = execute_query(
+                query, (grupo_crediario_id, user_id, user_id, list(movimento_ids)),
+                fetchall=True, commit=True)
+        except Exception as e:
+            print(f"Erro ao alterar o grupo dos movimentos de crediário: {e}")
+            raise
+        return len(rows)
+
     @classmethod
     def get_by_crediario_and_month(cls, user_id, crediario_id, year, month):
         """
@@ -272,6 +563,35 @@ class MovimentoCrediario:
         rows = execute_query(
             query,
             (user_id, crediario_id, end_of_month_exclusive, start_of_month),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+        return rows
+
+    @classmethod
+    async def get_by_crediario_and_month_async(cls, user_id, crediario_id, year, month):
+        """
+        Versão assíncrona de get_by_crediario_and_month.
+        """
+        start_of_month = date(year, month, 1)
+        if month == 12:
+            end_of_month_exclusive = date(year + 1, 1, 1)
+        else:
+            end_of_month_exclusive = date(year, month + 1, 1)
+
+        query = """
+        SELECT id, user_id, grupo_crediario_id, crediario_id, data_compra, descricao, 
+               valor_total, num_parcelas, primeira_parcela, ultima_parcela, valor_parcela_mensal
+        FROM movimentos_crediario 
+        WHERE user_id = %s 
+          AND crediario_id = %s 
+          AND (primeira_parcela < %s OR ultima_parcela >= %s) 
+        ORDER BY data_compra DESC;
+        """
+        rows = await async_execute_query(
+            query,
+            (user_id, crediario_id, end_of_month_exclusive, start_of_month),
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
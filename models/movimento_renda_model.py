@@ -2,6 +2,7 @@
 
 from database.db_manager import execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 from decimal import Decimal
 from datetime import date
 
@@ -11,6 +12,11 @@ class MovimentoRenda:
     Representa um registro de um movimento de renda específico de um usuário.
     """
 
+    __slots__ = (
+        'id', 'user_id', 'renda_id', 'mes_ref', 'mes_pagto', 'valor', 'nome_renda',
+        'tipo_renda'
+    )
+
     def __init__(self, id, user_id, renda_id, mes_ref, mes_pagto, valor):
         self.id = id
         self.user_id = user_id
@@ -18,7 +24,21 @@ class MovimentoRenda:
         self.mes_ref = mes_ref
         self.mes_pagto = mes_pagto
         self.valor = Decimal(valor) if not isinstance(
-            valor, Decimal) else valor  
+            valor, Decimal) else valor
+        # Preenchidos pelas consultas com JOIN na tabela renda
+        self.nome_renda = None
+        self.tipo_renda = None
+
+    @classmethod
+    def _com_renda(cls, id, user_id, renda_id, mes_ref, mes_pagto, valor, nome_renda, tipo_renda):
+        """
+        Monta o movimento a partir de uma linha com JOIN na tabela renda
+        (usado como row factory nas consultas de listagem).
+        """
+        movimento = cls(id, user_id, renda_id, mes_ref, mes_pagto, valor)
+        movimento.nome_renda = nome_renda
+        movimento.tipo_renda = tipo_renda
+        return movimento
 
     @staticmethod
     def create_table():
@@ -66,16 +86,8 @@ class MovimentoRenda:
         WHERE mr.user_id = %s 
         ORDER BY mr.mes_pagto DESC, mr.mes_ref DESC;
         """
-        rows = execute_query(query, (user_id,), fetchall=True)
-
-        movimentos = []
-        if rows:
-            for row in rows:
-                movimento = cls(row[0], row[1], row[2], row[3], row[4], row[5])
-                movimento.nome_renda = row[6]
-                movimento.tipo_renda = row[7] 
-                movimentos.append(movimento)
-        return movimentos
+        return execute_query(query, (user_id,), fetchall=True,
+                             row_factory=args_row(cls._com_renda))
 
     @classmethod
     def get_by_id(cls, movimento_id, user_id):
@@ -87,8 +99,8 @@ class MovimentoRenda:
         FROM movimentos_renda 
         WHERE id = %s AND user_id = %s;
         """
-        row = execute_query(query, (movimento_id, user_id), fetchone=True)
-        return cls(*row) if row else None
+        return execute_query(query, (movimento_id, user_id), fetchone=True,
+                             row_factory=args_row(cls))
 
     @classmethod
     def add(cls, user_id, renda_id, mes_ref, mes_pagto, valor):
@@ -191,16 +203,10 @@ class MovimentoRenda:
         rows = execute_query(
             query,
             (user_id, start_date, end_date_exclusive),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls._com_renda)
         )
-        movimentos = []
-        if rows:
-            for row in rows:
-                movimento = cls(row[0], row[1], row[2], row[3], row[4], row[5])
-                movimento.nome_renda = row[6]
-                movimento.tipo_renda = row[7]
-                movimentos.append(movimento)
-        return movimentos
+        return rows
 
     @classmethod
     def get_movimentos_by_mes_ref(cls, user_id, year, month):
@@ -227,13 +233,7 @@ class MovimentoRenda:
         rows = execute_query(
             query,
             (user_id, start_date, end_date_exclusive),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls._com_renda)
         )
-        movimentos = []
-        if rows:
-            for row in rows:
-                movimento = cls(row[0], row[1], row[2], row[3], row[4], row[5])
-                movimento.nome_renda = row[6]
-                movimento.tipo_renda = row[7]
-                movimentos.append(movimento)
-        return movimentos
+        return rows
@@ -1,7 +1,9 @@
 # models/parcela_crediario_model.py
 
 from database.db_manager import execute_query
-from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from database.async_db_manager import async_execute_query
+from psycopg.errors import ForeignKeyViolation
+from psycopg.rows import args_row
 from decimal import Decimal
 from datetime import date
 
@@ -11,19 +13,42 @@ class ParcelaCrediario:
     Representa uma parcela individual de um movimento de crediário.
     """
 
-    def __init__(self, id, movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela):
+    __slots__ = (
+        'id', 'movimento_crediario_id', 'numero_parcela', 'vencimento_mes',
+        'vencimento_ano', 'valor_parcela', 'paga_em', 'movimento_bancario_id'
+    )
+
+    def __init__(self, id, movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela,
+                 paga_em=None, movimento_bancario_id=None):
         self.id = id
         self.movimento_crediario_id = movimento_crediario_id
         self.numero_parcela = numero_parcela
         self.vencimento_mes = vencimento_mes
         self.vencimento_ano = vencimento_ano
         self.valor_parcela = valor_parcela
+        self.paga_em = paga_em
+        self.movimento_bancario_id = movimento_bancario_id
+
+    @property
+    def status(self):
+        """
+        'paga', 'vencida' (em aberto, de um mês anterior ao atual) ou 'aberta'.
+        """
+        if self.paga_em is not None:
+            return 'paga'
+        hoje = date.today()
+        if (self.vencimento_ano, self.vencimento_mes) < (hoje.year, hoje.month):
+            return 'vencida'
+        return 'aberta'
 
     @staticmethod
     def create_table():
         """
         Cria a tabela 'parcelas_crediario' no banco de dados se ela ainda não existir.
         Inclui chave estrangeira para 'movimentos_crediario' e restrição de unicidade.
+        Uma parcela está paga quando paga_em está preenchida; movimento_bancario_id
+        aponta o pagamento da fatura que a quitou. Deve ser chamada após a
+        criação de 'movimentos_bancarios'.
         """
         query = """
         CREATE TABLE IF NOT EXISTS parcelas_crediario (
@@ -33,18 +58,66 @@ class ParcelaCrediario:
             vencimento_mes INTEGER NOT NULL,
             vencimento_ano INTEGER NOT NULL,
             valor_parcela NUMERIC(15, 2) NOT NULL,
+            paga_em DATE,
+            movimento_bancario_id INTEGER,
             
             UNIQUE (movimento_crediario_id, numero_parcela),
             
             FOREIGN KEY (movimento_crediario_id) REFERENCES movimentos_crediario(id) ON DELETE CASCADE,
+            FOREIGN KEY (movimento_bancario_id) REFERENCES movimentos_bancarios(id) ON DELETE SET NULL,
             
             CHECK (numero_parcela >= 1),
             CHECK (vencimento_mes >= 1 AND vencimento_mes <= 12),
             CHECK (vencimento_ano >= 2000 AND vencimento_ano <= 2100)
         );
         """
+        pagamento_query = """
+        -- Bancos anteriores ao controle de pagamento: as parcelas de meses já
+        -- encerrados são consideradas pagas no vencimento.
+        DO $$
+        BEGIN
+            IF NOT EXISTS (
+                SELECT 1 FROM information_schema.columns
+                WHERE table_schema = current_schema()
+                  AND table_name = 'parcelas_crediario' AND column_name = 'paga_em'
+            ) THEN
+                ALTER TABLE parcelas_crediario ADD COLUMN paga_em DATE;
+                UPDATE parcelas_crediario
+                SET paga_em = make_date(vencimento_ano, vencimento_mes, 1)
+                WHERE make_date(vencimento_ano, vencimento_mes, 1) < date_trunc('month', CURRENT_DATE);
+            END IF;
+        END $$;
+
+        ALTER TABLE parcelas_crediario ADD COLUMN IF NOT EXISTS movimento_bancario_id INTEGER
+            REFERENCES movimentos_bancarios(id) ON DELETE SET NULL;
+
+        -- Saldo devedor, faturas e vencidas leem só as parcelas em aberto.
+        CREATE INDEX IF NOT EXISTS idx_parcelas_crediario_abertas
+            ON parcelas_crediario (movimento_crediario_id, vencimento_ano, vencimento_mes)
+            INCLUDE (valor_parcela)
+            WHERE paga_em IS NULL;
+        CREATE INDEX IF NOT EXISTS idx_parcelas_crediario_movimento_bancario
+            ON parcelas_crediario (movimento_bancario_id) WHERE movimento_bancario_id IS NOT NULL;
+
+        -- Excluir o movimento bancário do pagamento (ON DELETE SET NULL)
+        -- reabre as parcelas quitadas por ele.
+        CREATE OR REPLACE FUNCTION parcelas_crediario_reabrir() RETURNS trigger AS $$
+        BEGIN
+            NEW.paga_em := NULL;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql;
+
+        DROP TRIGGER IF EXISTS trg_parcelas_crediario_reabrir ON parcelas_crediario;
+        CREATE TRIGGER trg_parcelas_crediario_reabrir
+            BEFORE UPDATE OF movimento_bancario_id ON parcelas_crediario
+            FOR EACH ROW
+            WHEN (OLD.movimento_bancario_id IS NOT NULL AND NEW.movimento_bancario_id IS NULL)
+            EXECUTE FUNCTION parcelas_crediario_reabrir();
+        """
         try:
             execute_query(query, commit=True)
+            execute_query(pagamento_query, commit=True)
             print("Tabela 'parcelas_crediario' verificada/criada com sucesso.")
         except Exception as e:
             print(
@@ -57,12 +130,182 @@ class ParcelaCrediario:
         Retorna todas as parcelas associadas a um movimento de crediário específico.
         """
         rows = execute_query(
-            "SELECT id, movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela "
+            "SELECT id, movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela, "
+            "paga_em, movimento_bancario_id "
+            "FROM parcelas_crediario WHERE movimento_crediario_id = %s ORDER BY numero_parcela",
+            (movimento_crediario_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+        return rows
+
+    @classmethod
+    async def get_by_movimento_id_async(cls, movimento_crediario_id):
+        """
+        Versão assíncrona de get_by_movimento_id.
+        """
+        rows = await async_execute_query(
+            "SELECT id, movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela, "
+            "paga_em, movimento_bancario_id "
             "FROM parcelas_crediario WHERE movimento_crediario_id = %s ORDER BY numero_parcela",
             (movimento_crediario_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
+
+    _FATURA_QUERY = """
+        SELECT COUNT(*),
+               COALESCE(SUM(v.valor), 0),
+               COUNT(*) FILTER (WHERE v.paga_em IS NULL),
+               COALESCE(SUM(v.valor) FILTER (WHERE v.paga_em IS NULL), 0),
+               MAX(v.paga_em)
+        FROM (
+            SELECT p.paga_em,
+                   CASE WHEN g.tipo = 'Estorno' THEN -p.valor_parcela ELSE p.valor_parcela END AS valor
+            FROM movimentos_crediario mc
+            JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+            JOIN parcelas_crediario p ON p.movimento_crediario_id = mc.id
+            WHERE mc.user_id = %s AND mc.crediario_id = %s
+              AND p.vencimento_ano = %s AND p.vencimento_mes = %s
+        ) AS v
+    """
+
+    @classmethod
+    def get_fatura(cls, user_id, crediario_id, ano, mes):
+        """
+        Resumo da fatura (parcelas que vencem no mês) de um crediário.
+        """
+        return execute_query(cls._FATURA_QUERY, (user_id, crediario_id, ano, mes),
+                             fetchone=True, row_factory=args_row(FaturaCrediario))
+
+    @classmethod
+    async def get_fatura_async(cls, user_id, crediario_id, ano, mes):
+        """
+        Versão assíncrona de get_fatura.
+        """
+        return await async_execute_query(cls._FATURA_QUERY, (user_id, crediario_id, ano, mes),
+                                         fetchone=True, row_factory=args_row(FaturaCrediario))
+
+    @classmethod
+    def pagar_fatura(cls, user_id, crediario_id, ano, mes, conta_bancaria_id, data):
+        """
+        Paga a fatura de um crediário em um único comando: bloqueia as parcelas
+        em aberto que vencem no mês e a conta bancária, confere o limite de
+        cheque especial, lança um único movimento bancário (Despesa na transação
+        'Pagamento de fatura', criada para o usuário no primeiro pagamento) com
+        o total das compras menos os estornos, ajusta o saldo da conta e marca
+        as parcelas como pagas, ligadas a esse movimento — ou tudo é aplicado,
+        ou nada.
+
+        Retorna (movimento_bancario_id, quantidade de parcelas, valor pago).
+        """
+        query = """
+            WITH parcelas AS (
+                SELECT p.id,
+                       CASE WHEN g.tipo = 'Estorno' THEN -p.valor_parcela ELSE p.valor_parcela END AS valor
+                FROM movimentos_crediario mc
+                JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+                JOIN parcelas_crediario p ON p.movimento_crediario_id = mc.id
+                WHERE mc.user_id = %(user_id)s AND mc.crediario_id = %(crediario_id)s
+                  AND p.vencimento_ano = %(ano)s AND p.vencimento_mes = %(mes)s
+                  AND p.paga_em IS NULL
+                FOR UPDATE OF p
+            ),
+            fatura AS (
+                SELECT COUNT(*) AS quantidade, COALESCE(SUM(valor), 0) AS total
+                FROM parcelas
+            ),
+            conta AS (
+                SELECT id, banco, limite, saldo_atual
+                FROM contas_bancarias
+                WHERE id = %(conta_id)s AND user_id = %(user_id)s
+                FOR UPDATE
+            ),
+            excedida AS (
+                SELECT c.banco, c.saldo_atual - f.total AS saldo_projetado, c.limite
+                FROM conta c, fatura f
+                WHERE c.saldo_atual - f.total < -c.limite
+            ),
+            permitido AS (
+                SELECT EXISTS (SELECT 1 FROM conta) AND f.total > 0
+                       AND NOT EXISTS (SELECT 1 FROM excedida) AS ok
+                FROM fatura f
+            ),
+            transacao AS (
+                INSERT INTO transacoes_bancarias (user_id, transacao, tipo)
+                SELECT %(user_id)s, 'Pagamento de fatura', 'Débito'
+                FROM permitido p
+                WHERE p.ok
+                ON CONFLICT (user_id, transacao, tipo) DO UPDATE SET transacao = EXCLUDED.transacao
+                RETURNING id
+            ),
+            movimento AS (
+                INSERT INTO movimentos_bancarios
+                    (user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo)
+                SELECT %(user_id)s, c.id, t.id, %(data)s, -f.total, 'Despesa'
+                FROM conta c, transacao t, fatura f
+                RETURNING id
+            ),
+            saldo AS (
+                UPDATE contas_bancarias c
+                SET saldo_atual = c.saldo_atual - f.total
+                FROM fatura f, permitido p
+                WHERE c.id = %(conta_id)s AND c.user_id = %(user_id)s AND p.ok
+                RETURNING c.id
+            ),
+            pagas AS (
+                UPDATE parcelas_crediario p
+                SET paga_em = %(data)s, movimento_bancario_id = m.id
+                FROM parcelas x, movimento m
+                WHERE p.id = x.id
+                RETURNING p.id
+            )
+            SELECT EXISTS (SELECT 1 FROM conta),
+                   f.quantidade, f.total,
+                   (SELECT banco FROM excedida),
+                   (SELECT saldo_projetado FROM excedida),
+                   (SELECT limite FROM excedida),
+                   (SELECT id FROM movimento),
+                   (SELECT COUNT(*) FROM pagas),
+                   (SELECT COUNT(*) FROM saldo)
+            FROM fatura f;
+        """
+        params = {
+            'user_id': user_id,
+            'crediario_id': crediario_id,
+            'ano': ano,
+            'mes': mes,
+            'conta_id': conta_bancaria_id,
+            'data': data,
+        }
+
+        try:
+            (conta_encontrada, quantidade, total, banco_excedido, saldo_projetado, limite,
+             movimento_id, pagas, saldos) = execute_query(
+                query, params, fetchone=True, commit=True)
+        except ValueError as e:
+            raise ValueError(
+                "Erro: Já existe um movimento bancário com este valor nesta conta e data.") from e
+        except Exception as e:
+            print(f"Erro ao pagar fatura de crediário: {e}")
+            raise
+
+        if not conta_encontrada:
+            raise ValueError("Conta bancária não encontrada.")
+        if not quantidade:
+            raise ValueError("Não há parcelas em aberto nesta fatura.")
+        if total <= 0:
+            raise ValueError("A fatura não tem valor a pagar (os estornos cobrem as compras).")
+        if banco_excedido is not None:
+            raise ValueError(
+                f"Pagamento excede o limite de cheque especial na conta '{banco_excedido}'. "
+                f"Saldo projetado: {saldo_projetado:.2f}, Limite: {limite:.2f}"
+            )
+        if movimento_id is None or pagas != quantidade or saldos != 1:
+            raise ValueError("Falha ao registrar o pagamento da fatura.")
+
+        return movimento_id, quantidade, total
 
     @classmethod
     def add(cls, movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela):
@@ -81,7 +324,7 @@ class ParcelaCrediario:
             if result:
                 return cls(result[0], movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela)
             return None
-        except UniqueViolation as e:
+        except ValueError as e:
             raise ValueError(
                 "Erro: Já existe uma parcela com este número para este movimento de crediário."
             ) from e
@@ -94,18 +337,49 @@ class ParcelaCrediario:
             raise
 
     @staticmethod
-    def delete_by_movimento_id(movimento_crediario_id):
+    def gerar(movimento_crediario_id, num_parcelas, primeira_parcela, valor_parcela,
+              connection, cursor):
+        """
+        Gera as parcelas 1..num_parcelas de um movimento, mensais a partir de
+        primeira_parcela e todas com valor_parcela, com um único INSERT ... SELECT
+        sobre generate_series, na transação do chamador.
+        """
+        query = """
+            INSERT INTO parcelas_crediario
+                (movimento_crediario_id, numero_parcela, vencimento_mes, vencimento_ano, valor_parcela)
+            SELECT %(movimento_id)s, n,
+                   EXTRACT(MONTH FROM v.vencimento)::int, EXTRACT(YEAR FROM v.vencimento)::int,
+                   %(valor_parcela)s
+            FROM generate_series(1, %(num_parcelas)s) AS n
+            CROSS JOIN LATERAL (
+                SELECT %(primeira_parcela)s::date + (n - 1) * INTERVAL '1 month' AS vencimento
+            ) AS v
+        """
+        cursor.execute(query, {
+            'movimento_id': movimento_crediario_id,
+            'num_parcelas': num_parcelas,
+            'primeira_parcela': primeira_parcela,
+            'valor_parcela': valor_parcela,
+        })
+        return True
+
+    @staticmethod
+    def delete_by_movimento_id(movimento_crediario_id, connection=None, cursor=None):
         """
         Deleta todas as parcelas associadas a um movimento de crediário específico.
+        Com connection/cursor, a exclusão faz parte da transação do chamador.
         Retorna True se a operação foi bem sucedida, False caso contrário.
         """
         query = """
             DELETE FROM parcelas_crediario WHERE movimento_crediario_id = %s;
         """
         try:
-            return execute_query(query, (movimento_crediario_id,), commit=True)
+            return execute_query(query, (movimento_crediario_id,), commit=connection is None,
+                                 connection=connection, cursor=cursor)
         except Exception as e:
             print(f"Erro ao deletar parcelas de crediário por movimento: {e}")
+            if connection is not None:
+                raise
             return False
 
     @classmethod
@@ -125,3 +399,23 @@ class ParcelaCrediario:
         except Exception as e:
             print(f"Erro inesperado ao deletar parcela de crediário: {e}")
             raise
+
+
+class FaturaCrediario:
+    """
+    Resumo da fatura de um crediário em um mês: parcelas que vencem no mês,
+    com os estornos descontados.
+    """
+
+    __slots__ = ('quantidade', 'total', 'abertas', 'total_aberto', 'paga_em')
+
+    def __init__(self, quantidade, total, abertas, total_aberto, paga_em):
+        self.quantidade = quantidade
+        self.total = total
+        self.abertas = abertas
+        self.total_aberto = total_aberto
+        self.paga_em = paga_em
+
+    @property
+    def paga(self):
+        return self.quantidade > 0 and self.abertas == 0
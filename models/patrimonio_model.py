@@ -0,0 +1,118 @@
+# models/patrimonio_model.py
+
+from datetime import date, timedelta
+
+import numpy as np
+
+from database.db_manager import execute_query
+from models.movimento_bancario_model import EFEITO_SALDO_SQL
+
+GRANULARIDADES = ('diaria', 'semanal', 'mensal')
+
+
+class SeriePatrimonio:
+    """
+    Patrimônio líquido diário do usuário: soma dos saldos das contas
+    bancárias menos as parcelas de crediário ainda não pagas.
+
+    O banco devolve apenas as variações agregadas por dia (uma linha por dia
+    com movimento); a série diária completa é montada com somas acumuladas
+    do NumPy, em centavos (int64), sem erro de arredondamento. Uma compra
+    aumenta a dívida na data da compra e cada parcela a reduz na data em
+    que foi paga (estornos com o sinal invertido); parcelas em aberto,
+    vencidas ou não, continuam na dívida. Como o pagamento da fatura também
+    é lançado nas contas, pagar não altera o patrimônio.
+    """
+
+    __slots__ = ('inicio', 'saldo_bancos', 'divida', 'patrimonio')
+
+    def __init__(self, inicio, saldo_bancos, divida):
+        self.inicio = inicio
+        self.saldo_bancos = saldo_bancos
+        self.divida = divida
+        self.patrimonio = saldo_bancos - divida
+
+    @classmethod
+    def calcular(cls, user_id):
+        """
+        Calcula a série diária desde o primeiro lançamento do usuário até
+        hoje (ou até o último lançamento, se posterior). Retorna None se o
+        usuário não tiver lançamentos.
+        """
+        query = f"""
+            WITH variacoes AS (
+                SELECT data AS dia, {EFEITO_SALDO_SQL} AS bancos, 0 AS divida
+                FROM movimentos_bancarios
+                WHERE user_id = %(user_id)s
+                UNION ALL
+                SELECT mc.data_compra,
+                       0, CASE WHEN g.tipo = 'Estorno' THEN -p.valor_parcela ELSE p.valor_parcela END
+                FROM movimentos_crediario mc
+                JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+                JOIN parcelas_crediario p ON p.movimento_crediario_id = mc.id
+                WHERE mc.user_id = %(user_id)s
+                UNION ALL
+                SELECT p.paga_em,
+                       0, CASE WHEN g.tipo = 'Estorno' THEN p.valor_parcela ELSE -p.valor_parcela END
+                FROM movimentos_crediario mc
+                JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+                JOIN parcelas_crediario p ON p.movimento_crediario_id = mc.id
+                WHERE mc.user_id = %(user_id)s AND p.paga_em IS NOT NULL
+            )
+            SELECT dia,
+                   (SUM(bancos) * 100)::bigint,
+                   (SUM(divida) * 100)::bigint,
+                   (SELECT (COALESCE(SUM(saldo_inicial), 0) * 100)::bigint
+                    FROM contas_bancarias WHERE user_id = %(user_id)s)
+            FROM variacoes
+            GROUP BY dia
+            ORDER BY dia
+        """
+        try:
+            rows = execute_query(query, {'user_id': user_id}, fetchall=True)
+        except Exception as e:
+            print(f"Erro ao calcular o patrimônio do usuário {user_id}: {e}")
+            raise
+        if not rows:
+            return None
+
+        inicio = rows[0][0]
+        fim = max(rows[-1][0], date.today())
+        dias = np.fromiter(((r[0] - inicio).days for r in rows),
+                           dtype=np.int64, count=len(rows))
+
+        bancos = np.zeros((fim - inicio).days + 1, dtype=np.int64)
+        divida = np.zeros_like(bancos)
+        bancos[dias] = [r[1] for r in rows]
+        divida[dias] = [r[2] for r in rows]
+
+        return cls(inicio, rows[0][3] + np.cumsum(bancos), np.cumsum(divida))
+
+    def data(self, indice):
+        return self.inicio + timedelta(days=int(indice))
+
+    def recorte(self, data_inicio=None, data_fim=None, granularidade='diaria'):
+        """
+        Retorna os índices (dias desde self.inicio) da série entre as datas
+        informadas, na granularidade pedida: todos os dias, o último dia de
+        cada semana (domingo) ou o último dia de cada mês, sempre incluindo
+        o último dia do recorte.
+        """
+        total = len(self.patrimonio)
+        primeiro = max((data_inicio - self.inicio).days, 0) if data_inicio else 0
+        ultimo = min((data_fim - self.inicio).days, total - 1) if data_fim else total - 1
+        if ultimo < primeiro:
+            return np.arange(0)
+
+        indices = np.arange(primeiro, ultimo + 1)
+        if granularidade == 'semanal':
+            # weekday() do domingo é 6
+            deslocamento = (self.inicio.weekday() + indices) % 7
+            indices = indices[deslocamento == 6]
+        elif granularidade == 'mensal':
+            datas = np.datetime64(self.inicio, 'D') + indices
+            indices = indices[(datas + 1).astype('datetime64[M]') != datas.astype('datetime64[M]')]
+
+        if not len(indices) or indices[-1] != ultimo:
+            indices = np.append(indices, ultimo)
+        return indices
@@ -0,0 +1,173 @@
+# models/reconciliacao_model.py
+
+from datetime import timedelta
+
+from config import Config
+from database.db_manager import execute_query, open_connection
+from psycopg.rows import args_row
+from models.movimento_bancario_model import EFEITO_SALDO_SQL
+
+
+class DivergenciaSaldo:
+    """
+    Conta bancária cujo saldo_atual não confere com saldo_inicial + movimentos.
+    """
+
+    __slots__ = ('conta_bancaria_id', 'user_id', 'banco', 'saldo_registrado',
+                 'saldo_calculado')
+
+    def __init__(self, conta_bancaria_id, user_id, banco, saldo_registrado, saldo_calculado):
+        self.conta_bancaria_id = conta_bancaria_id
+        self.user_id = user_id
+        self.banco = banco
+        self.saldo_registrado = saldo_registrado
+        self.saldo_calculado = saldo_calculado
+
+    @property
+    def diferenca(self):
+        return self.saldo_registrado - self.saldo_calculado
+
+
+class Reconciliacao:
+    """
+    Recalcula o saldo das contas bancárias a partir dos movimentos e aponta
+    (ou corrige) as divergências com o saldo_atual armazenado.
+
+    O recálculo é uma única consulta agrupada. No modo incremental apenas as
+    contas com alterado_em desde a última execução (menos a margem
+    RECONCILIACAO_MARGEM_MINUTOS, que cobre transações ainda abertas quando a
+    execução anterior começou) são verificadas.
+    """
+
+    __slots__ = ('id', 'iniciada_em', 'completa', 'reparar', 'contas_verificadas',
+                 'divergencias', 'reparadas')
+
+    def __init__(self, id, iniciada_em, completa, reparar, contas_verificadas, divergencias, reparadas):
+        self.id = id
+        self.iniciada_em = iniciada_em
+        self.completa = completa
+        self.reparar = reparar
+        self.contas_verificadas = contas_verificadas
+        self.divergencias = divergencias
+        self.reparadas = reparadas
+
+    @staticmethod
+    def create_table():
+        """
+        Cria a tabela 'reconciliacoes', com o histórico das execuções.
+        """
+        query = """
+        CREATE TABLE IF NOT EXISTS reconciliacoes (
+            id SERIAL PRIMARY KEY,
+            iniciada_em TIMESTAMPTZ NOT NULL,
+            completa BOOLEAN NOT NULL,
+            reparar BOOLEAN NOT NULL,
+            contas_verificadas INTEGER NOT NULL,
+            divergencias INTEGER NOT NULL,
+            reparadas INTEGER NOT NULL
+        );
+        """
+        try:
+            execute_query(query, commit=True)
+            print("Tabela 'reconciliacoes' verificada/criada com sucesso.")
+        except Exception as e:
+            print(f"Erro ao criar tabela 'reconciliacoes': {e}")
+            raise
+
+    @classmethod
+    def get_ultima(cls):
+        """
+        Retorna a execução mais recente ou None.
+        """
+        query = """
+            SELECT id, iniciada_em, completa, reparar, contas_verificadas, divergencias, reparadas
+            FROM reconciliacoes
+            ORDER BY iniciada_em DESC
+            LIMIT 1
+        """
+        return execute_query(query, fetchone=True, row_factory=args_row(cls))
+
+    @classmethod
+    def executar(cls, reparar=False, completa=False):
+        """
+        Verifica as contas e, com reparar=True, grava o saldo recalculado nas
+        contas divergentes. Tudo roda em uma transação: no modo de reparo as
+        contas candidatas são bloqueadas (FOR UPDATE) antes do recálculo, para
+        que nenhum movimento seja gravado entre a verificação e a correção.
+        Retorna (execucao, divergencias).
+        """
+        ultima = None if completa else cls.get_ultima()
+        desde = None
+        if ultima is not None:
+            desde = ultima.iniciada_em - \
+                timedelta(minutes=Config.RECONCILIACAO_MARGEM_MINUTOS)
+
+        filtro = "(%(desde)s::timestamptz IS NULL OR c.alterado_em >= %(desde)s)"
+        params = {'desde': desde}
+
+        conn = None
+        try:
+            conn = open_connection()
+            with conn.cursor() as cursor:
+                if reparar:
+                    execute_query(
+                        f"SELECT c.id FROM contas_bancarias c WHERE {filtro} ORDER BY c.id FOR UPDATE",
+                        params, fetchall=True, connection=conn, cursor=cursor)
+
+                query = f"""
+                    WITH candidatas AS (
+                        SELECT c.id, c.user_id, c.banco, c.saldo_inicial, c.saldo_atual
+                        FROM contas_bancarias c
+                        WHERE {filtro}
+                    ), somas AS (
+                        SELECT conta_bancaria_id, SUM({EFEITO_SALDO_SQL}) AS total
+                        FROM movimentos_bancarios
+                        WHERE conta_bancaria_id IN (SELECT id FROM candidatas)
+                        GROUP BY conta_bancaria_id
+                    )
+                    SELECT c.id, c.user_id, c.banco, c.saldo_atual,
+                           c.saldo_inicial + COALESCE(s.total, 0) AS saldo_calculado
+                    FROM candidatas c
+                    LEFT JOIN somas s ON s.conta_bancaria_id = c.id
+                    ORDER BY c.id
+                """
+                contas = execute_query(query, params, fetchall=True, connection=conn, cursor=cursor,
+                                       row_factory=args_row(DivergenciaSaldo))
+                divergencias = [
+                    d for d in contas if d.saldo_registrado != d.saldo_calculado]
+
+                reparadas = 0
+                if reparar and divergencias:
+                    reparo_query = f"""
+                        UPDATE contas_bancarias c
+                        SET saldo_atual = c.saldo_inicial + COALESCE((
+                            SELECT SUM({EFEITO_SALDO_SQL})
+                            FROM movimentos_bancarios m
+                            WHERE m.conta_bancaria_id = c.id
+                        ), 0)
+                        WHERE c.id = ANY(%s)
+                    """
+                    execute_query(reparo_query, ([d.conta_bancaria_id for d in divergencias],),
+                                  connection=conn, cursor=cursor)
+                    reparadas = cursor.rowcount
+
+                registro_query = """
+                    INSERT INTO reconciliacoes
+                        (iniciada_em, completa, reparar, contas_verificadas, divergencias, reparadas)
+                    VALUES (now(), %s, %s, %s, %s, %s)
+                    RETURNING id, iniciada_em, completa, reparar, contas_verificadas, divergencias, reparadas
+                """
+                execucao = execute_query(
+                    registro_query,
+                    (completa or desde is None, reparar, len(contas), len(divergencias), reparadas),
+                    fetchone=True, connection=conn, cursor=cursor, row_factory=args_row(cls))
+            conn.commit()
+            return execucao, divergencias
+        except Exception as e:
+            if conn:
+                conn.rollback()
+            print(f"Erro ao reconciliar saldos das contas bancárias: {e}")
+            raise
+        finally:
+            if conn:
+                conn.close()
@@ -0,0 +1,307 @@
+# models/recorrencia_model.py
+
+from datetime import date
+
+from database.db_manager import execute_query
+from psycopg.errors import UniqueViolation, ForeignKeyViolation, CheckViolation
+from psycopg.rows import args_row
+from models.movimento_bancario_model import EFEITO_SALDO_SQL
+
+PERIODICIDADES = {
+    'semanal': 'Semanal',
+    'mensal': 'Mensal',
+    'anual': 'Anual',
+}
+
+# Quantidade de períodos completos (semanas, meses ou anos) entre
+# r.data_inicio e a data informada. Usada para limitar generate_series às
+# ocorrências ainda não lançadas, sem percorrer todo o histórico.
+_UNIDADES_SQL = """(CASE r.periodicidade
+    WHEN 'semanal' THEN ({d} - r.data_inicio) / 7
+    WHEN 'mensal' THEN (EXTRACT(YEAR FROM age({d}, r.data_inicio)) * 12
+                        + EXTRACT(MONTH FROM age({d}, r.data_inicio)))::INTEGER
+    ELSE EXTRACT(YEAR FROM age({d}, r.data_inicio))::INTEGER
+END)"""
+
+
+class RecorrenciaBancaria:
+    """
+    Modelo de movimento bancário recorrente (salário, aluguel, assinaturas):
+    conta, transação, valor e a regra de repetição (a cada 'intervalo'
+    semanas, meses ou anos a partir de data_inicio, até data_fim).
+
+    As ocorrências vencidas são lançadas por gerar(). Cada movimento gerado
+    guarda o recorrencia_id, e o índice único (recorrencia_id, data) torna a
+    geração idempotente; gerada_ate marca até onde a recorrência já foi
+    lançada, para que a próxima execução comece dali.
+    """
+
+    __slots__ = (
+        'id', 'user_id', 'conta_bancaria_id', 'transacao_bancaria_id', 'descricao',
+        'valor', 'periodicidade', 'intervalo', 'data_inicio', 'data_fim', 'ativa',
+        'gerada_ate', 'conta_detalhes', 'transacao_detalhes'
+    )
+
+    def __init__(self, id, user_id, conta_bancaria_id, transacao_bancaria_id, descricao,
+                 valor, periodicidade, intervalo, data_inicio, data_fim, ativa, gerada_ate=None):
+        self.id = id
+        self.user_id = user_id
+        self.conta_bancaria_id = conta_bancaria_id
+        self.transacao_bancaria_id = transacao_bancaria_id
+        self.descricao = descricao
+        self.valor = valor
+        self.periodicidade = periodicidade
+        self.intervalo = intervalo
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+        self.ativa = ativa
+        self.gerada_ate = gerada_ate
+        # Dados complementares, preenchidos pelas rotas
+        self.conta_detalhes = None
+        self.transacao_detalhes = None
+
+    @staticmethod
+    def create_table():
+        """
+        Cria a tabela 'recorrencias_bancarias' e a coluna recorrencia_id em
+        'movimentos_bancarios', com o índice único que impede lançar duas
+        vezes a mesma ocorrência.
+        """
+        query = """
+        CREATE TABLE IF NOT EXISTS recorrencias_bancarias (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            conta_bancaria_id INTEGER NOT NULL,
+            transacao_bancaria_id INTEGER NOT NULL,
+            descricao VARCHAR(255) NOT NULL,
+            valor NUMERIC(15, 2) NOT NULL CHECK (valor > 0),
+            periodicidade VARCHAR(10) NOT NULL CHECK (periodicidade IN ('semanal', 'mensal', 'anual')),
+            intervalo INTEGER NOT NULL DEFAULT 1 CHECK (intervalo > 0),
+            data_inicio DATE NOT NULL,
+            data_fim DATE,
+            ativa BOOLEAN NOT NULL DEFAULT TRUE,
+            gerada_ate DATE,
+
+            UNIQUE (user_id, descricao),
+            CHECK (data_fim IS NULL OR data_fim >= data_inicio),
+
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE RESTRICT,
+            FOREIGN KEY (conta_bancaria_id) REFERENCES contas_bancarias(id) ON DELETE RESTRICT,
+            FOREIGN KEY (transacao_bancaria_id) REFERENCES transacoes_bancarias(id) ON DELETE RESTRICT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_recorrencias_bancarias_ativas
+            ON recorrencias_bancarias (gerada_ate) WHERE ativa;
+
+        ALTER TABLE movimentos_bancarios ADD COLUMN IF NOT EXISTS recorrencia_id INTEGER
+            REFERENCES recorrencias_bancarias(id) ON DELETE SET NULL;
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_movimentos_bancarios_recorrencia_data
+            ON movimentos_bancarios (recorrencia_id, data) WHERE recorrencia_id IS NOT NULL;
+        """
+        try:
+            execute_query(query, commit=True)
+            print("Tabela 'recorrencias_bancarias' verificada/criada com sucesso.")
+        except Exception as e:
+            print(
+                f"ERRO CRÍTICO ao criar/verificar tabela 'recorrencias_bancarias': {e}")
+            raise
+
+    @classmethod
+    def get_all_by_user(cls, user_id):
+        """
+        Retorna todas as recorrências do usuário, ativas primeiro.
+        """
+        return execute_query(
+            "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, descricao, valor, "
+            "periodicidade, intervalo, data_inicio, data_fim, ativa, gerada_ate "
+            "FROM recorrencias_bancarias WHERE user_id = %s ORDER BY ativa DESC, descricao",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+
+    @classmethod
+    def get_by_id(cls, recorrencia_id, user_id):
+        return execute_query(
+            "SELECT id, user_id, conta_bancaria_id, transacao_bancaria_id, descricao, valor, "
+            "periodicidade, intervalo, data_inicio, data_fim, ativa, gerada_ate "
+            "FROM recorrencias_bancarias WHERE id = %s AND user_id = %s",
+            (recorrencia_id, user_id),
+            fetchone=True,
+            row_factory=args_row(cls)
+        )
+
+    @classmethod
+    def add(cls, user_id, conta_bancaria_id, transacao_bancaria_id, descricao, valor,
+            periodicidade, intervalo, data_inicio, data_fim=None):
+        """
+        Adiciona uma recorrência. O valor é sempre positivo: o sinal do
+        movimento gerado vem do tipo da transação (Crédito ou Débito).
+        """
+        try:
+            result = execute_query(
+                "INSERT INTO recorrencias_bancarias (user_id, conta_bancaria_id, transacao_bancaria_id, "
+                "descricao, valor, periodicidade, intervalo, data_inicio, data_fim) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id",
+                (user_id, conta_bancaria_id, transacao_bancaria_id, descricao, valor,
+                 periodicidade, intervalo, data_inicio, data_fim),
+                fetchone=True,
+                commit=True
+            )
+            return cls(result[0], user_id, conta_bancaria_id, transacao_bancaria_id, descricao,
+                       valor, periodicidade, intervalo, data_inicio, data_fim, True)
+        except UniqueViolation as e:
+            raise ValueError(
+                "Erro: Já existe uma recorrência com esta descrição.") from e
+        except ForeignKeyViolation as e:
+            raise ValueError(
+                "Erro: Conta Bancária, Transação ou Usuário não encontrado.") from e
+        except CheckViolation as e:
+            raise ValueError(
+                "Erro: Verifique o valor (maior que zero), o intervalo e as datas da recorrência.") from e
+        except Exception as e:
+            print(f"Erro ao adicionar recorrência bancária: {e}")
+            raise
+
+    @classmethod
+    def update(cls, recorrencia_id, user_id, conta_bancaria_id, transacao_bancaria_id, descricao,
+               valor, periodicidade, intervalo, data_inicio, data_fim, ativa):
+        """
+        Atualiza uma recorrência. Ocorrências já lançadas não são alteradas:
+        a nova regra vale a partir de gerada_ate.
+        """
+        try:
+            result = execute_query(
+                "UPDATE recorrencias_bancarias SET conta_bancaria_id = %s, transacao_bancaria_id = %s, "
+                "descricao = %s, valor = %s, periodicidade = %s, intervalo = %s, data_inicio = %s, "
+                "data_fim = %s, ativa = %s WHERE id = %s AND user_id = %s RETURNING gerada_ate",
+                (conta_bancaria_id, transacao_bancaria_id, descricao, valor, periodicidade,
+                 intervalo, data_inicio, data_fim, ativa, recorrencia_id, user_id),
+                fetchone=True,
+                commit=True
+            )
+        except UniqueViolation as e:
+            raise ValueError(
+                "Erro: Já existe outra recorrência com esta descrição.") from e
+        except ForeignKeyViolation as e:
+            raise ValueError(
+                "Erro: Conta Bancária, Transação ou Usuário não encontrado.") from e
+        except CheckViolation as e:
+            raise ValueError(
+                "Erro: Verifique o valor (maior que zero), o intervalo e as datas da recorrência.") from e
+        except Exception as e:
+            print(f"Erro ao atualizar recorrência bancária: {e}")
+            raise
+
+        if not result:
+            raise ValueError(
+                "Recorrência não encontrada para atualização ou não autorizada.")
+        return cls(recorrencia_id, user_id, conta_bancaria_id, transacao_bancaria_id, descricao,
+                   valor, periodicidade, intervalo, data_inicio, data_fim, ativa, result[0])
+
+    @classmethod
+    def delete(cls, recorrencia_id, user_id):
+        """
+        Deleta a recorrência. Os movimentos já lançados são mantidos
+        (recorrencia_id passa a NULL).
+        """
+        try:
+            return execute_query(
+                "DELETE FROM recorrencias_bancarias WHERE id = %s AND user_id = %s",
+                (recorrencia_id, user_id),
+                commit=True
+            )
+        except Exception as e:
+            print(f"Erro ao deletar recorrência bancária: {e}")
+            raise
+
+    @staticmethod
+    def gerar(ate=None, user_id=None):
+        """
+        Lança, em um único comando, todas as ocorrências vencidas até 'ate'
+        (padrão: hoje) das recorrências ativas — de todos os usuários, ou só
+        de user_id. As datas são calculadas a partir de data_inicio
+        (data_inicio + k * intervalo), então uma recorrência no dia 31 cai no
+        último dia dos meses mais curtos sem se deslocar nos seguintes.
+
+        Os movimentos são inseridos com ON CONFLICT DO NOTHING (a reexecução
+        não lança nada em dobro), os saldos são ajustados com uma única
+        atualização por conta, pela soma dos movimentos inseridos, e
+        gerada_ate avança. Como o débito automático já aconteceu no banco, o
+        limite de cheque especial não é conferido.
+
+        Retorna (movimentos lançados, contas ajustadas, recorrências processadas).
+        """
+        limite = "LEAST(%(ate)s::DATE, COALESCE(r.data_fim, %(ate)s::DATE))"
+        filtro_usuario = "AND r.user_id = %(user_id)s" if user_id is not None else ""
+
+        query = f"""
+            WITH recorrencias AS (
+                SELECT r.id, r.user_id, r.conta_bancaria_id, r.transacao_bancaria_id, r.valor,
+                       r.periodicidade, r.intervalo, r.data_inicio, r.gerada_ate,
+                       t.tipo AS tipo_transacao, {limite} AS limite
+                FROM recorrencias_bancarias r
+                JOIN transacoes_bancarias t ON t.id = r.transacao_bancaria_id
+                WHERE r.ativa
+                  AND r.data_inicio <= {limite}
+                  AND (r.gerada_ate IS NULL OR r.gerada_ate < {limite})
+                  {filtro_usuario}
+                FOR UPDATE OF r
+            ),
+            ocorrencias AS (
+                SELECT r.id AS recorrencia_id, r.user_id, r.conta_bancaria_id,
+                       r.transacao_bancaria_id, o.data,
+                       CASE WHEN r.tipo_transacao = 'Crédito' THEN ABS(r.valor) ELSE -ABS(r.valor) END AS valor,
+                       CASE WHEN r.tipo_transacao = 'Crédito' THEN 'Receita' ELSE 'Despesa' END AS tipo
+                FROM recorrencias r
+                CROSS JOIN LATERAL generate_series(
+                    GREATEST(COALESCE({_UNIDADES_SQL.format(d='r.gerada_ate')} / r.intervalo, 0), 0),
+                    {_UNIDADES_SQL.format(d='r.limite')} / r.intervalo + 1
+                ) AS k
+                CROSS JOIN LATERAL (
+                    SELECT (r.data_inicio + k * r.intervalo * CASE r.periodicidade
+                                WHEN 'semanal' THEN INTERVAL '1 week'
+                                WHEN 'mensal' THEN INTERVAL '1 month'
+                                ELSE INTERVAL '1 year' END)::DATE AS data
+                ) o
+                WHERE o.data <= r.limite
+                  AND (r.gerada_ate IS NULL OR o.data > r.gerada_ate)
+            ),
+            inseridos AS (
+                INSERT INTO movimentos_bancarios
+                    (user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo, recorrencia_id)
+                SELECT user_id, conta_bancaria_id, transacao_bancaria_id, data, valor, tipo, recorrencia_id
+                FROM ocorrencias
+                ORDER BY recorrencia_id, data
+                ON CONFLICT DO NOTHING
+                RETURNING conta_bancaria_id, valor, tipo
+            ),
+            ajustes AS (
+                SELECT conta_bancaria_id, SUM({EFEITO_SALDO_SQL}) AS efeito, COUNT(*) AS quantidade
+                FROM inseridos
+                GROUP BY conta_bancaria_id
+            ),
+            saldos AS (
+                UPDATE contas_bancarias c
+                SET saldo_atual = c.saldo_atual + a.efeito
+                FROM ajustes a
+                WHERE c.id = a.conta_bancaria_id
+                RETURNING c.id
+            ),
+            marcadas AS (
+                UPDATE recorrencias_bancarias rb
+                SET gerada_ate = r.limite
+                FROM recorrencias r
+                WHERE rb.id = r.id
+                RETURNING rb.id
+            )
+            SELECT (SELECT COALESCE(SUM(quantidade), 0) FROM ajustes),
+                   (SELECT COUNT(*) FROM saldos),
+                   (SELECT COUNT(*) FROM marcadas);
+        """
+        params = {'ate': ate or date.today(), 'user_id': user_id}
+        try:
+            return execute_query(query, params, fetchone=True, commit=True)
+        except Exception as e:
+            print(f"Erro ao gerar movimentos recorrentes: {e}")
+            raise
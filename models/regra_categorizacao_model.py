@@ -0,0 +1,450 @@
+# models/regra_categorizacao_model.py
+
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from database.db_manager import execute_query
+from psycopg.errors import UniqueViolation, ForeignKeyViolation, CheckViolation
+from psycopg.rows import args_row
+
+# Origem da regra -> categoria sugerida
+ORIGENS_REGRA = {
+    'bancario': 'Movimento bancário (transação)',
+    'crediario': 'Crediário (grupo)',
+}
+
+TIPOS_PADRAO = {
+    'contem': 'Contém',
+    'regex': 'Expressão regular',
+}
+
+# Classificadores compilados mantidos em memória (LRU), um por usuário.
+_MAX_CLASSIFICADORES = 256
+
+
+# Diacríticos combinantes (acentos, cedilha, til) após a decomposição NFKD
+_ACENTOS = re.compile('[\u0300-\u036f]')
+
+
+def _normalizar(texto):
+    """
+    Texto sem acentos e em minúsculas, para comparações como na busca.
+    """
+    if not texto:
+        return ''
+    if texto.isascii():
+        return texto.lower()
+    return _ACENTOS.sub('', unicodedata.normalize('NFKD', texto)).casefold()
+
+
+class RegraCategorizacao:
+    """
+    Regra de categorização definida pelo usuário: se a descrição contém um
+    termo (ou casa com uma expressão regular), o valor está na faixa e a
+    conta (bancária ou crediário) confere, sugere a transação bancária ou o
+    grupo de crediário 'destino_id'. Todas as condições são opcionais; entre
+    as regras que casam vale a de menor 'prioridade'.
+    """
+
+    __slots__ = (
+        'id', 'user_id', 'origem', 'tipo_padrao', 'padrao', 'valor_min', 'valor_max',
+        'conta_id', 'destino_id', 'prioridade', 'ativa', 'destino_detalhes', 'conta_detalhes'
+    )
+
+    def __init__(self, id, user_id, origem, tipo_padrao, padrao, valor_min, valor_max,
+                 conta_id, destino_id, prioridade, ativa):
+        self.id = id
+        self.user_id = user_id
+        self.origem = origem
+        self.tipo_padrao = tipo_padrao
+        self.padrao = padrao
+        self.valor_min = valor_min
+        self.valor_max = valor_max
+        self.conta_id = conta_id
+        self.destino_id = destino_id
+        self.prioridade = prioridade
+        self.ativa = ativa
+        # Dados complementares, preenchidos pelas rotas
+        self.destino_detalhes = None
+        self.conta_detalhes = None
+
+    @staticmethod
+    def create_table():
+        """
+        Cria a tabela 'regras_categorizacao'. conta_id e destino_id apontam
+        para contas bancárias e transações (origem 'bancario') ou para
+        crediários e grupos de crediário (origem 'crediario').
+        """
+        query = """
+        CREATE TABLE IF NOT EXISTS regras_categorizacao (
+            id SERIAL PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            origem VARCHAR(10) NOT NULL CHECK (origem IN ('bancario', 'crediario')),
+            tipo_padrao VARCHAR(10) NOT NULL DEFAULT 'contem' CHECK (tipo_padrao IN ('contem', 'regex')),
+            padrao VARCHAR(255),
+            valor_min NUMERIC(15, 2),
+            valor_max NUMERIC(15, 2),
+            conta_id INTEGER,
+            destino_id INTEGER NOT NULL,
+            prioridade INTEGER NOT NULL DEFAULT 100,
+            ativa BOOLEAN NOT NULL DEFAULT TRUE,
+            atualizada_em TIMESTAMPTZ NOT NULL DEFAULT now(),
+
+            CHECK (valor_min IS NULL OR valor_max IS NULL OR valor_min <= valor_max),
+
+            FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE RESTRICT
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_regras_categorizacao_user
+            ON regras_categorizacao (user_id, origem, prioridade, id);
+        """
+        try:
+            execute_query(query, commit=True)
+            print("Tabela 'regras_categorizacao' verificada/criada com sucesso.")
+        except Exception as e:
+            print(
+                f"ERRO CRÍTICO ao criar/verificar tabela 'regras_categorizacao': {e}")
+            raise
+
+    @classmethod
+    def get_all_by_user(cls, user_id):
+        """
+        Retorna as regras do usuário por origem, na ordem em que são avaliadas.
+        """
+        return execute_query(
+            "SELECT id, user_id, origem, tipo_padrao, padrao, valor_min, valor_max, conta_id, "
+            "destino_id, prioridade, ativa FROM regras_categorizacao "
+            "WHERE user_id = %s ORDER BY origem, prioridade, id",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
+        )
+
+    @classmethod
+    def get_by_id(cls, regra_id, user_id):
+        return execute_query(
+            "SELECT id, user_id, origem, tipo_padrao, padrao, valor_min, valor_max, conta_id, "
+            "destino_id, prioridade, ativa FROM regras_categorizacao WHERE id = %s AND user_id = %s",
+            (regra_id, user_id),
+            fetchone=True,
+            row_factory=args_row(cls)
+        )
+
+    @staticmethod
+    def _validar_padrao(tipo_padrao, padrao):
+        if tipo_padrao == 'regex' and padrao:
+            try:
+                re.compile(padrao)
+            except re.error as e:
+                raise ValueError(f"Expressão regular inválida: {e}") from e
+
+    @staticmethod
+    def _validar_referencias(user_id, origem, conta_id, destino_id):
+        """
+        Confere, em uma consulta, se a conta (opcional) e o destino são do
+        usuário e da origem da regra.
+        """
+        tabelas = {
+            'bancario': ('contas_bancarias', 'transacoes_bancarias'),
+            'crediario': ('crediarios', 'grupos_crediario'),
+        }
+        if origem not in tabelas:
+            raise ValueError("Origem inválida.")
+        tabela_conta, tabela_destino = tabelas[origem]
+        conta_ok, destino_ok = execute_query(
+            f"SELECT %(conta_id)s::INTEGER IS NULL OR EXISTS (SELECT 1 FROM {tabela_conta} "
+            f"WHERE id = %(conta_id)s AND user_id = %(user_id)s), "
+            f"EXISTS (SELECT 1 FROM {tabela_destino} WHERE id = %(destino_id)s AND user_id = %(user_id)s)",
+            {'user_id': user_id, 'conta_id': conta_id, 'destino_id': destino_id},
+            fetchone=True
+        )
+        if not conta_ok:
+            raise ValueError("Conta inválida ou não pertence a você.")
+        if not destino_ok:
+            raise ValueError("Categoria de destino inválida ou não pertence a você.")
+
+    @classmethod
+    def add(cls, user_id, origem, tipo_padrao, padrao, valor_min, valor_max, conta_id,
+            destino_id, prioridade):
+        """
+        Adiciona uma regra, validando a expressão regular e as referências.
+        """
+        cls._validar_padrao(tipo_padrao, padrao)
+        cls._validar_referencias(user_id, origem, conta_id, destino_id)
+        try:
+            result = execute_query(
+                "INSERT INTO regras_categorizacao (user_id, origem, tipo_padrao, padrao, valor_min, "
+                "valor_max, conta_id, destino_id, prioridade) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s) RETURNING id",
+                (user_id, origem, tipo_padrao, padrao, valor_min, valor_max, conta_id,
+                 destino_id, prioridade),
+                fetchone=True,
+                commit=True
+            )
+            return cls(result[0], user_id, origem, tipo_padrao, padrao, valor_min, valor_max,
+                       conta_id, destino_id, prioridade, True)
+        except CheckViolation as e:
+            raise ValueError(
+                "Erro: Verifique a origem, o tipo de padrão e a faixa de valores da regra.") from e
+        except Exception as e:
+            print(f"Erro ao adicionar regra de categorização: {e}")
+            raise
+
+    @classmethod
+    def update(cls, regra_id, user_id, origem, tipo_padrao, padrao, valor_min, valor_max,
+               conta_id, destino_id, prioridade, ativa):
+        """
+        Atualiza uma regra. atualizada_em muda a impressão digital das regras
+        do usuário e descarta o classificador em cache.
+        """
+        cls._validar_padrao(tipo_padrao, padrao)
+        cls._validar_referencias(user_id, origem, conta_id, destino_id)
+        try:
+            result = execute_query(
+                "UPDATE regras_categorizacao SET origem = %s, tipo_padrao = %s, padrao = %s, "
+                "valor_min = %s, valor_max = %s, conta_id = %s, destino_id = %s, prioridade = %s, "
+                "ativa = %s, atualizada_em = now() WHERE id = %s AND user_id = %s RETURNING id",
+                (origem, tipo_padrao, padrao, valor_min, valor_max, conta_id, destino_id,
+                 prioridade, ativa, regra_id, user_id),
+                fetchone=True,
+                commit=True
+            )
+        except CheckViolation as e:
+            raise ValueError(
+                "Erro: Verifique a origem, o tipo de padrão e a faixa de valores da regra.") from e
+        except Exception as e:
+            print(f"Erro ao atualizar regra de categorização: {e}")
+            raise
+
+        if not result:
+            raise ValueError(
+                "Regra não encontrada para atualização ou não autorizada.")
+        return cls(regra_id, user_id, origem, tipo_padrao, padrao, valor_min, valor_max,
+                   conta_id, destino_id, prioridade, ativa)
+
+    @classmethod
+    def delete(cls, regra_id, user_id):
+        try:
+            return execute_query(
+                "DELETE FROM regras_categorizacao WHERE id = %s AND user_id = %s",
+                (regra_id, user_id),
+                commit=True
+            )
+        except Exception as e:
+            print(f"Erro ao deletar regra de categorização: {e}")
+            raise
+
+    def aceita(self, valor, conta_id):
+        """
+        Confere as condições que não dependem do texto. A faixa de valores
+        é comparada com o valor absoluto (movimentos guardam o sinal).
+        """
+        if self.conta_id is not None and conta_id != self.conta_id:
+            return False
+        if self.valor_min is not None or self.valor_max is not None:
+            if valor is None:
+                return False
+            valor = abs(valor)
+            if self.valor_min is not None and valor < self.valor_min:
+                return False
+            if self.valor_max is not None and valor > self.valor_max:
+                return False
+        return True
+
+    @classmethod
+    def aplicar_crediario(cls, user_id):
+        """
+        Reclassifica as compras de crediário existentes do usuário pelas
+        regras atuais, com um único UPDATE (unnest dos pares id/grupo). Só
+        troca o grupo quando o novo grupo é do mesmo tipo (Compra/Estorno)
+        do atual, para não inverter o sentido do lançamento. Retorna a
+        quantidade de compras alteradas.
+        """
+        classificador = get_classificador(user_id, 'crediario')
+        if not classificador:
+            return 0
+
+        rows = execute_query(
+            "SELECT id, descricao, valor_total, crediario_id, grupo_crediario_id "
+            "FROM movimentos_crediario WHERE user_id = %s",
+            (user_id,),
+            fetchall=True
+        )
+        sugestoes = classificador.classificar_lote((r[1], r[2], r[3]) for r in rows)
+        alterar = [(r[0], grupo) for r, grupo in zip(rows, sugestoes)
+                   if grupo is not None and grupo != r[4]]
+        if not alterar:
+            return 0
+
+        query = """
+            UPDATE movimentos_crediario m
+            SET grupo_crediario_id = u.grupo_id
+            FROM unnest(%(ids)s::INTEGER[], %(grupos)s::INTEGER[]) AS u(id, grupo_id),
+                 grupos_crediario novo, grupos_crediario atual
+            WHERE m.id = u.id AND m.user_id = %(user_id)s
+              AND novo.id = u.grupo_id AND novo.user_id = %(user_id)s
+              AND atual.id = m.grupo_crediario_id AND atual.tipo = novo.tipo
+            RETURNING m.id
+        """
+        try:
+            atualizados = execute_query(
+                query,
+                {'ids': [a[0] for a in alterar], 'grupos': [a[1] for a in alterar],
+                 'user_id': user_id},
+                fetchall=True, commit=True)
+        except Exception as e:
+            print(f"Erro ao aplicar regras às compras de crediário: {e}")
+            raise
+        return len(atualizados)
+
+
+def _regex_trie(termos):
+    """
+    Expressão regular equivalente à alternativa de todos os termos, mas com
+    os prefixos comuns fatorados (uma árvore de prefixos): em cada posição do
+    texto o motor de expressões só segue os ramos que começam pelo caractere
+    dali, e os quantificadores gulosos devolvem o termo mais longo.
+    """
+    arvore = {}
+    for termo in termos:
+        no = arvore
+        for caractere in termo:
+            no = no.setdefault(caractere, {})
+        no[''] = None
+
+    def montar(no):
+        ramos = [re.escape(c) + montar(filho) for c, filho in sorted(no.items()) if c]
+        if not ramos:
+            return ''
+        corpo = ramos[0] if len(ramos) == 1 else '(?:' + '|'.join(ramos) + ')'
+        if '' in no:
+            return '(?:' + corpo + ')?'
+        return corpo
+
+    return montar(arvore)
+
+
+class ClassificadorRegras:
+    """
+    Regras ativas de uma origem compiladas para classificar muitas linhas
+    rapidamente. O texto é comparado sem acentos e sem diferenciar
+    maiúsculas de minúsculas.
+
+    Os termos das regras 'contem' formam uma única expressão em árvore de
+    prefixos, percorrida uma vez por linha: cada posição devolve o termo
+    mais longo que começa ali, e os prefixos dele que também são termos
+    completam o conjunto exato de regras cujo termo aparece no texto. Só
+    essas regras, as sem padrão e as de expressão regular são conferidas uma
+    a uma, na ordem de prioridade.
+    """
+
+    __slots__ = ('regras', 'expressoes', 'termos', 'tamanhos', 'arvore', 'sempre_testar')
+
+    def __init__(self, regras):
+        self.regras = regras
+        self.expressoes = []
+        self.termos = {}
+        sempre_testar = set()
+
+        for i, regra in enumerate(regras):
+            termo = _normalizar(regra.padrao) if regra.tipo_padrao == 'contem' else None
+            if regra.padrao and regra.tipo_padrao == 'regex':
+                self.expressoes.append(re.compile(regra.padrao, re.IGNORECASE))
+                sempre_testar.add(i)
+            elif termo:
+                self.expressoes.append(None)
+                self.termos.setdefault(termo, []).append(i)
+            else:
+                self.expressoes.append(None)
+                sempre_testar.add(i)
+
+        self.tamanhos = sorted({len(t) for t in self.termos})
+        self.arvore = (re.compile('(?=(' + _regex_trie(self.termos) + '))')
+                       if self.termos else None)
+        self.sempre_testar = frozenset(sempre_testar)
+
+    def __bool__(self):
+        return bool(self.regras)
+
+    def _termos_encontrados(self, texto):
+        encontrados = set()
+        for m in self.arvore.finditer(texto):
+            maior = m.group(1)
+            for tamanho in self.tamanhos:
+                if tamanho > len(maior):
+                    break
+                indices = self.termos.get(maior[:tamanho])
+                if indices:
+                    encontrados.update(indices)
+        return encontrados
+
+    def classificar(self, descricao, valor=None, conta_id=None):
+        """
+        Retorna o destino_id da regra de maior prioridade que casa com a
+        linha, ou None. Os termos "contém" são comparados com a descrição
+        normalizada; as expressões regulares, com a descrição original (sem
+        diferenciar maiúsculas), para que acentos no padrão continuem valendo.
+        """
+        texto = _normalizar(descricao)
+        casadas = self._termos_encontrados(texto) if self.arvore is not None and texto else set()
+
+        for i in sorted(casadas | self.sempre_testar):
+            regra = self.regras[i]
+            if not regra.aceita(valor, conta_id):
+                continue
+            expressao = self.expressoes[i]
+            if expressao is None or expressao.search(descricao or ''):
+                return regra.destino_id
+        return None
+
+    def classificar_lote(self, linhas):
+        """
+        Classifica (descricao, valor, conta_id) em lote; linhas repetidas
+        (comuns em extratos importados) são classificadas uma só vez.
+        """
+        resultados = {}
+        sugestoes = []
+        for linha in linhas:
+            if linha not in resultados:
+                resultados[linha] = self.classificar(*linha)
+            sugestoes.append(resultados[linha])
+        return sugestoes
+
+
+_classificadores = OrderedDict()
+_classificadores_lock = threading.Lock()
+
+
+def get_classificador(user_id, origem):
+    """
+    Retorna o classificador do usuário para a origem, compilado uma vez e
+    mantido em memória enquanto a impressão digital das regras (quantidade,
+    soma dos ids e última alteração) não mudar. A impressão é uma consulta
+    agregada sobre o índice do usuário, então outras instâncias da
+    aplicação que alterem as regras também invalidam este cache.
+    """
+    impressao = execute_query(
+        "SELECT COUNT(*), COALESCE(SUM(id), 0), MAX(atualizada_em) "
+        "FROM regras_categorizacao WHERE user_id = %s",
+        (user_id,),
+        fetchone=True
+    )
+    with _classificadores_lock:
+        entrada = _classificadores.get(user_id)
+        if entrada is not None and entrada[0] == impressao:
+            _classificadores.move_to_end(user_id)
+            return entrada[1][origem]
+
+    regras = [r for r in RegraCategorizacao.get_all_by_user(user_id) if r.ativa]
+    por_origem = {
+        o: ClassificadorRegras([r for r in regras if r.origem == o]) for o in ORIGENS_REGRA
+    }
+
+    with _classificadores_lock:
+        _classificadores[user_id] = (impressao, por_origem)
+        _classificadores.move_to_end(user_id)
+        while len(_classificadores) > _MAX_CLASSIFICADORES:
+            _classificadores.popitem(last=False)
+    return por_origem[origem]
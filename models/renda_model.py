@@ -2,6 +2,7 @@
 
 from database.db_manager import execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 
 
 class Renda:
@@ -9,6 +10,8 @@ class Renda:
     Representa um tipo de renda para um usuário no sistema.
     """
 
+    __slots__ = ('id', 'user_id', 'descricao', 'tipo')
+
     def __init__(self, id, user_id, descricao, tipo):
         self.id = id
         self.user_id = user_id
@@ -49,9 +52,10 @@ class Renda:
         rows = execute_query(
             "SELECT id, user_id, descricao, tipo FROM renda WHERE user_id = %s ORDER BY descricao, tipo",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
     def get_by_id(cls, renda_id, user_id):
@@ -61,9 +65,10 @@ class Renda:
         row = execute_query(
             "SELECT id, user_id, descricao, tipo FROM renda WHERE id = %s AND user_id = %s",
             (renda_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
         )
-        return cls(*row) if row else None
+        return row
 
     @classmethod
     def add(cls, user_id, descricao, tipo):
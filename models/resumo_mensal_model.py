@@ -0,0 +1,124 @@
+# models/resumo_mensal_model.py
+
+from database.db_manager import execute_query
+from psycopg.rows import args_row
+
+ORIGENS = {
+    'bancario': 'Bancário',
+    'crediario': 'Crediário',
+    'fixa': 'Despesa fixa',
+    'renda': 'Renda',
+}
+
+
+class ResumoMensalCategoria:
+    """
+    Total mensal por usuário, origem e categoria, lido da visão materializada
+    'resumo_mensal_categoria'. As categorias são a transação bancária
+    (bancario), o grupo de crediário (crediario, pelo mês de vencimento das
+    parcelas), a despesa/receita (fixa) e a renda (renda).
+    """
+
+    __slots__ = ('mes', 'origem', 'categoria_id', 'categoria', 'tipo', 'total', 'quantidade')
+
+    def __init__(self, mes, origem, categoria_id, categoria, tipo, total, quantidade):
+        self.mes = mes
+        self.origem = origem
+        self.categoria_id = categoria_id
+        self.categoria = categoria
+        self.tipo = tipo
+        self.total = total
+        self.quantidade = quantidade
+
+    @staticmethod
+    def create_table():
+        """
+        Cria a visão materializada 'resumo_mensal_categoria', o índice único
+        exigido por REFRESH ... CONCURRENTLY e a tabela que registra a data da
+        última atualização. Deve ser chamada após a criação das tabelas de
+        movimentos.
+        """
+        query = """
+        CREATE MATERIALIZED VIEW IF NOT EXISTS resumo_mensal_categoria AS
+        SELECT user_id, mes, origem, categoria_id, categoria, tipo,
+               SUM(valor) AS total, COUNT(*) AS quantidade
+        FROM (
+            SELECT m.user_id, date_trunc('month', m.data)::date AS mes, 'bancario' AS origem,
+                   t.id AS categoria_id, t.transacao AS categoria, m.tipo, ABS(m.valor) AS valor
+            FROM movimentos_bancarios m
+            JOIN transacoes_bancarias t ON t.id = m.transacao_bancaria_id
+            UNION ALL
+            SELECT mc.user_id, make_date(p.vencimento_ano, p.vencimento_mes, 1), 'crediario',
+                   g.id, g.grupo, g.tipo, p.valor_parcela
+            FROM parcelas_crediario p
+            JOIN movimentos_crediario mc ON mc.id = p.movimento_crediario_id
+            JOIN grupos_crediario g ON g.id = mc.grupo_crediario_id
+            UNION ALL
+            SELECT df.user_id, date_trunc('month', df.mes_ano)::date, 'fixa',
+                   dr.id, dr.despesa_receita, dr.tipo, df.valor
+            FROM despesas_fixas df
+            JOIN despesas_receitas dr ON dr.id = df.despesa_receita_id
+            UNION ALL
+            SELECT mr.user_id, date_trunc('month', mr.mes_pagto)::date, 'renda',
+                   r.id, r.descricao, 'Receita', mr.valor
+            FROM movimentos_renda mr
+            JOIN renda r ON r.id = mr.renda_id
+        ) AS lancamentos
+        GROUP BY user_id, mes, origem, categoria_id, categoria, tipo;
+
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_resumo_mensal_categoria_chave
+            ON resumo_mensal_categoria (user_id, origem, mes, categoria_id, tipo);
+
+        CREATE TABLE IF NOT EXISTS resumo_mensal_atualizacao (
+            id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+            atualizado_em TIMESTAMPTZ NOT NULL
+        );
+        INSERT INTO resumo_mensal_atualizacao (atualizado_em) VALUES (now())
+        ON CONFLICT (id) DO NOTHING;
+        """
+        try:
+            execute_query(query, commit=True)
+            print("Visão 'resumo_mensal_categoria' verificada/criada com sucesso.")
+        except Exception as e:
+            print(f"Erro ao criar visão 'resumo_mensal_categoria': {e}")
+            raise
+
+    @staticmethod
+    def refresh(concurrently=True):
+        """
+        Recalcula a visão. Com concurrently=True as leituras não são
+        bloqueadas durante a atualização (usa o índice único).
+        """
+        modo = 'CONCURRENTLY ' if concurrently else ''
+        query = f"""
+            REFRESH MATERIALIZED VIEW {modo}resumo_mensal_categoria;
+            UPDATE resumo_mensal_atualizacao SET atualizado_em = now();
+        """
+        try:
+            execute_query(query, commit=True)
+        except Exception as e:
+            print(f"Erro ao atualizar a visão 'resumo_mensal_categoria': {e}")
+            raise
+
+    @staticmethod
+    def get_atualizado_em():
+        result = execute_query(
+            "SELECT atualizado_em FROM resumo_mensal_atualizacao", fetchone=True)
+        return result[0] if result else None
+
+    @classmethod
+    def get_by_user(cls, user_id, origem, inicio, fim, categoria_id=None):
+        """
+        Retorna os totais mensais de uma origem entre os meses inicio
+        (inclusive) e fim (exclusive), opcionalmente de uma só categoria.
+        Percorre apenas o trecho (user_id, origem, mes) do índice único.
+        """
+        query = """
+            SELECT mes, origem, categoria_id, categoria, tipo, total, quantidade
+            FROM resumo_mensal_categoria
+            WHERE user_id = %s AND origem = %s AND mes >= %s AND mes < %s
+              AND (%s::integer IS NULL OR categoria_id = %s)
+            ORDER BY mes, categoria
+        """
+        return execute_query(query, (user_id, origem, inicio, fim, categoria_id, categoria_id),
+                             fetchall=True, row_factory=args_row(cls))
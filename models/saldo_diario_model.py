@@ -0,0 +1,100 @@
+# models/saldo_diario_model.py
+
+from decimal import Decimal
+
+from database.db_manager import execute_query
+from psycopg.rows import args_row
+from models.movimento_bancario_model import EFEITO_SALDO_SQL
+
+
+class SaldoDiario:
+    """
+    Saldo de fim de dia de uma conta bancária.
+    """
+
+    __slots__ = ('dia', 'saldo')
+
+    def __init__(self, dia, saldo):
+        self.dia = dia
+        self.saldo = saldo
+
+    @classmethod
+    def get_serie(cls, user_id, conta_bancaria_id, data_inicio, data_fim):
+        """
+        Retorna o saldo de fim de dia da conta para cada dia entre data_inicio
+        e data_fim (inclusive), inclusive dias sem movimentos. Os dias vêm de
+        generate_series; os movimentos do período são somados por dia e
+        acumulados por SUM() OVER (ORDER BY dia) a partir do saldo de
+        abertura. Tanto a abertura quanto a soma por dia usam o índice
+        (conta_bancaria_id, data), então o custo depende do período e não do
+        histórico da conta. Retorna lista vazia se a conta não for do usuário.
+        """
+        query = f"""
+            WITH conta AS (
+                SELECT id, saldo_inicial
+                FROM contas_bancarias
+                WHERE id = %(conta_id)s AND user_id = %(user_id)s
+            ), abertura AS (
+                SELECT conta.saldo_inicial + COALESCE((
+                    SELECT SUM({EFEITO_SALDO_SQL})
+                    FROM movimentos_bancarios
+                    WHERE conta_bancaria_id = conta.id AND data < %(inicio)s
+                ), 0) AS saldo
+                FROM conta
+            ), por_dia AS (
+                SELECT data, SUM({EFEITO_SALDO_SQL}) AS efeito
+                FROM movimentos_bancarios
+                WHERE conta_bancaria_id = (SELECT id FROM conta)
+                  AND data >= %(inicio)s AND data <= %(fim)s
+                GROUP BY data
+            )
+            SELECT d.dia::date,
+                   a.saldo + SUM(COALESCE(p.efeito, 0)) OVER (ORDER BY d.dia)
+            FROM abertura a
+            CROSS JOIN generate_series(%(inicio)s::date, %(fim)s::date, interval '1 day') AS d(dia)
+            LEFT JOIN por_dia p ON p.data = d.dia::date
+            ORDER BY d.dia
+        """
+        params = {'user_id': user_id, 'conta_id': conta_bancaria_id,
+                  'inicio': data_inicio, 'fim': data_fim}
+        try:
+            return execute_query(query, params, fetchall=True, row_factory=args_row(cls))
+        except Exception as e:
+            print(f"Erro ao calcular saldos diários da conta {conta_bancaria_id}: {e}")
+            raise
+
+
+class ResumoChequeEspecial:
+    """
+    Uso do cheque especial (limite) calculado a partir da série de saldos
+    diários: dias no negativo, maior uso e juros estimados. Os juros são
+    cobrados por dia sobre o saldo negativo, com a taxa diária equivalente à
+    taxa mensal informada (juros compostos, mês de 30 dias).
+    """
+
+    __slots__ = ('dias', 'dias_negativos', 'maior_uso', 'percentual_limite', 'juros',
+                 'taxa_mensal', 'dias_no_negativo')
+
+    def __init__(self, saldos, limite, taxa_mensal):
+        self.taxa_mensal = Decimal(taxa_mensal)
+        taxa_diaria = (1 + self.taxa_mensal / 100) ** (Decimal(1) / 30) - 1
+
+        self.dias = len(saldos)
+        self.dias_no_negativo = [s for s in saldos if s.saldo < 0]
+        self.dias_negativos = len(self.dias_no_negativo)
+        self.maior_uso = max((-s.saldo for s in self.dias_no_negativo),
+                             default=Decimal('0.00'))
+        self.percentual_limite = (self.maior_uso / limite * 100) if limite else None
+        self.juros = sum((-s.saldo * taxa_diaria for s in self.dias_no_negativo),
+                         Decimal('0.00')).quantize(Decimal('0.01'))
+
+    def as_dict(self):
+        return {
+            'dias': self.dias,
+            'dias_negativos': self.dias_negativos,
+            'maior_uso': str(self.maior_uso),
+            'percentual_limite': (str(self.percentual_limite.quantize(Decimal('0.01')))
+                                  if self.percentual_limite is not None else None),
+            'taxa_mensal': str(self.taxa_mensal),
+            'juros_estimados': str(self.juros),
+        }
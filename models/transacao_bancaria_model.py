@@ -1,7 +1,9 @@
 # models/transacao_bancaria_model.py
 
 from database.db_manager import execute_query
+from database.async_db_manager import async_execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 
 
 class TransacaoBancaria:
@@ -9,6 +11,8 @@ class TransacaoBancaria:
     Representa uma transação bancária de um usuário no sistema.
     """
 
+    __slots__ = ('id', 'user_id', 'transacao', 'tipo')
+
     def __init__(self, id, user_id, transacao, tipo):
         self.id = id
         self.user_id = user_id
@@ -47,9 +51,10 @@ class TransacaoBancaria:
         rows = execute_query(
             "SELECT id, user_id, transacao, tipo FROM transacoes_bancarias WHERE user_id = %s ORDER BY transacao, tipo",
             (user_id,),
-            fetchall=True
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return [cls(*row) for row in rows] if rows else []
+        return rows
 
     @classmethod
     def get_by_id(cls, transacao_id, user_id):
@@ -59,9 +64,23 @@ class TransacaoBancaria:
         row = execute_query(
             "SELECT id, user_id, transacao, tipo FROM transacoes_bancarias WHERE id = %s AND user_id = %s",
             (transacao_id, user_id),
-            fetchone=True
+            fetchone=True,
+            row_factory=args_row(cls)
+        )
+        return row
+
+    @classmethod
+    async def get_all_by_user_async(cls, user_id):
+        """
+        Versão assíncrona de get_all_by_user.
+        """
+        rows = await async_execute_query(
+            "SELECT id, user_id, transacao, tipo FROM transacoes_bancarias WHERE user_id = %s ORDER BY transacao, tipo",
+            (user_id,),
+            fetchall=True,
+            row_factory=args_row(cls)
         )
-        return cls(*row) if row else None
+        return rows
 
     @classmethod
     def add(cls, user_id, transacao, tipo):
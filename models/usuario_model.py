@@ -2,6 +2,7 @@
 
 from database.db_manager import execute_query
 from psycopg.errors import UniqueViolation, ForeignKeyViolation
+from psycopg.rows import args_row
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 
@@ -62,20 +63,23 @@ class Usuario(UserMixin):
     @classmethod
     def get_all(cls):
         rows = execute_query(
-            "SELECT id, name, email, login, password_hash, is_admin, is_active FROM users ORDER BY is_admin DESC, name", fetchall=True)
-        return [cls(*row) for row in rows] if rows else []
+            "SELECT id, name, email, login, password_hash, is_admin, is_active FROM users ORDER BY is_admin DESC, name", fetchall=True,
+            row_factory=args_row(cls))
+        return rows
 
     @classmethod
     def get_by_id(cls, user_id):
         row = execute_query(
-            "SELECT id, name, email, login, password_hash, is_admin, is_active FROM users WHERE id = %s", (user_id,), fetchone=True)
-        return cls(*row) if row else None
+            "SELECT id, name, email, login, password_hash, is_admin, is_active FROM users WHERE id = %s", (user_id,), fetchone=True,
+            row_factory=args_row(cls))
+        return row
 
     @classmethod
     def get_by_login(cls, login):
         row = execute_query(
-            "SELECT id, name, email, login, password_hash, is_admin, is_active FROM users WHERE login = %s", (login,), fetchone=True)
-        return cls(*row) if row else None
+            "SELECT id, name, email, login, password_hash, is_admin, is_active FROM users WHERE login = %s", (login,), fetchone=True,
+            row_factory=args_row(cls))
+        return row
 
     @classmethod
     def add(cls, name, email, login, password, is_admin=False, is_active=True):
@@ -0,0 +1,44 @@
+# routes/busca_routes.py
+
+from flask import Blueprint, render_template, request, flash
+from flask_login import login_required, current_user
+from models.busca_model import ResultadoBusca, ROTAS_EDICAO
+from models.resumo_mensal_model import ORIGENS
+
+bp_busca = Blueprint('busca', __name__, url_prefix='/busca')
+
+POR_PAGINA = 25
+
+
+@bp_busca.route('/')
+@login_required
+def buscar():
+    """
+    Busca textual em movimentos bancários, compras no crediário, despesas
+    fixas e rendas, com resultados ordenados por relevância e paginados.
+    """
+    termo = request.args.get('q', '').strip()
+    pagina = max(request.args.get('pagina', 1, type=int), 1)
+
+    resultados = []
+    total = 0
+    if termo:
+        if len(termo) < 3:
+            flash('Digite pelo menos 3 caracteres para buscar.', 'warning')
+        else:
+            try:
+                resultados = ResultadoBusca.buscar(
+                    current_user.id, termo, limite=POR_PAGINA,
+                    offset=(pagina - 1) * POR_PAGINA)
+                total = resultados[0].total if resultados else 0
+            except Exception as e:
+                flash(f'Ocorreu um erro ao realizar a busca: {e}', 'danger')
+
+    return render_template('busca/resultados.html',
+                           termo=termo,
+                           resultados=resultados,
+                           total=total,
+                           pagina=pagina,
+                           total_paginas=(total + POR_PAGINA - 1) // POR_PAGINA,
+                           origens=ORIGENS,
+                           rotas_edicao=ROTAS_EDICAO)
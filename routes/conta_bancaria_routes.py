@@ -75,7 +75,6 @@ def add_conta():
                 conta=conta,
                 tipo=tipo,
                 saldo_inicial=saldo_inicial,
-                saldo_atual=saldo_atual,
                 limite=limite
             )
             flash('Conta bancária adicionada com sucesso!', 'success')
@@ -108,7 +107,6 @@ def edit_conta(conta_id):
         agencia = conta.agencia
         conta_num = conta.conta
         saldo_inicial = conta.saldo_inicial
-        saldo_atual = conta.saldo_atual
 
         tipo = request.form.get('tipo')
         limite_str = request.form.get('limite').replace(',', '.')
@@ -128,7 +126,6 @@ def edit_conta(conta_id):
                 conta=conta_num,
                 tipo=tipo,
                 saldo_inicial=saldo_inicial,
-                saldo_atual=saldo_atual,
                 limite=limite
             )
             if updated_conta:
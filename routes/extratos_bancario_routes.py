@@ -1,16 +1,20 @@
 # routes/extratos_bancarios_routes.py
 
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+import asyncio
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
 from models.conta_bancaria_model import ContaBancaria
 from models.movimento_bancario_model import MovimentoBancario
-from models.transacao_bancaria_model import TransacaoBancaria
+from models.saldo_diario_model import SaldoDiario, ResumoChequeEspecial
 from datetime import datetime, date, timedelta
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
 bp_extratos_bancario = Blueprint(
     'extratos_bancario', __name__, url_prefix='/extratos_bancario')
 
+TAXA_CHEQUE_ESPECIAL_PADRAO = Decimal('8.00')  # % ao mês
+MAX_DIAS_SERIE = 366 * 20
+
 
 @bp_extratos_bancario.route('/bancario_form', methods=['GET', 'POST'])
 @login_required
@@ -37,66 +41,199 @@ def bancario_form():
         x['value'], '%Y-%m'), reverse=True)
 
     if request.method == 'POST':
-        conta_id = request.form.get('conta_id', type=int)
+        conta_id_str = request.form.get('conta_id')
         mes_ano_selecionado = request.form.get('mes_ano')
+        data_inicio_str = request.form.get('data_inicio')
+        data_fim_str = request.form.get('data_fim')
+        consolidado = conta_id_str == 'todas'
 
-        if not conta_id or not mes_ano_selecionado:
+        if not conta_id_str or not (mes_ano_selecionado or (data_inicio_str and data_fim_str)):
             flash(
-                'Por favor, selecione uma Conta Bancária e um Mês/Ano.', 'danger')
+                'Por favor, selecione uma Conta Bancária e um Mês/Ano ou período.', 'danger')
             return redirect(url_for('extratos_bancario.bancario_form'))
 
-        conta_selecionada = ContaBancaria.get_by_id(conta_id, current_user.id)
-        if not conta_selecionada:
-            flash(
-                'Conta bancária inválida ou não pertence a você.', 'danger')
-            return redirect(url_for('extratos_bancario.bancario_form'))
+        if not consolidado:
+            conta_selecionada = ContaBancaria.get_by_id(
+                int(conta_id_str), current_user.id) if conta_id_str.isdigit() else None
+            if not conta_selecionada:
+                flash(
+                    'Conta bancária inválida ou não pertence a você.', 'danger')
+                return redirect(url_for('extratos_bancario.bancario_form'))
 
-        return redirect(url_for('extratos_bancario.bancario_view', conta_id=conta_id, mes_ano=mes_ano_selecionado))
+        if data_inicio_str and data_fim_str:
+            return redirect(url_for('extratos_bancario.periodo_view', conta_id=conta_id_str,
+                                    inicio=data_inicio_str, fim=data_fim_str))
+
+        if consolidado:
+            inicio, fim = _limites_do_mes(mes_ano_selecionado)
+            return redirect(url_for('extratos_bancario.periodo_view', conta_id=conta_id_str,
+                                    inicio=inicio.isoformat(), fim=fim.isoformat()))
+
+        return redirect(url_for('extratos_bancario.bancario_view', conta_id=int(conta_id_str), mes_ano=mes_ano_selecionado))
 
     return render_template('extratos/bancario_form.html', contas=contas, meses_anos=unique_meses_anos)
 
 
+def _limites_do_mes(mes_ano):
+    """
+    Retorna o primeiro e o último dia do mês 'AAAA-MM'.
+    Levanta ValueError se o formato for inválido.
+    """
+    inicio = datetime.strptime(mes_ano, '%Y-%m').date()
+    proximo_mes = date(inicio.year + inicio.month // 12, inicio.month % 12 + 1, 1)
+    return inicio, proximo_mes - timedelta(days=1)
+
+
 @bp_extratos_bancario.route('/bancario_view/<int:conta_id>/<string:mes_ano>', methods=['GET'])
 @login_required
-def bancario_view(conta_id, mes_ano):
-    conta = ContaBancaria.get_by_id(conta_id, current_user.id)
+async def bancario_view(conta_id, mes_ano):
+    try:
+        inicio, fim = _limites_do_mes(mes_ano)
+    except ValueError:
+        flash('Formato de mês/ano inválido.', 'danger')
+        return redirect(url_for('extratos_bancario.bancario_form'))
+
+    # A conta e o extrato (saldo de abertura + linhas com saldo acumulado)
+    # são consultas independentes: rodam em paralelo no pool assíncrono.
+    conta, (saldo_inicial, linhas) = await asyncio.gather(
+        ContaBancaria.get_by_id_async(conta_id, current_user.id),
+        MovimentoBancario.get_extrato_async(
+            current_user.id, inicio, fim, conta_bancaria_id=conta_id)
+    )
+
     if not conta:
         flash('Conta bancária não encontrada ou você não tem permissão para acessá-la.', 'danger')
         return redirect(url_for('extratos_bancario.bancario_form'))
 
+    return render_template('extratos/bancario_view.html',
+                           conta=conta,
+                           periodo_formatado=f"Mês/Ano: {inicio.strftime('%m/%Y')}",
+                           rotulo_periodo='do Mês',
+                           saldo_inicial=saldo_inicial,
+                           linhas=linhas,
+                           saldo_final=linhas[-1].saldo if linhas else saldo_inicial)
+
+
+@bp_extratos_bancario.route('/periodo', methods=['GET'])
+@login_required
+async def periodo_view():
+    """
+    Extrato de um período qualquer (inicio e fim no formato AAAA-MM-DD,
+    inclusive) de uma conta ou, com conta_id=todas, consolidado de todas as
+    contas do usuário, com o saldo acumulado em cada linha.
+    """
+    conta_id_str = request.args.get('conta_id', '')
     try:
-        data_extrato_dt = datetime.strptime(mes_ano, '%Y-%m')
-        mes_ano_formatado = data_extrato_dt.strftime('%m/%Y')
+        inicio = date.fromisoformat(request.args.get('inicio', ''))
+        fim = date.fromisoformat(request.args.get('fim', ''))
     except ValueError:
-        flash('Formato de mês/ano inválido.', 'danger')
+        flash('Período inválido. Informe as datas inicial e final.', 'danger')
         return redirect(url_for('extratos_bancario.bancario_form'))
 
-    start_of_month = data_extrato_dt.date()
-    if data_extrato_dt.month == 12:
-        end_of_month_exclusive = date(data_extrato_dt.year + 1, 1, 1)
+    if fim < inicio:
+        flash('A data final deve ser igual ou posterior à data inicial.', 'danger')
+        return redirect(url_for('extratos_bancario.bancario_form'))
+
+    conta = None
+    if conta_id_str == 'todas':
+        saldo_inicial, linhas = await MovimentoBancario.get_extrato_async(
+            current_user.id, inicio, fim)
+    elif conta_id_str.isdigit():
+        conta, (saldo_inicial, linhas) = await asyncio.gather(
+            ContaBancaria.get_by_id_async(int(conta_id_str), current_user.id),
+            MovimentoBancario.get_extrato_async(
+                current_user.id, inicio, fim, conta_bancaria_id=int(conta_id_str))
+        )
+        if not conta:
+            flash('Conta bancária não encontrada ou você não tem permissão para acessá-la.', 'danger')
+            return redirect(url_for('extratos_bancario.bancario_form'))
     else:
-        end_of_month_exclusive = date(
-            data_extrato_dt.year, data_extrato_dt.month + 1, 1)
+        flash('Conta bancária inválida.', 'danger')
+        return redirect(url_for('extratos_bancario.bancario_form'))
 
-    saldo_inicial_mes = MovimentoBancario.get_balance_up_to_date(
-        current_user.id, conta.id, start_of_month
-    )
+    return render_template('extratos/bancario_view.html',
+                           conta=conta,
+                           periodo_formatado=f"Período: {inicio.strftime('%d/%m/%Y')} a {fim.strftime('%d/%m/%Y')}",
+                           rotulo_periodo='do Período',
+                           saldo_inicial=saldo_inicial,
+                           linhas=linhas,
+                           saldo_final=linhas[-1].saldo if linhas else saldo_inicial)
+
+
+def _parametros_saldos_diarios(args):
+    """
+    Lê conta_id, inicio, fim (AAAA-MM-DD) e taxa (% ao mês) da requisição.
+    Sem datas, usa os últimos 12 meses. Levanta ValueError com a mensagem
+    de erro se algum parâmetro for inválido.
+    """
+    conta_id = args.get('conta_id', type=int)
+    if not conta_id:
+        raise ValueError('Selecione uma conta bancária.')
+    hoje = date.today()
+    try:
+        fim = date.fromisoformat(args['fim']) if args.get('fim') else hoje
+        inicio = date.fromisoformat(args['inicio']) if args.get('inicio') \
+            else fim - timedelta(days=365)
+    except ValueError as e:
+        raise ValueError('Período inválido.') from e
+    if fim < inicio:
+        raise ValueError('A data final deve ser igual ou posterior à data inicial.')
+    if (fim - inicio).days > MAX_DIAS_SERIE:
+        raise ValueError('O período máximo é de 20 anos.')
+    try:
+        taxa = Decimal(args.get('taxa', '').replace(',', '.')) if args.get('taxa') \
+            else TAXA_CHEQUE_ESPECIAL_PADRAO
+    except InvalidOperation as e:
+        raise ValueError('Taxa de juros inválida.') from e
+    if taxa < 0:
+        raise ValueError('A taxa de juros não pode ser negativa.')
+    return conta_id, inicio, fim, taxa
 
-    movimentos = MovimentoBancario.get_by_account_and_month(
-        current_user.id, conta.id, data_extrato_dt.year, data_extrato_dt.month
-    )
 
-    for mov in movimentos:
-        mov.transacao_detalhes = TransacaoBancaria.get_by_id(
-            mov.transacao_bancaria_id, current_user.id)
+@bp_extratos_bancario.route('/saldos_diarios', methods=['GET'])
+@login_required
+def saldos_diarios_view():
+    """
+    Saldos de fim de dia de uma conta no período, com dias no cheque
+    especial, maior uso do limite e juros estimados à taxa informada.
+    """
+    contas = ContaBancaria.get_all_by_user(current_user.id)
+    contexto = dict(contas=contas, conta=None, resumo=None, args=request.args)
 
-    saldo_final_mes = saldo_inicial_mes
-    for mov in movimentos:
-        saldo_final_mes += mov.valor
+    if request.args.get('conta_id'):
+        try:
+            conta_id, inicio, fim, taxa = _parametros_saldos_diarios(request.args)
+            conta = ContaBancaria.get_by_id(conta_id, current_user.id)
+            if not conta:
+                raise ValueError('Conta bancária inválida ou não pertence a você.')
+            saldos = SaldoDiario.get_serie(current_user.id, conta_id, inicio, fim)
+            contexto.update(conta=conta, inicio=inicio, fim=fim,
+                            resumo=ResumoChequeEspecial(saldos, conta.limite, taxa))
+        except ValueError as e:
+            flash(str(e), 'danger')
 
-    return render_template('extratos/bancario_view.html',
-                           conta=conta,
-                           mes_ano_formatado=mes_ano_formatado,
-                           saldo_inicial=saldo_inicial_mes,
-                           movimentos=movimentos,
-                           saldo_final=saldo_final_mes)
+    return render_template('extratos/saldos_diarios.html', **contexto)
+
+
+@bp_extratos_bancario.route('/saldos_diarios.json', methods=['GET'])
+@login_required
+def saldos_diarios_json():
+    """
+    Série de saldos de fim de dia e resumo do cheque especial em JSON.
+    """
+    try:
+        conta_id, inicio, fim, taxa = _parametros_saldos_diarios(request.args)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+    conta = ContaBancaria.get_by_id(conta_id, current_user.id)
+    if not conta:
+        return jsonify({'erro': 'Conta bancária não encontrada.'}), 404
+
+    saldos = SaldoDiario.get_serie(current_user.id, conta_id, inicio, fim)
+    return jsonify({
+        'conta_id': conta_id,
+        'limite': str(conta.limite),
+        'resumo': ResumoChequeEspecial(saldos, conta.limite, taxa).as_dict(),
+        'serie': [{'dia': s.dia.isoformat(), 'saldo': str(s.saldo)} for s in saldos],
+    })
@@ -1,11 +1,13 @@
 # routes/extratos_crediario_routes.py
 
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+import asyncio
+from flask import Blueprint, render_template, request, flash, redirect, url_for, current_app
 from flask_login import login_required, current_user
 from models.crediario_model import Crediario
 from models.movimento_crediario_model import MovimentoCrediario
 from models.grupo_crediario_model import GrupoCrediario
 from models.parcela_crediario_model import ParcelaCrediario
+from models.conta_bancaria_model import ContaBancaria
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 
@@ -64,16 +66,10 @@ def crediario_form():
 
 @bp_extratos_crediario.route('/crediario_view/<int:crediario_id>/<string:mes_ano>', methods=['GET'])
 @login_required
-def crediario_view(crediario_id, mes_ano):
+async def crediario_view(crediario_id, mes_ano):
     """
     Exibe o extrato de crediário para o crediário e mês/ano selecionados.
     """
-    crediario = Crediario.get_by_id(crediario_id, current_user.id)
-    if not crediario:
-        flash(
-            'Crediário não encontrado ou você não tem permissão para acessá-lo.', 'danger')
-        return redirect(url_for('extratos_crediario.crediario_form'))
-
     try:
         data_extrato_dt = datetime.strptime(mes_ano, '%Y-%m')
         mes_ano_formatado = data_extrato_dt.strftime('%m/%Y')
@@ -81,19 +77,30 @@ def crediario_view(crediario_id, mes_ano):
         flash('Formato de mês/ano inválido.', 'danger')
         return redirect(url_for('extratos_crediario.crediario_form'))
 
-    movimentos_raw = MovimentoCrediario.get_by_crediario_and_month(
-        current_user.id, crediario.id, data_extrato_dt.year, data_extrato_dt.month
+    crediario, movimentos_raw, grupos, fatura, contas = await asyncio.gather(
+        Crediario.get_by_id_async(crediario_id, current_user.id),
+        MovimentoCrediario.get_by_crediario_and_month_async(
+            current_user.id, crediario_id, data_extrato_dt.year, data_extrato_dt.month),
+        GrupoCrediario.get_all_by_user_async(current_user.id),
+        ParcelaCrediario.get_fatura_async(
+            current_user.id, crediario_id, data_extrato_dt.year, data_extrato_dt.month),
+        ContaBancaria.get_all_by_user_async(current_user.id)
     )
 
+    if not crediario:
+        flash(
+            'Crediário não encontrado ou você não tem permissão para acessá-lo.', 'danger')
+        return redirect(url_for('extratos_crediario.crediario_form'))
+
+    grupos_por_id = {g.id: g for g in grupos}
+
     movimentos = []
     for mov in movimentos_raw:
-        crediario_obj = Crediario.get_by_id(mov.crediario_id, current_user.id)
-        grupo_crediario_obj = GrupoCrediario.get_by_id(
-            mov.grupo_crediario_id, current_user.id)
+        grupo_crediario_obj = grupos_por_id.get(mov.grupo_crediario_id)
 
         mov_data = {
             'id': mov.id,
-            'crediario': crediario_obj.crediario if crediario_obj else 'Desconhecido',
+            'crediario': crediario.crediario,
             'grupo_crediario': grupo_crediario_obj.grupo if grupo_crediario_obj else 'Desconhecido',
             'descricao': mov.descricao,
             'data_compra': mov.data_compra,
@@ -107,25 +114,69 @@ def crediario_view(crediario_id, mes_ano):
 
     return render_template('extratos/crediario_view.html',
                            crediario=crediario,
+                           mes_ano=mes_ano,
                            mes_ano_formatado=mes_ano_formatado,
-                           movimentos=movimentos)
+                           movimentos=movimentos,
+                           fatura=fatura,
+                           contas=contas,
+                           hoje=date.today())
+
+
+@bp_extratos_crediario.route('/pagar_fatura/<int:crediario_id>/<string:mes_ano>', methods=['POST'])
+@login_required
+def pagar_fatura(crediario_id, mes_ano):
+    """
+    Paga as parcelas em aberto da fatura do mês/ano com um único movimento
+    bancário na conta escolhida.
+    """
+    destino = redirect(url_for('extratos_crediario.crediario_view',
+                               crediario_id=crediario_id, mes_ano=mes_ano))
+    try:
+        mes_fatura = datetime.strptime(mes_ano, '%Y-%m')
+        data_pagamento = datetime.strptime(request.form.get('data', ''), '%Y-%m-%d').date()
+    except ValueError:
+        flash('Mês/ano ou data de pagamento inválidos.', 'danger')
+        return destino
+
+    conta_bancaria_id = request.form.get('conta_bancaria_id', type=int)
+    if not conta_bancaria_id:
+        flash('Selecione a conta bancária do pagamento.', 'danger')
+        return destino
+
+    try:
+        _, quantidade, total = ParcelaCrediario.pagar_fatura(
+            current_user.id, crediario_id, mes_fatura.year, mes_fatura.month,
+            conta_bancaria_id, data_pagamento)
+        flash(f'Fatura paga: {quantidade} parcela(s), R$ {total:.2f}.', 'success')
+    except ValueError as e:
+        flash(f'Erro de validação: {e}', 'danger')
+    except Exception as e:
+        flash(f'Ocorreu um erro ao pagar a fatura: {e}', 'danger')
+        current_app.logger.error(
+            f"Erro ao pagar fatura do crediário ID {crediario_id} ({mes_ano}): {e}", exc_info=True)
+
+    return destino
 
 
 @bp_extratos_crediario.route('/view_parcelas/<int:movimento_id>', methods=['GET'])
 @login_required
-def view_parcelas(movimento_id):
+async def view_parcelas(movimento_id):
     """
     Exibe os detalhes de um movimento de crediário e suas parcelas associadas.
     """
-    movimento = MovimentoCrediario.get_by_id(movimento_id, current_user.id)
+    movimento, parcelas = await asyncio.gather(
+        MovimentoCrediario.get_by_id_async(movimento_id, current_user.id),
+        ParcelaCrediario.get_by_movimento_id_async(movimento_id)
+    )
     if not movimento:
         flash('Movimento de crediário não encontrado ou você não tem permissão para acessá-lo.', 'danger')
         return redirect(url_for('extratos_crediario.crediario_form'))
 
-    crediario_obj = Crediario.get_by_id(
-        movimento.crediario_id, current_user.id)
-    grupo_crediario_obj = GrupoCrediario.get_by_id(
-        movimento.grupo_crediario_id, current_user.id)
+    crediario_obj, grupo_crediario_obj = await asyncio.gather(
+        Crediario.get_by_id_async(movimento.crediario_id, current_user.id),
+        GrupoCrediario.get_by_id_async(
+            movimento.grupo_crediario_id, current_user.id)
+    )
 
     movimento_detalhes = {
         'id': movimento.id,
@@ -142,8 +193,6 @@ def view_parcelas(movimento_id):
         'valor_parcela_mensal': movimento.valor_parcela_mensal
     }
 
-    parcelas = ParcelaCrediario.get_by_movimento_id(movimento_id)
-
     return render_template('extratos/parcelas_view.html',
                            movimento=movimento_detalhes,
                            parcelas=parcelas)
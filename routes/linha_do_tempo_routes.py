@@ -0,0 +1,46 @@
+# routes/linha_do_tempo_routes.py
+
+from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask_login import login_required, current_user
+from models.linha_do_tempo_model import LancamentoLinhaDoTempo
+from models.resumo_mensal_model import ORIGENS
+
+bp_linha_do_tempo = Blueprint(
+    'linha_do_tempo', __name__, url_prefix='/linha_do_tempo')
+
+POR_PAGINA = 50
+
+
+@bp_linha_do_tempo.route('/')
+@login_required
+def list_lancamentos():
+    """
+    Linha do tempo com todos os lançamentos do usuário (bancário, crediário,
+    despesas fixas e renda), do mais recente ao mais antigo. A página
+    seguinte começa após o último lançamento exibido (parâmetro 'apos').
+    """
+    origem = request.args.get('origem') or None
+    if origem not in ORIGENS:
+        origem = None
+
+    apos = None
+    if request.args.get('apos'):
+        try:
+            apos = LancamentoLinhaDoTempo.parse_cursor(request.args['apos'])
+        except ValueError:
+            flash('Posição de página inválida.', 'danger')
+            return redirect(url_for('linha_do_tempo.list_lancamentos', origem=origem))
+
+    lancamentos = LancamentoLinhaDoTempo.get_page(
+        current_user.id, limite=POR_PAGINA + 1, apos=apos, origem=origem)
+    proximo = None
+    if len(lancamentos) > POR_PAGINA:
+        lancamentos = lancamentos[:POR_PAGINA]
+        proximo = lancamentos[-1].cursor
+
+    return render_template('linha_do_tempo/list.html',
+                           lancamentos=lancamentos,
+                           origens=ORIGENS,
+                           origem=origem,
+                           primeira_pagina=apos is None,
+                           proximo=proximo)
@@ -1,5 +1,6 @@
 # routes/movimento_bancario_routes.py
 
+import asyncio
 import json
 import base64
 from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app
@@ -7,6 +8,9 @@ from flask_login import login_required, current_user
 from models.movimento_bancario_model import MovimentoBancario
 from models.conta_bancaria_model import ContaBancaria
 from models.transacao_bancaria_model import TransacaoBancaria
+from utils.fragments import (wants_fragment, messages_fragment, redirect_or_fragment,
+                             redirect_or_row, row_fragment)
+from utils.streaming import peek, stream_page, stream_csv
 from functools import wraps
 from datetime import datetime, date
 from decimal import Decimal
@@ -32,18 +36,83 @@ def own_movement_required(f):
     return decorated_function
 
 
+def _detalhar(movimento, contas_por_id, transacoes_por_id):
+    """
+    Anexa ao movimento a conta, a transação e a data formatada exibidas em
+    movimento_bancario/_row.html.
+    """
+    movimento.conta_detalhes = contas_por_id.get(movimento.conta_bancaria_id)
+    movimento.transacao_detalhes = transacoes_por_id.get(
+        movimento.transacao_bancaria_id)
+    movimento.data_formatada = movimento.data.strftime(
+        '%d/%m/%Y') if movimento.data else ''
+    return movimento
+
+
+def _redirect_or_row(movimento, contas, transacoes):
+    """
+    Devolve a linha do movimento para o main.js atualizar a listagem sem
+    recarregá-la, ou redireciona para a listagem.
+    """
+    _detalhar(movimento, {c.id: c for c in contas},
+              {t.id: t for t in transacoes})
+    return redirect_or_row(url_for('movimento_bancario.list_movimentos'),
+                           f'movimento-{movimento.id}', 'movimento_bancario/_row.html',
+                           movimento=movimento)
+
+
 @bp_movimento_bancario.route('/')
 @login_required
-def list_movimentos():
-    movimentos = MovimentoBancario.get_all_by_user(current_user.id)
-    for mov in movimentos:
-        mov.conta_detalhes = ContaBancaria.get_by_id(
-            mov.conta_bancaria_id, current_user.id)
-        mov.transacao_detalhes = TransacaoBancaria.get_by_id(
-            mov.transacao_bancaria_id, current_user.id)
-        mov.data_formatada = mov.data.strftime('%d/%m/%Y') if mov.data else ''
-
-    return render_template('movimento_bancario/list.html', movimentos=movimentos)
+async def list_movimentos():
+    user_id = current_user.id
+    contas, transacoes = await asyncio.gather(
+        ContaBancaria.get_all_by_user_async(user_id),
+        TransacaoBancaria.get_all_by_user_async(user_id)
+    )
+    contas_por_id = {c.id: c for c in contas}
+    transacoes_por_id = {t.id: t for t in transacoes}
+
+    def detalhar(movimentos):
+        for mov in movimentos:
+            yield _detalhar(mov, contas_por_id, transacoes_por_id)
+
+    # Os movimentos são lidos em lotes e a página é enviada conforme é
+    # renderizada, sem carregar todo o histórico em memória.
+    tem_movimentos, movimentos = peek(
+        detalhar(MovimentoBancario.iter_by_user(user_id)))
+
+    return stream_page('movimento_bancario/list.html',
+                       movimentos=movimentos,
+                       tem_movimentos=tem_movimentos,
+                       transacoes=transacoes)
+
+
+@bp_movimento_bancario.route('/exportar.csv')
+@login_required
+def export_movimentos_csv():
+    """
+    Exporta todos os movimentos bancários do usuário em CSV, em streaming.
+    """
+    user_id = current_user.id
+    contas_por_id = {c.id: c for c in ContaBancaria.get_all_by_user(user_id)}
+    transacoes_por_id = {
+        t.id: t for t in TransacaoBancaria.get_all_by_user(user_id)}
+
+    def linhas():
+        for mov in MovimentoBancario.iter_by_user(user_id):
+            conta = contas_por_id.get(mov.conta_bancaria_id)
+            transacao = transacoes_por_id.get(mov.transacao_bancaria_id)
+            yield [
+                mov.data.strftime('%d/%m/%Y') if mov.data else '',
+                f"{conta.banco} - Ag: {conta.agencia} C: {conta.conta}" if conta else '',
+                transacao.transacao if transacao else '',
+                mov.tipo,
+                f"{mov.valor:.2f}".replace('.', ',')
+            ]
+
+    return stream_csv('movimentos_bancarios.csv',
+                      ['Data', 'Conta', 'Transação', 'Tipo', 'Valor'],
+                      linhas())
 
 
 @bp_movimento_bancario.route('/add', methods=['GET', 'POST'])
@@ -82,23 +151,15 @@ def add_movimento():
             selected_transacao = TransacaoBancaria.get_by_id(
                 transacao_bancaria_id, current_user.id)
             if not selected_transacao:
-                flash(
-                    'Transação selecionada não encontrada ou não lhe pertence.', 'danger')
-                return render_template('movimento_bancario/add.html',
-                                       contas=contas, transacoes=transacoes,
-                                       TIPOS_MOVIMENTO=TIPOS_MOVIMENTO, today_date=today_date,
-                                       transacoes_json_data=transacoes_base64_string)
+                raise ValueError(
+                    'Transação selecionada não encontrada ou não lhe pertence.')
 
             if (selected_transacao.tipo == 'Crédito' and valor < 0) or \
                (selected_transacao.tipo == 'Débito' and valor > 0):
-                flash(
-                    f'O valor introduzido ({valor_str}) é inválido para o tipo de transação "{selected_transacao.tipo}".', 'danger')
-                return render_template('movimento_bancario/add.html',
-                                       contas=contas, transacoes=transacoes,
-                                       TIPOS_MOVIMENTO=TIPOS_MOVIMENTO, today_date=today_date,
-                                       transacoes_json_data=transacoes_base64_string)
+                raise ValueError(
+                    f'O valor introduzido ({valor_str}) é inválido para o tipo de transação "{selected_transacao.tipo}".')
 
-            MovimentoBancario.add(
+            novo_movimento = MovimentoBancario.add(
                 user_id=current_user.id,
                 conta_bancaria_id=conta_bancaria_id,
                 transacao_bancaria_id=transacao_bancaria_id,
@@ -108,7 +169,7 @@ def add_movimento():
             )
 
             flash('Movimento bancário adicionado com sucesso!', 'success')
-            return redirect(url_for('movimento_bancario.list_movimentos'))
+            return _redirect_or_row(novo_movimento, contas, transacoes)
         except ValueError as e:
             flash(f'Erro de validação: {e}', 'danger')
         except Exception as e:
@@ -117,12 +178,113 @@ def add_movimento():
             current_app.logger.error(
                 f"Erro ao adicionar movimento bancário: {e}", exc_info=True)
 
+        if wants_fragment():
+            return messages_fragment(422)
+
     return render_template('movimento_bancario/add.html',
                            contas=contas, transacoes=transacoes,
                            TIPOS_MOVIMENTO=TIPOS_MOVIMENTO, today_date=today_date,
                            transacoes_json_data=transacoes_base64_string)
 
 
+def _parse_valor_transferencia(valor_str):
+    """
+    Converte o valor digitado ('1.500,75' ou '1500.75') em Decimal positivo.
+    """
+    valor_str = (valor_str or '').strip()
+    if ',' in valor_str:
+        valor_str = valor_str.replace('.', '').replace(',', '.')
+    try:
+        valor = Decimal(valor_str)
+    except ArithmeticError as e:
+        raise ValueError(f'Valor inválido: {valor_str}.') from e
+    if valor <= 0:
+        raise ValueError('O valor da transferência deve ser positivo.')
+    return valor
+
+
+@bp_movimento_bancario.route('/transferir', methods=['GET', 'POST'])
+@login_required
+def add_transferencia():
+    """
+    Transferência entre duas contas do próprio usuário: grava a saída na
+    conta de origem e a entrada na de destino, ligadas entre si.
+    """
+    contas = ContaBancaria.get_all_by_user(current_user.id)
+    if len(contas) < 2:
+        flash('Precisa de registar pelo menos duas contas bancárias para fazer uma transferência.', 'warning')
+        return redirect(url_for('movimento_bancario.list_movimentos'))
+
+    if request.method == 'POST':
+        try:
+            data = datetime.strptime(request.form.get('data', ''), '%Y-%m-%d').date()
+            valor = _parse_valor_transferencia(request.form.get('valor'))
+
+            _, saldos = MovimentoBancario.transferir(
+                user_id=current_user.id,
+                conta_origem_id=request.form.get('conta_origem_id', type=int),
+                conta_destino_id=request.form.get('conta_destino_id', type=int),
+                data=data,
+                valor=valor
+            )
+            bancos = {c.id: c.banco for c in contas}
+            flash('Transferência realizada com sucesso! ' + ', '.join(
+                f'{bancos.get(conta_id, conta_id)}: R$ {saldo:.2f}'
+                for conta_id, saldo in saldos.items()), 'success')
+            return redirect_or_fragment(url_for('movimento_bancario.list_movimentos'))
+        except ValueError as e:
+            flash(f'Erro de validação: {e}', 'danger')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao realizar a transferência: {e}', 'danger')
+            current_app.logger.error(
+                f"Erro ao transferir entre contas bancárias: {e}", exc_info=True)
+
+        if wants_fragment():
+            return messages_fragment(422)
+
+    return render_template('movimento_bancario/transferencia.html',
+                           movimento=None, contas=contas, form=request.form,
+                           data_str=request.form.get('data', date.today().isoformat()),
+                           valor_str=request.form.get('valor', ''))
+
+
+def _edit_transferencia(movimento, contas):
+    """
+    Edição de uma perna de transferência: conta da própria perna, data e
+    valor (aplicados também à outra perna).
+    """
+    if request.method == 'POST':
+        try:
+            nova_data = datetime.strptime(request.form.get('data', ''), '%Y-%m-%d').date()
+            novo_valor = _parse_valor_transferencia(request.form.get('valor'))
+
+            updated_movimento, saldos = MovimentoBancario.update_transferencia(
+                movimento_id=movimento.id,
+                user_id=current_user.id,
+                nova_conta_bancaria_id=request.form.get('conta_bancaria_id', type=int),
+                nova_data=nova_data,
+                novo_valor=novo_valor
+            )
+            flash(
+                f'Transferência atualizada com sucesso! Saldo atual da conta: '
+                f'R$ {saldos[updated_movimento.conta_bancaria_id]:.2f}', 'success')
+            return redirect_or_fragment(url_for('movimento_bancario.list_movimentos'))
+        except ValueError as e:
+            flash(f'Erro de validação: {e}', 'danger')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao atualizar a transferência: {e}', 'danger')
+            current_app.logger.error(
+                f"Erro ao atualizar transferência do movimento ID {movimento.id}: {e}", exc_info=True)
+
+        if wants_fragment():
+            return messages_fragment(422)
+
+    return render_template('movimento_bancario/transferencia.html',
+                           movimento=movimento, contas=contas, form=request.form,
+                           data_str=movimento.data.strftime('%Y-%m-%d'),
+                           valor_str=f"{abs(movimento.valor):.2f}".replace('.', ','))
+
+
 @bp_movimento_bancario.route('/edit/<int:movimento_id>', methods=['GET', 'POST'])
 @login_required
 @own_movement_required
@@ -133,6 +295,9 @@ def edit_movimento(movimento_id):
         return redirect(url_for('movimento_bancario.list_movimentos'))
 
     contas = ContaBancaria.get_all_by_user(current_user.id)
+    if movimento.transferencia_id:
+        return _edit_transferencia(movimento, contas)
+
     transacoes = TransacaoBancaria.get_all_by_user(current_user.id)
 
     transacoes_json_data = [
@@ -161,9 +326,6 @@ def edit_movimento(movimento_id):
         novo_valor_str = request.form.get('valor')
         novo_tipo = request.form.get('tipo_hidden')
 
-        old_valor = movimento.valor
-        old_tipo = movimento.tipo
-
         try:
             nova_data = datetime.strptime(nova_data_str, '%Y-%m-%d').date()
             novo_valor = Decimal(novo_valor_str)
@@ -171,40 +333,27 @@ def edit_movimento(movimento_id):
             selected_transacao = TransacaoBancaria.get_by_id(
                 nova_transacao_bancaria_id, current_user.id)
             if not selected_transacao:
-                flash(
-                    'Transação selecionada não encontrada ou não lhe pertence.', 'danger')
-                return render_template('movimento_bancario/edit.html',
-                                       movimento=movimento, contas=contas,
-                                       transacoes=transacoes, TIPOS_MOVIMENTO=TIPOS_MOVIMENTO,
-                                       movimento_date_str=movimento_date_str,
-                                       transacoes_json_data=transacoes_base64_string)
+                raise ValueError(
+                    'Transação selecionada não encontrada ou não lhe pertence.')
 
             if (selected_transacao.tipo == 'Crédito' and novo_valor < 0) or \
                (selected_transacao.tipo == 'Débito' and novo_valor > 0):
-                flash(
-                    f'O valor introduzido ({novo_valor_str}) é inválido para o tipo de transação "{selected_transacao.tipo}".', 'danger')
-                return render_template('movimento_bancario/edit.html',
-                                       movimento=movimento, contas=contas,
-                                       transacoes=transacoes, TIPOS_MOVIMENTO=TIPOS_MOVIMENTO,
-                                       movimento_date_str=movimento_date_str,
-                                       transacoes_json_data=transacoes_base64_string)
-
-            updated_movimento = MovimentoBancario.update(
+                raise ValueError(
+                    f'O valor introduzido ({novo_valor_str}) é inválido para o tipo de transação "{selected_transacao.tipo}".')
+
+            updated_movimento, saldos = MovimentoBancario.update(
                 movimento_id=movimento_id,
                 user_id=current_user.id,
-                conta_bancaria_id=nova_conta_bancaria_id,
-                transacao_bancaria_id=nova_transacao_bancaria_id,
-                data=nova_data,
-                valor=novo_valor,
-                tipo=novo_tipo,
-                old_valor=old_valor,
-                old_tipo=old_tipo
+                nova_conta_bancaria_id=nova_conta_bancaria_id,
+                nova_transacao_bancaria_id=nova_transacao_bancaria_id,
+                nova_data=nova_data,
+                novo_valor=novo_valor,
+                novo_tipo=novo_tipo
             )
-            if updated_movimento:
-                flash('Movimento bancário atualizado com sucesso!', 'success')
-                return redirect(url_for('movimento_bancario.list_movimentos'))
-            else:
-                flash('Erro ao atualizar movimento bancário.', 'danger')
+            flash(
+                f'Movimento bancário atualizado com sucesso! Saldo atual da conta: '
+                f'R$ {saldos[updated_movimento.conta_bancaria_id]:.2f}', 'success')
+            return _redirect_or_row(updated_movimento, contas, transacoes)
         except ValueError as e:
             flash(f'Erro de validação: {e}', 'danger')
         except Exception as e:
@@ -213,6 +362,9 @@ def edit_movimento(movimento_id):
             current_app.logger.error(
                 f"Erro ao atualizar movimento bancário ID {movimento_id}: {e}", exc_info=True)
 
+        if wants_fragment():
+            return messages_fragment(422)
+
     return render_template('movimento_bancario/edit.html',
                            movimento=movimento, contas=contas,
                            transacoes=transacoes, TIPOS_MOVIMENTO=TIPOS_MOVIMENTO,
@@ -222,24 +374,72 @@ def edit_movimento(movimento_id):
 
 @bp_movimento_bancario.route('/delete/<int:movimento_id>', methods=['POST'])
 @login_required
-@own_movement_required
 def delete_movimento(movimento_id):
-    movimento_a_deletar = MovimentoBancario.get_by_id(
-        movimento_id, current_user.id)
-    if not movimento_a_deletar:
-        flash('Movimento bancário não encontrado para deleção.', 'danger')
-        return redirect(url_for('movimento_bancario.list_movimentos'))
-
+    status = 200
+    removidos = []
     try:
-        if MovimentoBancario.delete(movimento_id, current_user.id):
+        removidos = MovimentoBancario.delete(movimento_id, current_user.id)
+        if removidos:
             flash('Movimento bancário deletado com sucesso!', 'success')
         else:
             flash('Erro ao deletar movimento bancário.', 'danger')
+            status = 422
     except ValueError as e:
         flash(f'Erro ao deletar movimento: {e}', 'danger')
+        status = 404
     except Exception as e:
         flash(
             f'Ocorreu um erro inesperado ao tentar deletar o movimento bancário: {e}', 'danger')
         current_app.logger.error(
             f"Erro ao deletar movimento bancário ID {movimento_id}: {e}", exc_info=True)
-    return redirect(url_for('movimento_bancario.list_movimentos'))
\ No newline at end of file
+        status = 500
+
+    if wants_fragment():
+        if status == 200 and len(removidos) > 1:
+            # Transferência: a outra perna também saiu e a listagem é recarregada.
+            return redirect_or_fragment(url_for('movimento_bancario.list_movimentos'))
+        if status == 200:
+            return row_fragment(f'movimento-{movimento_id}')
+        return messages_fragment(status)
+    return redirect(url_for('movimento_bancario.list_movimentos'))
+
+
+@bp_movimento_bancario.route('/lote', methods=['POST'])
+@login_required
+def batch_movimentos():
+    """
+    Aplica uma ação aos movimentos selecionados na listagem:
+    'excluir' (com estorno dos saldos) ou 'recategorizar' (troca a transação).
+    """
+    ids = request.form.getlist('ids', type=int)
+    acao = request.form.get('acao')
+
+    try:
+        if not ids:
+            raise ValueError('Selecione pelo menos um movimento.')
+
+        if acao == 'excluir':
+            quantidade = MovimentoBancario.delete_many(ids, current_user.id)
+            flash(f'{quantidade} movimento(s) bancário(s) deletado(s) com sucesso!', 'success')
+        elif acao == 'recategorizar':
+            transacao_bancaria_id = request.form.get(
+                'transacao_bancaria_id', type=int)
+            if not transacao_bancaria_id:
+                raise ValueError('Selecione a nova transação.')
+            quantidade = MovimentoBancario.update_transacao_many(
+                ids, current_user.id, transacao_bancaria_id)
+            ignorados = len(ids) - quantidade
+            flash(f'{quantidade} movimento(s) bancário(s) recategorizado(s) com sucesso!', 'success')
+            if ignorados:
+                flash(f'{ignorados} movimento(s) ignorado(s): o tipo não corresponde ao da transação ou são transferências.', 'warning')
+        else:
+            raise ValueError('Ação inválida.')
+    except ValueError as e:
+        flash(f'Erro de validação: {e}', 'danger')
+    except Exception as e:
+        flash(
+            f'Ocorreu um erro ao processar os movimentos selecionados: {e}', 'danger')
+        current_app.logger.error(
+            f"Erro na ação em lote '{acao}' de movimentos bancários: {e}", exc_info=True)
+
+    return redirect(url_for('movimento_bancario.list_movimentos'))
@@ -1,5 +1,6 @@
 # routes/movimento_crediario_routes.py
 
+import asyncio
 import json
 import base64
 from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app
@@ -7,9 +8,12 @@ from flask_login import login_required, current_user
 from models.movimento_crediario_model import MovimentoCrediario
 from models.crediario_model import Crediario
 from models.grupo_crediario_model import GrupoCrediario
+from models.parcela_crediario_model import ParcelaCrediario
+from utils.fragments import wants_fragment, messages_fragment, redirect_or_row, row_fragment
+from utils.streaming import peek, stream_page
 from functools import wraps
 from datetime import datetime, date
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 
 bp_movimento_crediario = Blueprint(
     'movimento_crediario', __name__, url_prefix='/movimentos_crediario')
@@ -34,23 +38,57 @@ def own_movement_crediario_required(f):
     return decorated_function
 
 
+def _detalhar(movimento, grupos_por_id, crediarios_por_id):
+    """
+    Anexa ao movimento o grupo, o crediário e a data de compra formatada
+    exibidos em movimento_crediario/_row.html.
+    """
+    movimento.grupo_detalhes = grupos_por_id.get(movimento.grupo_crediario_id)
+    movimento.crediario_detalhes = crediarios_por_id.get(movimento.crediario_id)
+    movimento.data_compra_formatada = movimento.data_compra.strftime(
+        '%d/%m/%Y') if movimento.data_compra else ''
+    return movimento
+
+
+def _redirect_or_row(movimento, grupos_crediario, crediarios):
+    """
+    Devolve a linha do movimento para o main.js atualizar a listagem sem
+    recarregá-la, ou redireciona para a listagem.
+    """
+    _detalhar(movimento, {g.id: g for g in grupos_crediario},
+              {c.id: c for c in crediarios})
+    return redirect_or_row(url_for('movimento_crediario.list_movimentos_crediario'),
+                           f'movimento-crediario-{movimento.id}', 'movimento_crediario/_row.html',
+                           mov=movimento)
+
+
 @bp_movimento_crediario.route('/')
 @login_required
-def list_movimentos_crediario():
+async def list_movimentos_crediario():
     """
     Lista todos os movimentos de crediário do usuário logado.
-    Para exibir detalhes do grupo e crediário, buscamos os objetos completos.
+    Grupos e crediários são buscados de uma vez e associados a cada movimento
+    por id; os movimentos são lidos em lotes e a página é enviada em streaming.
     """
-    movimentos = MovimentoCrediario.get_all_by_user(current_user.id)
-    for mov in movimentos:
-        mov.grupo_detalhes = GrupoCrediario.get_by_id(
-            mov.grupo_crediario_id, current_user.id)
-        mov.crediario_detalhes = Crediario.get_by_id(
-            mov.crediario_id, current_user.id)
-        mov.data_compra_formatada = mov.data_compra.strftime(
-            '%d/%m/%Y') if mov.data_compra else ''
+    user_id = current_user.id
+    grupos, crediarios = await asyncio.gather(
+        GrupoCrediario.get_all_by_user_async(user_id),
+        Crediario.get_all_by_user_async(user_id)
+    )
+    grupos_por_id = {g.id: g for g in grupos}
+    crediarios_por_id = {c.id: c for c in crediarios}
+
+    def detalhar(movimentos):
+        for mov in movimentos:
+            yield _detalhar(mov, grupos_por_id, crediarios_por_id)
 
-    return render_template('movimento_crediario/list.html', movimentos=movimentos)
+    tem_movimentos, movimentos = peek(
+        detalhar(MovimentoCrediario.iter_by_user(user_id)))
+
+    return stream_page('movimento_crediario/list.html',
+                       movimentos=movimentos,
+                       tem_movimentos=tem_movimentos,
+                       grupos=grupos)
 
 
 @bp_movimento_crediario.route('/add', methods=['GET', 'POST'])
@@ -114,7 +152,7 @@ def add_movimento_crediario():
                     raise ValueError(
                         "Para estornos de Crediário, o valor total deve ser negativo.")
 
-            MovimentoCrediario.add(
+            novo_movimento = MovimentoCrediario.add(
                 user_id=current_user.id,
                 grupo_crediario_id=grupo_crediario_id,
                 crediario_id=crediario_id,
@@ -126,7 +164,7 @@ def add_movimento_crediario():
             )
 
             flash('Movimento de crediário adicionado com sucesso!', 'success')
-            return redirect(url_for('movimento_crediario.list_movimentos_crediario'))
+            return _redirect_or_row(novo_movimento, grupos_crediario, crediarios)
         except ValueError as e:
             flash(f'Erro de validação: {e}', 'danger')
         except Exception as e:
@@ -135,6 +173,9 @@ def add_movimento_crediario():
             current_app.logger.error(
                 f"Erro ao adicionar movimento de crediário: {e}", exc_info=True)
 
+        if wants_fragment():
+            return messages_fragment(422)
+
     return render_template('movimento_crediario/add.html',
                            grupos_crediario=grupos_crediario,
                            crediarios=crediarios,
@@ -226,7 +267,7 @@ def edit_movimento_crediario(movimento_id):
             )
             if updated_movimento:
                 flash('Movimento de crediário atualizado com sucesso!', 'success')
-                return redirect(url_for('movimento_crediario.list_movimentos_crediario'))
+                return _redirect_or_row(updated_movimento, grupos_crediario, crediarios)
             else:
                 flash('Erro ao atualizar movimento de crediário.', 'danger')
         except ValueError as e:
@@ -237,6 +278,9 @@ def edit_movimento_crediario(movimento_id):
             current_app.logger.error(
                 f"Erro ao atualizar movimento de crediário ID {movimento_id}: {e}", exc_info=True)
 
+        if wants_fragment():
+            return messages_fragment(422)
+
     return render_template('movimento_crediario/edit.html',
                            movimento=movimento,
                            grupos_crediario=grupos_crediario,
@@ -246,25 +290,126 @@ def edit_movimento_crediario(movimento_id):
                            grupos_crediario_json_data=grupos_crediario_json_data)
 
 
-@bp_movimento_crediario.route('/delete/<int:movimento_id>', methods=['POST'])
+@bp_movimento_crediario.route('/renegociar/<int:movimento_id>', methods=['GET', 'POST'])
 @login_required
 @own_movement_crediario_required
+def renegociar_movimento_crediario(movimento_id):
+    """
+    Quitação antecipada ou renegociação das parcelas restantes de um
+    movimento de crediário, com taxa de desconto mensal opcional.
+    """
+    form = request.form if request.method == 'POST' else {}
+
+    if request.method == 'POST':
+        try:
+            operacao = request.form.get('operacao')
+            mes_inicio = datetime.strptime(request.form.get('mes', ''), '%Y-%m').date()
+            taxa_str = (request.form.get('taxa_desconto') or '').strip().replace(',', '.')
+            try:
+                taxa_desconto = Decimal(taxa_str) if taxa_str else None
+            except InvalidOperation as e:
+                raise ValueError('Taxa de desconto inválida.') from e
+
+            if operacao == 'quitar':
+                movimento, nominal, presente = MovimentoCrediario.quitar(
+                    movimento_id, current_user.id, mes_inicio, taxa_desconto)
+                flash(f'Parcelas restantes quitadas em {mes_inicio.strftime("%m/%Y")}: '
+                      f'R$ {presente:.2f} (de R$ {nominal:.2f}).', 'success')
+            elif operacao == 'renegociar':
+                num_parcelas = request.form.get('num_parcelas', type=int)
+                if not num_parcelas or num_parcelas > 360:
+                    raise ValueError('O número de parcelas deve ser entre 1 e 360.')
+                movimento, nominal, presente = MovimentoCrediario.renegociar(
+                    movimento_id, current_user.id, num_parcelas, mes_inicio, taxa_desconto)
+                flash(f'Saldo de R$ {presente:.2f} (de R$ {nominal:.2f}) renegociado em '
+                      f'{num_parcelas} parcela(s) de R$ {movimento.valor_parcela_mensal:.2f}.', 'success')
+            else:
+                raise ValueError('Operação inválida.')
+            return redirect(url_for('extratos_crediario.view_parcelas', movimento_id=movimento_id))
+        except ValueError as e:
+            flash(f'Erro de validação: {e}', 'danger')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao renegociar o movimento de crediário: {e}', 'danger')
+            current_app.logger.error(
+                f"Erro ao renegociar movimento de crediário ID {movimento_id}: {e}", exc_info=True)
+
+    movimento = MovimentoCrediario.get_by_id(movimento_id, current_user.id)
+    parcelas = ParcelaCrediario.get_by_movimento_id(movimento_id)
+    hoje = date.today()
+    return render_template('movimento_crediario/renegociar.html',
+                           movimento=movimento,
+                           parcelas=parcelas,
+                           form=form,
+                           mes_atual=hoje.strftime('%Y-%m'))
+
+
+@bp_movimento_crediario.route('/delete/<int:movimento_id>', methods=['POST'])
+@login_required
 def delete_movimento_crediario(movimento_id):
     """
     Deleta um movimento de crediário. Apenas via POST para segurança.
+    A verificação de propriedade é feita pelo próprio DELETE (filtro por user_id).
     """
+    status = 200
     try:
         if MovimentoCrediario.delete(movimento_id, current_user.id):
             flash('Movimento de crediário deletado com sucesso!', 'success')
         else:
-            flash('Erro ao deletar movimento de crediário.', 'danger')
+            flash(
+                'Movimento de crediário não encontrado ou você não tem permissão para acessá-lo.', 'danger')
+            status = 404
     except ValueError as e:
         flash(f'Erro: {e}', 'danger')
         current_app.logger.warning(
             f"Erro de validação ao deletar movimento de crediário ID {movimento_id} (UserID: {current_user.id}): {e}")
+        status = 422
     except Exception as e:
         flash(
             f'Ocorreu um erro inesperado ao deletar o movimento de crediario: {e}', 'danger')
         current_app.logger.error(
             f"Erro inesperado ao deletar movimento de crediário ID {movimento_id} (UserID: {current_user.id}): {e}", exc_info=True)
+        status = 500
+
+    if wants_fragment():
+        if status == 200:
+            return row_fragment(f'movimento-crediario-{movimento_id}')
+        return messages_fragment(status)
+    return redirect(url_for('movimento_crediario.list_movimentos_crediario'))
+
+
+@bp_movimento_crediario.route('/lote', methods=['POST'])
+@login_required
+def batch_movimentos_crediario():
+    """
+    Aplica uma ação aos movimentos de crediário selecionados na listagem:
+    'excluir' ou 'alterar_grupo'.
+    """
+    ids = request.form.getlist('ids', type=int)
+    acao = request.form.get('acao')
+
+    try:
+        if not ids:
+            raise ValueError('Selecione pelo menos um movimento.')
+
+        if acao == 'excluir':
+            quantidade = MovimentoCrediario.delete_many(ids, current_user.id)
+            flash(f'{quantidade} movimento(s) de crediário deletado(s) com sucesso!', 'success')
+        elif acao == 'alterar_grupo':
+            grupo_crediario_id = request.form.get(
+                'grupo_crediario_id', type=int)
+            if not grupo_crediario_id:
+                raise ValueError('Selecione o novo grupo de crediário.')
+            quantidade = MovimentoCrediario.update_grupo_many(
+                ids, current_user.id, grupo_crediario_id)
+            flash(f'{quantidade} movimento(s) de crediário movido(s) de grupo com sucesso!', 'success')
+        else:
+            raise ValueError('Ação inválida.')
+    except ValueError as e:
+        flash(f'Erro: {e}', 'danger')
+    except Exception as e:
+        flash(
+            f'Ocorreu um erro ao processar os movimentos selecionados: {e}', 'danger')
+        current_app.logger.error(
+            f"Erro na ação em lote '{acao}' de movimentos de crediário (UserID: {current_user.id}): {e}", exc_info=True)
+
     return redirect(url_for('movimento_crediario.list_movimentos_crediario'))
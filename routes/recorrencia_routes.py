@@ -0,0 +1,188 @@
+# routes/recorrencia_routes.py
+
+from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app
+from flask_login import login_required, current_user
+from models.recorrencia_model import RecorrenciaBancaria, PERIODICIDADES
+from models.conta_bancaria_model import ContaBancaria
+from models.transacao_bancaria_model import TransacaoBancaria
+from functools import wraps
+from decimal import Decimal
+from datetime import date, datetime
+
+bp_recorrencia = Blueprint('recorrencia', __name__, url_prefix='/recorrencias')
+
+
+def own_recurrence_required(f):
+    """
+    Garante que o usuário está acessando ou modificando a sua própria recorrência.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        recorrencia_id = kwargs.get('recorrencia_id')
+        if recorrencia_id:
+            if not RecorrenciaBancaria.get_by_id(recorrencia_id, current_user.id):
+                flash(
+                    'Recorrência não encontrada ou você não tem permissão para acessá-la.', 'danger')
+                return redirect(url_for('recorrencia.list_recorrencias'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def _dados_formulario(form):
+    """
+    Lê e valida os campos do formulário de recorrência.
+    """
+    descricao = (form.get('descricao') or '').strip()
+    if not descricao:
+        raise ValueError('Informe a descrição.')
+    periodicidade = form.get('periodicidade')
+    if periodicidade not in PERIODICIDADES:
+        raise ValueError('Periodicidade inválida.')
+    intervalo = form.get('intervalo', 1, type=int)
+    if not intervalo or intervalo < 1:
+        raise ValueError('O intervalo deve ser de pelo menos 1.')
+
+    valor = Decimal((form.get('valor') or '').replace(',', '.'))
+    if valor <= 0:
+        raise ValueError('O valor deve ser maior que zero.')
+
+    data_inicio = datetime.strptime(form.get('data_inicio', ''), '%Y-%m-%d').date()
+    data_fim = form.get('data_fim')
+    data_fim = datetime.strptime(data_fim, '%Y-%m-%d').date() if data_fim else None
+    if data_fim and data_fim < data_inicio:
+        raise ValueError('A data final deve ser igual ou posterior à data inicial.')
+
+    conta_bancaria_id = form.get('conta_bancaria_id', type=int)
+    if not ContaBancaria.get_by_id(conta_bancaria_id, current_user.id):
+        raise ValueError('Conta bancária inválida ou não pertence a você.')
+    transacao_bancaria_id = form.get('transacao_bancaria_id', type=int)
+    if not TransacaoBancaria.get_by_id(transacao_bancaria_id, current_user.id):
+        raise ValueError('Transação inválida ou não pertence a você.')
+
+    return dict(conta_bancaria_id=conta_bancaria_id,
+                transacao_bancaria_id=transacao_bancaria_id,
+                descricao=descricao, valor=valor, periodicidade=periodicidade,
+                intervalo=intervalo, data_inicio=data_inicio, data_fim=data_fim)
+
+
+@bp_recorrencia.route('/')
+@login_required
+def list_recorrencias():
+    """
+    Lista as recorrências do usuário logado.
+    """
+    contas_por_id = {c.id: c for c in ContaBancaria.get_all_by_user(current_user.id)}
+    transacoes_por_id = {
+        t.id: t for t in TransacaoBancaria.get_all_by_user(current_user.id)}
+
+    recorrencias = RecorrenciaBancaria.get_all_by_user(current_user.id)
+    for recorrencia in recorrencias:
+        recorrencia.conta_detalhes = contas_por_id.get(recorrencia.conta_bancaria_id)
+        recorrencia.transacao_detalhes = transacoes_por_id.get(
+            recorrencia.transacao_bancaria_id)
+
+    return render_template('recorrencia/list.html',
+                           recorrencias=recorrencias, PERIODICIDADES=PERIODICIDADES)
+
+
+@bp_recorrencia.route('/add', methods=['GET', 'POST'])
+@login_required
+def add_recorrencia():
+    """
+    Adiciona uma recorrência para o usuário logado.
+    """
+    contas = ContaBancaria.get_all_by_user(current_user.id)
+    transacoes = TransacaoBancaria.get_all_by_user(current_user.id)
+    if not contas or not transacoes:
+        flash('Precisa de registar pelo menos uma conta bancária e uma transação antes de adicionar uma recorrência.', 'warning')
+        return redirect(url_for('movimento_bancario.list_movimentos'))
+
+    if request.method == 'POST':
+        try:
+            RecorrenciaBancaria.add(user_id=current_user.id, **_dados_formulario(request.form))
+            flash('Recorrência adicionada com sucesso!', 'success')
+            return redirect(url_for('recorrencia.list_recorrencias'))
+        except (ValueError, ArithmeticError) as e:
+            flash(f'Erro de validação: {e}', 'danger')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao adicionar a recorrência: {e}', 'danger')
+            current_app.logger.error(
+                f"Erro ao adicionar recorrência bancária: {e}", exc_info=True)
+
+    return render_template('recorrencia/add.html',
+                           contas=contas, transacoes=transacoes,
+                           PERIODICIDADES=PERIODICIDADES, form=request.form,
+                           today_date=date.today().isoformat())
+
+
+@bp_recorrencia.route('/edit/<int:recorrencia_id>', methods=['GET', 'POST'])
+@login_required
+@own_recurrence_required
+def edit_recorrencia(recorrencia_id):
+    """
+    Edita uma recorrência existente. A nova regra vale para as ocorrências
+    ainda não lançadas.
+    """
+    recorrencia = RecorrenciaBancaria.get_by_id(recorrencia_id, current_user.id)
+    contas = ContaBancaria.get_all_by_user(current_user.id)
+    transacoes = TransacaoBancaria.get_all_by_user(current_user.id)
+
+    if request.method == 'POST':
+        try:
+            RecorrenciaBancaria.update(
+                recorrencia_id=recorrencia_id,
+                user_id=current_user.id,
+                ativa=bool(request.form.get('ativa')),
+                **_dados_formulario(request.form))
+            flash('Recorrência atualizada com sucesso!', 'success')
+            return redirect(url_for('recorrencia.list_recorrencias'))
+        except (ValueError, ArithmeticError) as e:
+            flash(f'Erro de validação: {e}', 'danger')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao atualizar a recorrência: {e}', 'danger')
+            current_app.logger.error(
+                f"Erro ao atualizar recorrência ID {recorrencia_id}: {e}", exc_info=True)
+
+    return render_template('recorrencia/edit.html',
+                           recorrencia=recorrencia, contas=contas, transacoes=transacoes,
+                           PERIODICIDADES=PERIODICIDADES)
+
+
+@bp_recorrencia.route('/delete/<int:recorrencia_id>', methods=['POST'])
+@login_required
+@own_recurrence_required
+def delete_recorrencia(recorrencia_id):
+    """
+    Deleta uma recorrência; os movimentos já lançados são mantidos.
+    """
+    try:
+        if RecorrenciaBancaria.delete(recorrencia_id, current_user.id):
+            flash('Recorrência deletada com sucesso!', 'success')
+        else:
+            flash('Erro ao deletar recorrência.', 'danger')
+    except Exception as e:
+        flash(f'Ocorreu um erro inesperado ao deletar a recorrência: {e}', 'danger')
+        current_app.logger.error(
+            f"Erro ao deletar recorrência ID {recorrencia_id}: {e}", exc_info=True)
+
+    return redirect(url_for('recorrencia.list_recorrencias'))
+
+
+@bp_recorrencia.route('/gerar', methods=['POST'])
+@login_required
+def gerar_recorrencias():
+    """
+    Lança agora as ocorrências vencidas das recorrências do usuário logado.
+    """
+    try:
+        movimentos, contas, _ = RecorrenciaBancaria.gerar(user_id=current_user.id)
+        if movimentos:
+            flash(f'{movimentos} movimento(s) lançado(s) em {contas} conta(s).', 'success')
+        else:
+            flash('Nenhuma ocorrência pendente.', 'info')
+    except Exception as e:
+        flash(f'Ocorreu um erro ao lançar as recorrências: {e}', 'danger')
+        current_app.logger.error(
+            f"Erro ao gerar recorrências do usuário {current_user.id}: {e}", exc_info=True)
+
+    return redirect(url_for('recorrencia.list_recorrencias'))
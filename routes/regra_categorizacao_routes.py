@@ -0,0 +1,233 @@
+# routes/regra_categorizacao_routes.py
+
+from flask import Blueprint, render_template, redirect, url_for, request, flash, jsonify, current_app
+from flask_login import login_required, current_user
+from models.regra_categorizacao_model import (
+    RegraCategorizacao, ORIGENS_REGRA, TIPOS_PADRAO, get_classificador)
+from models.conta_bancaria_model import ContaBancaria
+from models.transacao_bancaria_model import TransacaoBancaria
+from models.crediario_model import Crediario
+from models.grupo_crediario_model import GrupoCrediario
+from functools import wraps
+from decimal import Decimal, InvalidOperation
+
+bp_regra_categorizacao = Blueprint(
+    'regra_categorizacao', __name__, url_prefix='/regras')
+
+MAX_LINHAS_CLASSIFICACAO = 100000
+
+
+def own_rule_required(f):
+    """
+    Garante que o usuário está acessando ou modificando a sua própria regra.
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        regra_id = kwargs.get('regra_id')
+        if regra_id:
+            if not RegraCategorizacao.get_by_id(regra_id, current_user.id):
+                flash(
+                    'Regra não encontrada ou você não tem permissão para acessá-la.', 'danger')
+                return redirect(url_for('regra_categorizacao.list_regras'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def _opcoes(user_id):
+    """
+    Contas e categorias de destino de cada origem, para os formulários.
+    """
+    return {
+        'bancario': {
+            'contas': [(c.id, c.banco) for c in ContaBancaria.get_all_by_user(user_id)],
+            'destinos': [(t.id, f"{t.transacao} ({t.tipo})")
+                         for t in TransacaoBancaria.get_all_by_user(user_id)],
+        },
+        'crediario': {
+            'contas': [(c.id, c.crediario) for c in Crediario.get_all_by_user(user_id)],
+            'destinos': [(g.id, f"{g.grupo} ({g.tipo})")
+                         for g in GrupoCrediario.get_all_by_user(user_id)],
+        },
+    }
+
+
+def _decimal_opcional(valor_str):
+    valor_str = (valor_str or '').strip().replace(',', '.')
+    if not valor_str:
+        return None
+    try:
+        return Decimal(valor_str)
+    except InvalidOperation as e:
+        raise ValueError(f'Valor inválido: {valor_str}.') from e
+
+
+def _dados_formulario(form):
+    """
+    Lê os campos do formulário; conta e destino vêm dos campos da origem
+    escolhida (conta_bancario/destino_bancario ou conta_crediario/destino_crediario).
+    """
+    origem = form.get('origem')
+    if origem not in ORIGENS_REGRA:
+        raise ValueError('Origem inválida.')
+    tipo_padrao = form.get('tipo_padrao', 'contem')
+    if tipo_padrao not in TIPOS_PADRAO:
+        raise ValueError('Tipo de padrão inválido.')
+    destino_id = form.get(f'destino_{origem}', type=int)
+    if not destino_id:
+        raise ValueError('Selecione a categoria sugerida pela regra.')
+
+    return dict(origem=origem,
+                tipo_padrao=tipo_padrao,
+                padrao=(form.get('padrao') or '').strip() or None,
+                valor_min=_decimal_opcional(form.get('valor_min')),
+                valor_max=_decimal_opcional(form.get('valor_max')),
+                conta_id=form.get(f'conta_{origem}', type=int),
+                destino_id=destino_id,
+                prioridade=form.get('prioridade', 100, type=int))
+
+
+@bp_regra_categorizacao.route('/')
+@login_required
+def list_regras():
+    """
+    Lista as regras de categorização do usuário, na ordem de avaliação.
+    """
+    opcoes = _opcoes(current_user.id)
+    nomes = {origem: {'contas': dict(o['contas']), 'destinos': dict(o['destinos'])}
+             for origem, o in opcoes.items()}
+
+    regras = RegraCategorizacao.get_all_by_user(current_user.id)
+    for regra in regras:
+        regra.destino_detalhes = nomes[regra.origem]['destinos'].get(regra.destino_id)
+        regra.conta_detalhes = nomes[regra.origem]['contas'].get(regra.conta_id)
+
+    return render_template('regra_categorizacao/list.html', regras=regras,
+                           ORIGENS_REGRA=ORIGENS_REGRA, TIPOS_PADRAO=TIPOS_PADRAO)
+
+
+@bp_regra_categorizacao.route('/add', methods=['GET', 'POST'])
+@login_required
+def add_regra():
+    if request.method == 'POST':
+        try:
+            RegraCategorizacao.add(user_id=current_user.id, **_dados_formulario(request.form))
+            flash('Regra adicionada com sucesso!', 'success')
+            return redirect(url_for('regra_categorizacao.list_regras'))
+        except ValueError as e:
+            flash(f'Erro de validação: {e}', 'danger')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao adicionar a regra: {e}', 'danger')
+            current_app.logger.error(
+                f"Erro ao adicionar regra de categorização: {e}", exc_info=True)
+
+    return render_template('regra_categorizacao/add.html', opcoes=_opcoes(current_user.id),
+                           form=request.form, ORIGENS_REGRA=ORIGENS_REGRA, TIPOS_PADRAO=TIPOS_PADRAO)
+
+
+@bp_regra_categorizacao.route('/edit/<int:regra_id>', methods=['GET', 'POST'])
+@login_required
+@own_rule_required
+def edit_regra(regra_id):
+    regra = RegraCategorizacao.get_by_id(regra_id, current_user.id)
+
+    if request.method == 'POST':
+        try:
+            RegraCategorizacao.update(regra_id=regra_id, user_id=current_user.id,
+                                      ativa=bool(request.form.get('ativa')),
+                                      **_dados_formulario(request.form))
+            flash('Regra atualizada com sucesso!', 'success')
+            return redirect(url_for('regra_categorizacao.list_regras'))
+        except ValueError as e:
+            flash(f'Erro de validação: {e}', 'danger')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao atualizar a regra: {e}', 'danger')
+            current_app.logger.error(
+                f"Erro ao atualizar regra de categorização ID {regra_id}: {e}", exc_info=True)
+
+    return render_template('regra_categorizacao/edit.html', regra=regra,
+                           opcoes=_opcoes(current_user.id),
+                           ORIGENS_REGRA=ORIGENS_REGRA, TIPOS_PADRAO=TIPOS_PADRAO)
+
+
+@bp_regra_categorizacao.route('/delete/<int:regra_id>', methods=['POST'])
+@login_required
+@own_rule_required
+def delete_regra(regra_id):
+    try:
+        if RegraCategorizacao.delete(regra_id, current_user.id):
+            flash('Regra deletada com sucesso!', 'success')
+        else:
+            flash('Erro ao deletar regra.', 'danger')
+    except Exception as e:
+        flash(f'Ocorreu um erro inesperado ao deletar a regra: {e}', 'danger')
+        current_app.logger.error(
+            f"Erro ao deletar regra de categorização ID {regra_id}: {e}", exc_info=True)
+
+    return redirect(url_for('regra_categorizacao.list_regras'))
+
+
+@bp_regra_categorizacao.route('/sugerir')
+@login_required
+def sugerir():
+    """
+    Sugestão de categoria para uma linha (usada pelos formulários de
+    movimento). Parâmetros: origem, descricao, valor e conta_id.
+    """
+    origem = request.args.get('origem', 'crediario')
+    if origem not in ORIGENS_REGRA:
+        return jsonify({'erro': 'Origem inválida.'}), 400
+    try:
+        valor = _decimal_opcional(request.args.get('valor'))
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+
+    destino_id = get_classificador(current_user.id, origem).classificar(
+        request.args.get('descricao', ''), valor, request.args.get('conta_id', type=int))
+    return jsonify({'destino_id': destino_id})
+
+
+@bp_regra_categorizacao.route('/classificar', methods=['POST'])
+@login_required
+def classificar():
+    """
+    Classificação em lote (ex.: linhas de um extrato a importar). Corpo JSON:
+    {"origem": "crediario", "linhas": [{"descricao", "valor", "conta_id"}, ...]}.
+    Devolve {"sugestoes": [destino_id ou null, ...]}, na ordem das linhas.
+    """
+    dados = request.get_json(silent=True) or {}
+    origem = dados.get('origem', 'crediario')
+    linhas = dados.get('linhas')
+    if origem not in ORIGENS_REGRA:
+        return jsonify({'erro': 'Origem inválida.'}), 400
+    if not isinstance(linhas, list):
+        return jsonify({'erro': 'Informe "linhas" como uma lista.'}), 400
+    if len(linhas) > MAX_LINHAS_CLASSIFICACAO:
+        return jsonify({'erro': f'No máximo {MAX_LINHAS_CLASSIFICACAO} linhas por requisição.'}), 413
+
+    try:
+        tuplas = [(str(l.get('descricao') or ''),
+                   _decimal_opcional(str(l['valor'])) if l.get('valor') is not None else None,
+                   int(l['conta_id']) if l.get('conta_id') is not None else None)
+                  for l in linhas]
+    except (AttributeError, TypeError, ValueError) as e:
+        return jsonify({'erro': f'Linha inválida: {e}'}), 400
+
+    classificador = get_classificador(current_user.id, origem)
+    return jsonify({'sugestoes': classificador.classificar_lote(tuplas)})
+
+
+@bp_regra_categorizacao.route('/aplicar_crediario', methods=['POST'])
+@login_required
+def aplicar_crediario():
+    """
+    Reclassifica as compras de crediário existentes pelas regras atuais.
+    """
+    try:
+        quantidade = RegraCategorizacao.aplicar_crediario(current_user.id)
+        flash(f'{quantidade} compra(s) de crediário reclassificada(s).', 'success')
+    except Exception as e:
+        flash(f'Ocorreu um erro ao aplicar as regras: {e}', 'danger')
+        current_app.logger.error(
+            f"Erro ao aplicar regras às compras de crediário: {e}", exc_info=True)
+
+    return redirect(url_for('regra_categorizacao.list_regras'))
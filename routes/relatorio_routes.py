@@ -0,0 +1,214 @@
+# routes/relatorio_routes.py
+
+from datetime import date, datetime, timedelta, timezone
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
+from flask_login import login_required, current_user
+from models.resumo_mensal_model import ResumoMensalCategoria, ORIGENS
+from models.patrimonio_model import SeriePatrimonio, GRANULARIDADES
+from utils.cache import get_user_cache
+from utils.series import lttb
+
+bp_relatorio = Blueprint('relatorio', __name__, url_prefix='/relatorios')
+
+MAX_PONTOS_PATRIMONIO = 2000
+
+
+def _somar_meses(mes, quantidade):
+    total = mes.year * 12 + mes.month - 1 + quantidade
+    return date(total // 12, total % 12 + 1, 1)
+
+
+def _parse_mes(valor, padrao):
+    if not valor:
+        return padrao
+    return datetime.strptime(valor, '%Y-%m').date()
+
+
+@bp_relatorio.route('/categorias')
+@login_required
+def categorias():
+    """
+    Tabela de totais mensais por categoria de uma origem (bancário,
+    crediário, despesa fixa ou renda), nos últimos 'meses' meses.
+    """
+    origem = request.args.get('origem', 'bancario')
+    if origem not in ORIGENS:
+        origem = 'bancario'
+    meses_qtd = min(max(request.args.get('meses', 12, type=int), 1), 120)
+
+    fim = _somar_meses(date.today().replace(day=1), 1)
+    inicio = _somar_meses(fim, -meses_qtd)
+    meses = [_somar_meses(inicio, i) for i in range(meses_qtd)]
+
+    categorias_por_chave = {}
+    for resumo in ResumoMensalCategoria.get_by_user(current_user.id, origem, inicio, fim):
+        linha = categorias_por_chave.setdefault((resumo.categoria_id, resumo.tipo), {
+            'categoria_id': resumo.categoria_id,
+            'categoria': resumo.categoria,
+            'tipo': resumo.tipo,
+            'valores': {},
+            'total': 0,
+        })
+        linha['valores'][resumo.mes] = resumo.total
+        linha['total'] += resumo.total
+
+    linhas = sorted(categorias_por_chave.values(),
+                    key=lambda l: (l['tipo'], -l['total']))
+
+    return render_template('relatorios/categorias.html',
+                           origens=ORIGENS,
+                           origem=origem,
+                           meses_qtd=meses_qtd,
+                           meses=meses,
+                           linhas=linhas,
+                           atualizado_em=ResumoMensalCategoria.get_atualizado_em())
+
+
+@bp_relatorio.route('/categorias.json')
+@login_required
+def categorias_json():
+    """
+    Série mensal (para gráficos de tendência) de uma origem, opcionalmente
+    de uma só categoria. Parâmetros: origem, categoria_id, inicio e fim
+    (AAAA-MM, fim exclusive; padrão: últimos 10 anos).
+    """
+    origem = request.args.get('origem', 'bancario')
+    if origem not in ORIGENS:
+        return jsonify({'erro': 'Origem inválida.'}), 400
+
+    fim_padrao = _somar_meses(date.today().replace(day=1), 1)
+    try:
+        fim = _parse_mes(request.args.get('fim'), fim_padrao)
+        inicio = _parse_mes(request.args.get('inicio'), _somar_meses(fim, -120))
+    except ValueError:
+        return jsonify({'erro': 'Formato de mês inválido. Use AAAA-MM.'}), 400
+
+    resumos = ResumoMensalCategoria.get_by_user(
+        current_user.id, origem, inicio, fim,
+        categoria_id=request.args.get('categoria_id', type=int))
+
+    return jsonify({
+        'origem': origem,
+        'atualizado_em': ResumoMensalCategoria.get_atualizado_em(),
+        'serie': [{
+            'mes': r.mes.strftime('%Y-%m'),
+            'categoria_id': r.categoria_id,
+            'categoria': r.categoria,
+            'tipo': r.tipo,
+            'total': str(r.total),
+            'quantidade': r.quantidade,
+        } for r in resumos],
+    })
+
+
+@bp_relatorio.route('/categorias/atualizar', methods=['POST'])
+@login_required
+def atualizar_categorias():
+    """
+    Atualiza a visão materializada, no máximo uma vez a cada
+    RESUMO_INTERVALO_MINIMO segundos (a atualização é global).
+    """
+    origem = request.form.get('origem', 'bancario')
+    intervalo = timedelta(seconds=current_app.config['RESUMO_INTERVALO_MINIMO'])
+    atualizado_em = ResumoMensalCategoria.get_atualizado_em()
+
+    if atualizado_em and datetime.now(timezone.utc) - atualizado_em < intervalo:
+        flash('O resumo foi atualizado há instantes. Tente novamente em alguns segundos.', 'info')
+    else:
+        try:
+            ResumoMensalCategoria.refresh()
+            flash('Resumo por categoria atualizado com sucesso!', 'success')
+        except Exception as e:
+            flash(f'Ocorreu um erro ao atualizar o resumo: {e}', 'danger')
+
+    return redirect(url_for('relatorio.categorias', origem=origem))
+
+
+def _serie_patrimonio(args):
+    """
+    Lê granularidade, inicio, fim (AAAA-MM-DD) e pontos da requisição e
+    devolve a série de patrimônio correspondente como lista de dicionários.
+    A série diária completa fica no cache do usuário e é invalidada a cada
+    escrita; o recorte, a granularidade e a redução (LTTB) para no máximo
+    'pontos' pontos são feitos sobre ela. Levanta ValueError se algum
+    parâmetro for inválido.
+    """
+    granularidade = args.get('granularidade', 'diaria')
+    if granularidade not in GRANULARIDADES:
+        raise ValueError('Granularidade inválida. Use diaria, semanal ou mensal.')
+    try:
+        data_inicio = date.fromisoformat(args['inicio']) if args.get('inicio') else None
+        data_fim = date.fromisoformat(args['fim']) if args.get('fim') else None
+    except ValueError as e:
+        raise ValueError('Formato de data inválido. Use AAAA-MM-DD.') from e
+    pontos = min(max(args.get('pontos', 500, type=int), 3), MAX_PONTOS_PATRIMONIO)
+
+    serie = get_user_cache().get_or_load(
+        current_user.id, ('patrimonio',),
+        lambda: SeriePatrimonio.calcular(current_user.id))
+    if serie is None:
+        return granularidade, 0, []
+
+    indices = serie.recorte(data_inicio, data_fim, granularidade)
+    total = len(indices)
+    indices = indices[lttb(indices, serie.patrimonio[indices], pontos)]
+
+    return granularidade, total, [{
+        'data': serie.data(i).isoformat(),
+        'patrimonio': int(serie.patrimonio[i]) / 100,
+        'saldo_bancos': int(serie.saldo_bancos[i]) / 100,
+        'divida': int(serie.divida[i]) / 100,
+    } for i in indices]
+
+
+@bp_relatorio.route('/patrimonio.json')
+@login_required
+def patrimonio_json():
+    """
+    Série do patrimônio líquido (saldos bancários menos parcelas em aberto).
+    Parâmetros: granularidade (diaria, semanal, mensal), inicio, fim e
+    pontos (máximo de pontos devolvidos; padrão 500).
+    """
+    try:
+        granularidade, total, serie = _serie_patrimonio(request.args)
+    except ValueError as e:
+        return jsonify({'erro': str(e)}), 400
+    return jsonify({
+        'granularidade': granularidade,
+        'pontos_no_periodo': total,
+        'serie': serie,
+    })
+
+
+@bp_relatorio.route('/patrimonio')
+@login_required
+def patrimonio():
+    """
+    Gráfico (SVG) da evolução do patrimônio líquido.
+    """
+    largura, altura = 800, 300
+    try:
+        granularidade, total, serie = _serie_patrimonio(request.args)
+    except ValueError as e:
+        flash(str(e), 'danger')
+        granularidade, total, serie = 'diaria', 0, []
+
+    pontos_svg = ''
+    if serie:
+        valores = [p['patrimonio'] for p in serie]
+        minimo, maximo = min(valores), max(valores)
+        escala_y = (altura - 20) / ((maximo - minimo) or 1)
+        escala_x = largura / max(len(valores) - 1, 1)
+        pontos_svg = ' '.join(
+            f"{i * escala_x:.1f},{altura - 10 - (v - minimo) * escala_y:.1f}"
+            for i, v in enumerate(valores))
+
+    return render_template('relatorios/patrimonio.html',
+                           granularidades=GRANULARIDADES,
+                           granularidade=granularidade,
+                           args=request.args,
+                           serie=serie,
+                           total=total,
+                           pontos_svg=pontos_svg,
+                           largura=largura,
+                           altura=altura)
@@ -3,6 +3,9 @@
 from flask import Blueprint, render_template, redirect, url_for, request, flash, current_app
 from flask_login import login_user, logout_user, login_required, current_user
 from models.usuario_model import Usuario
+from models.dashboard_model import Dashboard
+from utils.cache import get_user_cache
+from datetime import date
 from functools import wraps
 
 bp_usuario = Blueprint('usuario', __name__)
@@ -26,9 +29,15 @@ def admin_required(f):
 @login_required
 def home():
     """
-    Rota da página inicial após o login.
+    Rota da página inicial após o login: resumo financeiro do mês atual.
+    O resumo fica no cache do usuário até a próxima escrita (utils/cache.py).
     """
-    return render_template('home.html', user=current_user)
+    hoje = date.today()
+    painel = get_user_cache().get_or_load(
+        current_user.id, ('dashboard', hoje.year, hoje.month),
+        lambda: Dashboard.get_for_user(current_user.id, hoje.year, hoje.month))
+    return render_template('home.html', user=current_user, painel=painel,
+                           mes_ano_formatado=hoje.strftime('%m/%Y'))
 
 
 @bp_usuario.route('/login', methods=['GET', 'POST'])
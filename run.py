@@ -19,6 +19,12 @@ from models.despesa_fixa_model import DespesaFixa
 from models.parcela_crediario_model import ParcelaCrediario
 from models.renda_model import Renda
 from models.movimento_renda_model import MovimentoRenda
+from models.reconciliacao_model import Reconciliacao
+from models.resumo_mensal_model import ResumoMensalCategoria
+from models.busca_model import ResultadoBusca
+from models.linha_do_tempo_model import LancamentoLinhaDoTempo
+from models.recorrencia_model import RecorrenciaBancaria
+from models.regra_categorizacao_model import RegraCategorizacao
 
 # Importa as ROTAS
 from routes.usuario_routes import bp_usuario
@@ -34,6 +40,14 @@ from routes.extratos_bancario_routes import bp_extratos_bancario
 from routes.extratos_crediario_routes import bp_extratos_crediario
 from routes.renda_routes import bp_renda
 from routes.movimento_renda_routes import bp_movimento_renda
+from routes.relatorio_routes import bp_relatorio
+from routes.busca_routes import bp_busca
+from routes.linha_do_tempo_routes import bp_linha_do_tempo
+from routes.recorrencia_routes import bp_recorrencia
+from routes.regra_categorizacao_routes import bp_regra_categorizacao
+
+# Importa os UTILITÁRIOS
+from utils import assets, cache, compression, reconciliacao, recorrencias, resumos, templates
 
 # Configuração de logging
 logging.basicConfig(level=logging.INFO,
@@ -76,6 +90,32 @@ def create_app():
     app.register_blueprint(bp_extratos_crediario)
     app.register_blueprint(bp_renda)
     app.register_blueprint(bp_movimento_renda)
+    app.register_blueprint(bp_relatorio)
+    app.register_blueprint(bp_busca)
+    app.register_blueprint(bp_linha_do_tempo)
+    app.register_blueprint(bp_recorrencia)
+    app.register_blueprint(bp_regra_categorizacao)
+
+    # Assets estáticos gerados pelo build (CSS do Tailwind e fontes)
+    assets.init_app(app)
+
+    # Compressão e GET condicional (ETag) das páginas
+    compression.init_app(app)
+
+    # Cache de bytecode dos templates e comando 'flask templates compile'
+    templates.init_app(app)
+
+    # Reconciliação dos saldos das contas ('flask contas reconcile')
+    reconciliacao.init_app(app)
+
+    # Cache por usuário, invalidado a cada escrita do usuário
+    cache.init_app(app)
+
+    # Atualização do resumo mensal por categoria ('flask resumos atualizar')
+    resumos.init_app(app)
+
+    # Lançamento dos movimentos recorrentes ('flask recorrencias gerar')
+    recorrencias.init_app(app)
 
     @app.template_filter('strftime')
     def format_datetime(value, format="%d/%m/%Y"):
@@ -123,6 +163,12 @@ def create_app():
             ParcelaCrediario.create_table()
             Renda.create_table()
             MovimentoRenda.create_table()
+            Reconciliacao.create_table()
+            ResumoMensalCategoria.create_table()
+            ResultadoBusca.create_table()
+            LancamentoLinhaDoTempo.create_table()
+            RecorrenciaBancaria.create_table()
+            RegraCategorizacao.create_table()
             app._db_initialized = True
             # Bloco de criação automática do usuário admin ---
             # if not Usuario.get_by_login('admin'):
@@ -132,6 +178,10 @@ def create_app():
             #         print("Usuário 'admin' criado com sucesso (login: admin, senha: adminpass)")
             #     except Exception as e:
             #         print(f"Falha ao criar usuário admin padrão: {e}")
+
+    if app.config['TEMPLATE_WARMUP']:
+        templates.warmup_templates(app)
+
     return app
 
 
@@ -92,4 +92,175 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     }
 
+    // --- Atualizações parciais (fragmentos) ---
+    // Sem JavaScript os formulários continuam funcionando normalmente (POST + redirect).
+    // Com JavaScript, o servidor devolve apenas o bloco de mensagens e a página não é recarregada.
+
+    window.replaceFlashMessages = function (html) {
+        const current = document.getElementById('flash-messages');
+        if (current && html) {
+            current.outerHTML = html;
+        }
+    };
+
+    // Troca, insere no topo ou remove (quando o fragmento não traz a linha) a
+    // linha de id rowId da listagem aberta nesta página. Retorna false se a
+    // página não tem listagem.
+    window.applyFragmentRow = function (rowId, html) {
+        const tbody = document.querySelector('tbody[data-fragment-list]');
+        if (!tbody) {
+            return false;
+        }
+        const template = document.createElement('template');
+        template.innerHTML = html;
+        const messages = template.content.getElementById('flash-messages');
+        const row = template.content.querySelector('tr');
+        const current = document.getElementById(rowId);
+        if (messages) {
+            window.replaceFlashMessages(messages.outerHTML);
+        }
+        if (row && current) {
+            current.replaceWith(row);
+        } else if (row) {
+            tbody.prepend(row);
+        } else if (current) {
+            current.remove();
+            if (!tbody.querySelector('tr')) {
+                window.location.reload();
+            }
+        }
+        return true;
+    };
+
+    // Formulários abertos no diálogo da listagem (?embed=1) atualizam a
+    // listagem da página que os abriu.
+    let embedder = null;
+    try {
+        if (window.parent !== window && window.parent.applyFragmentRow) {
+            embedder = window.parent;
+        }
+    } catch (error) {
+        // Página de outra origem: o formulário segue como página comum.
+    }
+
+    window.fetchFragment = function (url, options) {
+        const init = Object.assign({ method: 'POST', credentials: 'same-origin' }, options || {});
+        init.headers = Object.assign({ 'X-Fragment': '1' }, init.headers || {});
+        return fetch(url, init).then(function (response) {
+            const rowId = response.headers.get('X-Fragment-Row');
+            const redirectUrl = response.headers.get('X-Redirect');
+            return response.text().then(function (html) {
+                if (rowId && window.applyFragmentRow(rowId, html)) {
+                    return response;
+                }
+                if (rowId && embedder && embedder.applyFragmentRow(rowId, html)) {
+                    embedder.closeFragmentDialog();
+                    return null;
+                }
+                if (redirectUrl) {
+                    (embedder || window).location.assign(redirectUrl);
+                    return null;
+                }
+                window.replaceFlashMessages(html);
+                return response;
+            });
+        });
+    };
+
+    // Os links "Adicionar" e "Editar" das listagens (data-fragment-dialog)
+    // abrem o formulário num diálogo sobre a listagem em vez de navegar.
+    window.closeFragmentDialog = function () {
+        const dialog = document.getElementById('fragment-dialog');
+        if (dialog && dialog.open) {
+            dialog.close();
+        }
+    };
+
+    document.addEventListener('click', function (event) {
+        if (!(event.target instanceof Element)) {
+            return;
+        }
+        const cancel = event.target.closest('[data-fragment-cancel]');
+        if (cancel && embedder) {
+            event.preventDefault();
+            embedder.closeFragmentDialog();
+            return;
+        }
+        const link = event.target.closest('a[data-fragment-dialog]');
+        if (!link || event.ctrlKey || event.metaKey || event.shiftKey ||
+            typeof HTMLDialogElement === 'undefined') {
+            return;
+        }
+        event.preventDefault();
+        let dialog = document.getElementById('fragment-dialog');
+        if (!dialog) {
+            dialog = document.createElement('dialog');
+            dialog.id = 'fragment-dialog';
+            dialog.className = 'w-full max-w-3xl p-0 rounded-xl shadow-lg backdrop:bg-gray-900/50';
+            dialog.innerHTML = '<iframe class="w-full border-0" style="height: 80vh"></iframe>';
+            dialog.addEventListener('close', function () {
+                dialog.querySelector('iframe').src = 'about:blank';
+            });
+            document.body.appendChild(dialog);
+        }
+        const url = new URL(link.href, window.location.href);
+        url.searchParams.set('embed', '1');
+        dialog.querySelector('iframe').src = url.toString();
+        dialog.showModal();
+    });
+
+    // --- Ações em lote nas listagens ---
+    // As caixas de seleção das linhas pertencem ao formulário de lote pelo atributo "form".
+
+    document.addEventListener('change', function (event) {
+        const toggle = event.target;
+        if (!(toggle instanceof HTMLInputElement) || !toggle.hasAttribute('data-select-all')) {
+            return;
+        }
+        const formId = toggle.getAttribute('data-select-all');
+        document.querySelectorAll('input[name="ids"][form="' + formId + '"]').forEach(function (checkbox) {
+            checkbox.checked = toggle.checked;
+        });
+    });
+
+    document.addEventListener('submit', function (event) {
+        const form = event.target;
+        if (event.defaultPrevented || !(form instanceof HTMLFormElement)) {
+            return;
+        }
+
+        if (form.hasAttribute('data-batch-form')) {
+            const selecionados = document.querySelectorAll('input[name="ids"][form="' + form.id + '"]:checked').length;
+            if (selecionados === 0) {
+                event.preventDefault();
+                alert('Selecione pelo menos um movimento.');
+            } else if (form.elements.acao.value === 'excluir' &&
+                !confirm('Tem certeza que deseja deletar ' + selecionados + ' movimento(s)?')) {
+                event.preventDefault();
+            }
+            return;
+        }
+
+        if (form.hasAttribute('data-fragment-delete')) {
+            event.preventDefault();
+            window.fetchFragment(form.action)
+                .catch(function (error) {
+                    console.error('Erro na requisição de exclusão:', error);
+                    form.submit();
+                });
+        } else if (form.hasAttribute('data-fragment-form')) {
+            event.preventDefault();
+            window.fetchFragment(form.action, { body: new FormData(form) })
+                .then(function (response) {
+                    if (response && !response.ok) {
+                        window.scrollTo({ top: 0, behavior: 'smooth' });
+                    }
+                })
+                .catch(function (error) {
+                    console.error('Erro ao enviar o formulário:', error);
+                    form.submit();
+                });
+        }
+    });
+
 });
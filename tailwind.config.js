@@ -0,0 +1,17 @@
+// tailwind.config.js
+
+/** Compila apenas as classes utilizadas nos templates e scripts do projeto. */
+module.exports = {
+    content: [
+        './templates/**/*.html',
+        './static/js/**/*.js',
+    ],
+    theme: {
+        extend: {
+            fontFamily: {
+                inter: ['Inter', 'sans-serif'],
+            },
+        },
+    },
+    plugins: [],
+};
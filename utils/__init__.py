@@ -0,0 +1,2 @@
+# Este arquivo faz do diretório 'utils' um pacote Python.
+# Contém utilitários de infraestrutura da aplicação (assets, CLI, middlewares).
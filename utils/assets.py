@@ -0,0 +1,366 @@
+# utils/assets.py
+
+import gzip
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import subprocess
+import tempfile
+
+import click
+from flask import current_app, request, send_from_directory
+from flask.cli import AppGroup
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+SOURCE_EXCLUDED_DIRS = ('src', DIST_DIR)
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt')
+INTER_WEIGHTS = (300, 400, 500, 600, 700)
+
+ICON_CLASS_RE = re.compile(r'\bfa-([a-z0-9-]+)')
+CSS_RULE_RE = re.compile(r'([^{}]+)\{([^{}]*)\}')
+GLYPH_RE = re.compile(r'(?:content|--fa)\s*:\s*"\\([0-9a-fA-F]+)"')
+ICON_SELECTOR_RE = re.compile(r'\s*\.fa-([a-z0-9-]+)(?:::?before)?\s*$')
+
+assets_cli = AppGroup('assets', help='Build dos assets estáticos (CSS e fontes).')
+
+
+def _hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _write_hashed(static_folder, relative_name, data):
+    """
+    Grava o conteúdo em static/dist/ com o hash no nome do arquivo.
+    Retorna o caminho relativo à pasta static (ex.: 'dist/css/app.1a2b3c4d5e6f.css').
+    """
+    base, ext = os.path.splitext(relative_name)
+    hashed_name = f"{DIST_DIR}/{base}.{_hash_bytes(data)}{ext}"
+    path = os.path.join(static_folder, hashed_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return hashed_name
+
+
+def _read_bytes(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError as e:
+        raise click.ClickException(
+            f"Arquivo de origem não encontrado: {path}. Execute 'npm install' na raiz do projeto.") from e
+
+
+def build_tailwind_css(app):
+    """
+    Compila apenas as classes do Tailwind usadas em templates/ e static/js/
+    para um CSS minificado.
+    """
+    tailwind_bin = app.config['TAILWIND_BIN']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output = os.path.join(tmp_dir, 'app.css')
+        cmd = [
+            tailwind_bin,
+            '-c', os.path.join(app.root_path, 'tailwind.config.js'),
+            '-i', os.path.join(app.static_folder, 'src', 'tailwind.css'),
+            '-o', output,
+            '--minify',
+        ]
+        try:
+            subprocess.run(cmd, cwd=app.root_path, check=True,
+                           capture_output=True)
+        except FileNotFoundError as e:
+            raise click.ClickException(
+                f"Tailwind CLI não encontrado em '{tailwind_bin}'. Execute 'npm install' ou defina TAILWIND_BIN.") from e
+        except subprocess.CalledProcessError as e:
+            raise click.ClickException(
+                f"Falha ao compilar o CSS do Tailwind: {e.stderr.decode('utf-8', errors='replace')}") from e
+        return _read_bytes(output)
+
+
+def collect_used_icons(*folders):
+    """
+    Retorna o conjunto de nomes de ícones (sem o prefixo 'fa-') usados nos
+    arquivos .html e .js das pastas informadas.
+    """
+    used = set()
+    for folder in folders:
+        for dirpath, _, filenames in os.walk(folder):
+            for filename in filenames:
+                if not filename.endswith(('.html', '.js')):
+                    continue
+                with open(os.path.join(dirpath, filename), encoding='utf-8') as f:
+                    used.update(ICON_CLASS_RE.findall(f.read()))
+    return used
+
+
+def parse_fontawesome_glyphs(css_text):
+    """
+    Extrai do CSS do Font Awesome o mapeamento nome do ícone -> codepoint (hex),
+    incluindo os aliases (ex.: 'trash-alt' e 'trash-can').
+    """
+    glyphs = {}
+    for selectors, body in CSS_RULE_RE.findall(css_text):
+        match = GLYPH_RE.search(body)
+        if not match:
+            continue
+        for selector in selectors.split(','):
+            name = ICON_SELECTOR_RE.match(selector)
+            if name:
+                glyphs[name.group(1)] = match.group(1).lower()
+    return glyphs
+
+
+def subset_icon_font(font_path, codepoints):
+    """
+    Gera um WOFF2 contendo apenas os glifos informados.
+    Requer o pacote 'fonttools' (e 'brotli' para ler/gravar WOFF2).
+    """
+    try:
+        from fontTools import subset
+    except ImportError as e:
+        raise click.ClickException(
+            "O pacote 'fonttools' é necessário para gerar o subconjunto de ícones (pip install fonttools brotli).") from e
+
+    options = subset.Options()
+    options.flavor = 'woff2'
+    options.ignore_missing_unicodes = True
+    font = subset.load_font(font_path, options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=sorted(codepoints))
+    subsetter.subset(font)
+
+    buffer = io.BytesIO()
+    subset.save_font(font, buffer, options)
+    return buffer.getvalue()
+
+
+def build_fonts_css(app):
+    """
+    Copia as fontes Inter e o subconjunto do Font Awesome para static/dist/
+    e gera o CSS com as declarações @font-face e as classes dos ícones usados.
+    """
+    node_modules = app.config['NODE_MODULES_DIR']
+    css_dir = f"{DIST_DIR}/css"
+    rules = []
+
+    for weight in INTER_WEIGHTS:
+        source = os.path.join(node_modules, '@fontsource', 'inter', 'files',
+                              f'inter-latin-{weight}-normal.woff2')
+        hashed = _write_hashed(app.static_folder, f'fonts/inter-{weight}.woff2',
+                               _read_bytes(source))
+        rules.append(
+            "@font-face{font-family:'Inter';font-style:normal;font-weight:%d;font-display:swap;"
+            "src:url(%s) format('woff2')}" % (weight, posixpath.relpath(hashed, css_dir)))
+
+    fa_dir = os.path.join(node_modules, '@fortawesome', 'fontawesome-free')
+    glyphs = parse_fontawesome_glyphs(
+        _read_bytes(os.path.join(fa_dir, 'css', 'all.css')).decode('utf-8'))
+    used_icons = collect_used_icons(os.path.join(app.root_path, app.template_folder),
+                                    os.path.join(app.static_folder, 'js'))
+    selected = {name: glyphs[name] for name in sorted(used_icons) if name in glyphs}
+
+    font_data = subset_icon_font(os.path.join(fa_dir, 'webfonts', 'fa-solid-900.woff2'),
+                                 {int(cp, 16) for cp in selected.values()})
+    hashed_font = _write_hashed(app.static_folder, 'fonts/fa-solid-900.woff2', font_data)
+    rules.append(
+        "@font-face{font-family:'Font Awesome 6 Free';font-style:normal;font-weight:900;font-display:block;"
+        "src:url(%s) format('woff2')}" % posixpath.relpath(hashed_font, css_dir))
+    rules.append(
+        ".fas,.fa-solid{-moz-osx-font-smoothing:grayscale;-webkit-font-smoothing:antialiased;"
+        "display:inline-block;font-style:normal;font-variant:normal;line-height:1;text-rendering:auto;"
+        "font-family:'Font Awesome 6 Free';font-weight:900}")
+    for name, codepoint in selected.items():
+        rules.append('.fa-%s:before{content:"\\%s"}' % (name, codepoint))
+
+    return '\n'.join(rules).encode('utf-8'), sorted(selected)
+
+
+def fingerprint_static_files(app):
+    """
+    Copia os arquivos de static/ (exceto src/ e dist/) para static/dist/ com o
+    hash do conteúdo no nome. Retorna o mapeamento nome original -> arquivo gerado.
+    """
+    manifest = {}
+    for dirpath, dirnames, filenames in os.walk(app.static_folder):
+        if os.path.samefile(dirpath, app.static_folder):
+            dirnames[:] = [d for d in dirnames if d not in SOURCE_EXCLUDED_DIRS]
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            name = os.path.relpath(path, app.static_folder).replace(os.sep, '/')
+            manifest[name] = _write_hashed(app.static_folder, name, _read_bytes(path))
+    return manifest
+
+
+def precompress_files(static_folder, filenames):
+    """
+    Gera as variantes .gz e .br (se o pacote 'brotli' estiver instalado) dos
+    arquivos de texto. A variante só é gravada se for menor que o original.
+    Retorna a quantidade de variantes geradas.
+    """
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+
+    generated = 0
+    for filename in filenames:
+        if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+            continue
+        path = os.path.join(static_folder, filename)
+        data = _read_bytes(path)
+        variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(data, quality=11)
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(data):
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                generated += 1
+    return generated
+
+
+def build_assets(app, skip_css=False):
+    """
+    Executa o build completo: limpa static/dist/, gera os arquivos com hash
+    de conteúdo, as variantes pré-comprimidas e grava o manifesto que mapeia
+    nome lógico -> arquivo gerado. Com skip_css, static/dist/ não é limpa e
+    o CSS (e as fontes que ele referencia) do build anterior é mantido.
+    """
+    dist_path = os.path.join(app.static_folder, DIST_DIR)
+    manifest_path = os.path.join(dist_path, MANIFEST_NAME)
+
+    manifest = {}
+    icons = []
+    if skip_css:
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                previous = json.load(f)
+        except FileNotFoundError as e:
+            raise click.ClickException(
+                "Nenhum build anterior encontrado. Execute 'flask assets build' sem --skip-css.") from e
+        for name in ('css/app.css', 'css/fonts.css'):
+            hashed = previous.get(name)
+            if not hashed or not os.path.isfile(os.path.join(app.static_folder, hashed)):
+                raise click.ClickException(
+                    f"O CSS '{name}' do build anterior não foi encontrado. "
+                    "Execute 'flask assets build' sem --skip-css.")
+            manifest[name] = hashed
+    else:
+        shutil.rmtree(dist_path, ignore_errors=True)
+        manifest['css/app.css'] = _write_hashed(
+            app.static_folder, 'css/app.css', build_tailwind_css(app))
+        fonts_css, icons = build_fonts_css(app)
+        manifest['css/fonts.css'] = _write_hashed(
+            app.static_folder, 'css/fonts.css', fonts_css)
+    manifest.update(fingerprint_static_files(app))
+
+    compressed = precompress_files(app.static_folder, manifest.values())
+
+    os.makedirs(dist_path, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    app.extensions.pop('assets_manifest', None)
+    return manifest, icons, compressed
+
+
+def get_manifest(app):
+    """
+    Retorna o manifesto gerado pelo build (vazio se o build ainda não foi
+    executado). Em modo debug o arquivo é relido quando muda no disco.
+    """
+    state = app.extensions.get('assets_manifest')
+    if state is not None and not app.debug:
+        return state['files']
+
+    path = os.path.join(app.static_folder, DIST_DIR, MANIFEST_NAME)
+    mtime = os.path.getmtime(path) if os.path.exists(path) else None
+    if state is None or state['mtime'] != mtime:
+        files = {}
+        if mtime is None:
+            app.logger.warning(
+                "Manifesto de assets não encontrado. Execute 'flask assets build'.")
+        else:
+            with open(path, encoding='utf-8') as f:
+                files = json.load(f)
+        state = app.extensions['assets_manifest'] = {'mtime': mtime, 'files': files}
+    return state['files']
+
+
+def rewrite_static_filename(endpoint, values):
+    """
+    Faz url_for('static', filename='css/style.css') apontar para o arquivo
+    com hash registrado no manifesto.
+    """
+    if endpoint != 'static' or 'filename' not in values:
+        return
+    manifest = get_manifest(current_app)
+    values['filename'] = manifest.get(values['filename'], values['filename'])
+
+
+def send_static_file(filename):
+    """
+    View dos arquivos estáticos. Para arquivos de static/dist/ envia a variante
+    pré-comprimida (.br ou .gz) de acordo com o cabeçalho Accept-Encoding.
+    """
+    app = current_app._get_current_object()
+    if filename.startswith(f"{DIST_DIR}/") and filename.endswith(COMPRESSIBLE_EXTENSIONS):
+        for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+            if not request.accept_encodings[encoding]:
+                continue
+            if not os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+                continue
+            mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+            response = send_from_directory(app.static_folder, filename + suffix,
+                                           mimetype=mimetype)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+    response = app.send_static_file(filename)
+    if filename.endswith(COMPRESSIBLE_EXTENSIONS):
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def set_immutable_cache_headers(response):
+    """
+    Arquivos em static/dist/ têm o hash do conteúdo no nome, então podem ser
+    armazenados em cache pelo navegador por um ano sem revalidação.
+    """
+    dist_prefix = f"{current_app.static_url_path}/{DIST_DIR}/"
+    if response.status_code in (200, 304) and request.path.startswith(dist_prefix):
+        response.headers['Cache-Control'] = (
+            f"public, max-age={current_app.config['ASSETS_MAX_AGE']}, immutable")
+    return response
+
+
+@assets_cli.command('build')
+@click.option('--skip-css', is_flag=True,
+              help='Não recompila o Tailwind nem as fontes (apenas gera hashes e variantes comprimidas).')
+def build_command(skip_css):
+    """Gera CSS, fontes, arquivos com hash, variantes .gz/.br e o manifesto."""
+    manifest, icons, compressed = build_assets(current_app, skip_css=skip_css)
+    for name, filename in sorted(manifest.items()):
+        click.echo(f"{name} -> {filename}")
+    if not skip_css:
+        click.echo(f"{len(icons)} ícones incluídos no subconjunto do Font Awesome.")
+    click.echo(f"{compressed} variantes pré-comprimidas geradas.")
+
+
+def init_app(app):
+    """
+    Registra a reescrita de url_for('static', ...) para os arquivos com hash,
+    a entrega das variantes pré-comprimidas, os cabeçalhos de cache e o
+    comando 'flask assets'.
+    """
+    app.url_defaults(rewrite_static_filename)
+    app.view_functions['static'] = send_static_file
+    app.after_request(set_immutable_cache_headers)
+    app.cli.add_command(assets_cli)
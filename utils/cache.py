@@ -0,0 +1,84 @@
+# utils/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request, session
+from flask_login import current_user
+
+VERSAO_SESSAO = 'dados_versao'
+METODOS_ESCRITA = ('POST', 'PUT', 'PATCH', 'DELETE')
+
+
+class UserCache:
+    """
+    Cache em memória (por processo) de resultados calculados por usuário.
+
+    A chave inclui a versão dos dados guardada na sessão do usuário, que é
+    incrementada a cada escrita bem-sucedida (bump_version). Assim qualquer
+    alteração feita pelo usuário invalida suas entradas em todos os
+    processos, sem comunicação entre eles. O TTL cobre as alterações feitas
+    fora da sessão (comandos 'flask ...', outra sessão do mesmo usuário).
+    """
+
+    def __init__(self, ttl, max_entries):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def get_or_load(self, user_id, key, loader):
+        """
+        Retorna o valor em cache para (user_id, key) ou chama loader() e o
+        armazena.
+        """
+        cache_key = (user_id, session.get(VERSAO_SESSAO, 0), key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(cache_key)
+                return entry[1]
+
+        value = loader()
+        with self._lock:
+            self._entries[cache_key] = (now + self.ttl, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, user_id):
+        """
+        Remove deste processo todas as entradas do usuário.
+        """
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[cache_key]
+
+
+def get_user_cache():
+    return current_app.extensions['user_cache']
+
+
+def bump_version(response):
+    """
+    Incrementa a versão dos dados da sessão após escritas bem-sucedidas
+    (métodos de escrita com status < 400) de usuários autenticados.
+    """
+    if (request.method in METODOS_ESCRITA and response.status_code < 400
+            and current_user.is_authenticated):
+        session[VERSAO_SESSAO] = session.get(VERSAO_SESSAO, 0) + 1
+        get_user_cache().invalidate(current_user.id)
+    return response
+
+
+def init_app(app):
+    """
+    Cria o cache por usuário e registra a invalidação após escritas.
+    """
+    app.extensions['user_cache'] = UserCache(
+        ttl=app.config['USER_CACHE_TTL'],
+        max_entries=app.config['USER_CACHE_MAX_ENTRIES'])
+    app.after_request(bump_version)
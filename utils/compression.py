@@ -0,0 +1,123 @@
+# utils/compression.py
+
+import gzip
+import threading
+
+from flask import current_app, jsonify, request
+from flask_login import login_required
+from routes.usuario_routes import admin_required
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+class CompressionStats:
+    """
+    Contadores (por processo) de respostas comprimidas e respostas 304,
+    usados para medir os bytes economizados pelo middleware.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.compressed_responses = 0
+        self.not_modified_responses = 0
+        self.bytes_original = 0
+        self.bytes_sent = 0
+
+    def record_compressed(self, original_size, compressed_size):
+        with self._lock:
+            self.compressed_responses += 1
+            self.bytes_original += original_size
+            self.bytes_sent += compressed_size
+
+    def record_not_modified(self, original_size):
+        with self._lock:
+            self.not_modified_responses += 1
+            self.bytes_original += original_size
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                'compressed_responses': self.compressed_responses,
+                'not_modified_responses': self.not_modified_responses,
+                'bytes_original': self.bytes_original,
+                'bytes_sent': self.bytes_sent,
+                'bytes_saved': self.bytes_original - self.bytes_sent,
+            }
+
+
+def _choose_encoding():
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(data, encoding):
+    config = current_app.config
+    if encoding == 'br':
+        return brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY'])
+    return gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'])
+
+
+def compress_response(response):
+    """
+    Calcula um ETag fraco para páginas GET (respondendo 304 quando o conteúdo
+    não mudou) e comprime as respostas maiores que COMPRESS_MIN_SIZE.
+    Respostas em streaming, arquivos enviados diretamente e respostas já
+    codificadas não são alteradas.
+    """
+    config = current_app.config
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in config['COMPRESS_MIMETYPES']):
+        return response
+
+    stats = current_app.extensions['compression_stats']
+    data = response.get_data()
+
+    if request.method in ('GET', 'HEAD'):
+        response.add_etag(weak=True)
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.make_conditional(request)
+        if response.status_code == 304:
+            stats.record_not_modified(len(data))
+            return response
+
+    response.vary.add('Accept-Encoding')
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encoding = _choose_encoding()
+    if encoding is None:
+        return response
+
+    compressed = _compress(data, encoding)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    stats.record_compressed(len(data), len(compressed))
+    return response
+
+
+@login_required
+@admin_required
+def compression_metrics():
+    """
+    Retorna em JSON as métricas de compressão do processo atual.
+    """
+    return jsonify(current_app.extensions['compression_stats'].as_dict())
+
+
+def init_app(app):
+    """
+    Registra o middleware de compressão/ETag e a rota de métricas.
+    """
+    app.extensions['compression_stats'] = CompressionStats()
+    app.after_request(compress_response)
+    app.add_url_rule('/metricas/compressao', 'compression_metrics',
+                     compression_metrics)
@@ -0,0 +1,62 @@
+# utils/fragments.py
+
+from flask import make_response, redirect, render_template, request
+
+FRAGMENT_HEADER = 'X-Fragment'
+ROW_HEADER = 'X-Fragment-Row'
+
+
+def wants_fragment():
+    """
+    Indica se a requisição foi feita pelo static/js/main.js e espera apenas
+    um fragmento de HTML em vez da página completa.
+    """
+    return request.headers.get(FRAGMENT_HEADER) == '1'
+
+
+def messages_fragment(status=200):
+    """
+    Renderiza apenas o bloco de mensagens (flash), para ser trocado na página
+    pelo JavaScript sem recarregá-la.
+    """
+    return make_response(render_template('includes/_messages.html'), status)
+
+
+def redirect_or_fragment(url):
+    """
+    Em requisições de fragmento responde 204 com o destino no cabeçalho
+    X-Redirect (o main.js navega para ele); caso contrário, redireciona.
+    """
+    if wants_fragment():
+        response = make_response('', 204)
+        response.headers['X-Redirect'] = url
+        return response
+    return redirect(url)
+
+
+def row_fragment(row_id, template=None, status=200, redirect_url=None, **context):
+    """
+    Responde com o bloco de mensagens seguido da linha da tabela renderizada
+    por 'template' (sem template, a linha foi excluída). O cabeçalho
+    X-Fragment-Row indica o id da linha que o main.js troca, insere no topo
+    ou remove da listagem; X-Redirect é seguido quando a listagem não está
+    aberta.
+    """
+    html = render_template('includes/_messages.html')
+    if template:
+        html += render_template(template, **context)
+    response = make_response(html, status)
+    response.headers[ROW_HEADER] = row_id
+    if redirect_url:
+        response.headers['X-Redirect'] = redirect_url
+    return response
+
+
+def redirect_or_row(url, row_id, template, **context):
+    """
+    Em requisições de fragmento devolve a linha alterada (row_fragment), com
+    'url' como destino alternativo; caso contrário, redireciona para 'url'.
+    """
+    if wants_fragment():
+        return row_fragment(row_id, template, redirect_url=url, **context)
+    return redirect(url)
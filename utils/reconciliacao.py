@@ -0,0 +1,39 @@
+# utils/reconciliacao.py
+
+import click
+from flask.cli import AppGroup
+
+from models.reconciliacao_model import Reconciliacao
+
+contas_cli = AppGroup('contas', help='Manutenção das contas bancárias.')
+
+
+@contas_cli.command('reconcile')
+@click.option('--reparar', is_flag=True,
+              help='Grava o saldo recalculado nas contas divergentes.')
+@click.option('--completo', is_flag=True,
+              help='Verifica todas as contas, e não apenas as alteradas desde a última execução.')
+def reconcile_command(reparar, completo):
+    """Confere saldo_atual com saldo_inicial + movimentos de cada conta."""
+    execucao, divergencias = Reconciliacao.executar(
+        reparar=reparar, completa=completo)
+
+    for d in divergencias:
+        click.echo(
+            f"Conta {d.conta_bancaria_id} ({d.banco}, usuário {d.user_id}): "
+            f"registrado {d.saldo_registrado:.2f}, calculado {d.saldo_calculado:.2f}, "
+            f"diferença {d.diferenca:.2f}")
+
+    modo = 'completa' if execucao.completa else 'incremental'
+    click.echo(
+        f"Reconciliação {modo}: {execucao.contas_verificadas} contas verificadas, "
+        f"{execucao.divergencias} divergentes, {execucao.reparadas} reparadas.")
+    if divergencias and not reparar:
+        raise SystemExit(1)
+
+
+def init_app(app):
+    """
+    Registra o comando 'flask contas reconcile'.
+    """
+    app.cli.add_command(contas_cli)
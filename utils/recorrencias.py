@@ -0,0 +1,27 @@
+# utils/recorrencias.py
+
+import click
+from flask.cli import AppGroup
+
+from models.recorrencia_model import RecorrenciaBancaria
+
+recorrencias_cli = AppGroup('recorrencias', help='Movimentos bancários recorrentes.')
+
+
+@recorrencias_cli.command('gerar')
+@click.option('--ate', type=click.DateTime(formats=['%Y-%m-%d']),
+              help='Lança as ocorrências vencidas até esta data (AAAA-MM-DD; padrão: hoje).')
+def gerar_command(ate):
+    """Lança as ocorrências vencidas de todas as recorrências ativas."""
+    movimentos, contas, recorrencias = RecorrenciaBancaria.gerar(
+        ate=ate.date() if ate else None)
+    click.echo(
+        f"{movimentos} movimento(s) lançado(s) em {contas} conta(s) "
+        f"a partir de {recorrencias} recorrência(s).")
+
+
+def init_app(app):
+    """
+    Registra o comando 'flask recorrencias gerar'.
+    """
+    app.cli.add_command(recorrencias_cli)
@@ -0,0 +1,25 @@
+# utils/resumos.py
+
+import click
+from flask.cli import AppGroup
+
+from models.resumo_mensal_model import ResumoMensalCategoria
+
+resumos_cli = AppGroup('resumos', help='Resumos mensais por categoria.')
+
+
+@resumos_cli.command('atualizar')
+@click.option('--bloqueante', is_flag=True,
+              help='Atualiza sem CONCURRENTLY (mais rápido, mas bloqueia as leituras).')
+def atualizar_command(bloqueante):
+    """Recalcula a visão materializada resumo_mensal_categoria."""
+    ResumoMensalCategoria.refresh(concurrently=not bloqueante)
+    click.echo(
+        f"Resumo mensal por categoria atualizado em {ResumoMensalCategoria.get_atualizado_em():%d/%m/%Y %H:%M:%S}.")
+
+
+def init_app(app):
+    """
+    Registra o comando 'flask resumos atualizar'.
+    """
+    app.cli.add_command(resumos_cli)
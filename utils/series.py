@@ -0,0 +1,40 @@
+# utils/series.py
+
+import numpy as np
+
+
+def lttb(x, y, pontos):
+    """
+    Reduz a série (x, y) a 'pontos' pontos pelo algoritmo
+    Largest-Triangle-Three-Buckets: mantém o primeiro e o último ponto e, de
+    cada faixa intermediária, o ponto que forma o maior triângulo com o ponto
+    escolhido na faixa anterior e a média da faixa seguinte. Preserva picos
+    e vales, ao contrário de uma média ou amostragem fixa.
+    Retorna os índices dos pontos mantidos.
+    """
+    n = len(x)
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    faixa = (n - 2) / (pontos - 2)
+
+    indices = np.empty(pontos, dtype=np.int64)
+    indices[0] = 0
+    a = 0
+    for i in range(pontos - 2):
+        inicio = int(i * faixa) + 1
+        fim = int((i + 1) * faixa) + 1
+        prox_inicio = fim
+        prox_fim = min(int((i + 2) * faixa) + 1, n)
+
+        media_x = x[prox_inicio:prox_fim].mean()
+        media_y = y[prox_inicio:prox_fim].mean()
+
+        areas = np.abs((x[a] - media_x) * (y[inicio:fim] - y[a])
+                       - (x[a] - x[inicio:fim]) * (media_y - y[a]))
+        a = inicio + int(areas.argmax())
+        indices[i + 1] = a
+    indices[-1] = n - 1
+    return indices
@@ -0,0 +1,58 @@
+# utils/streaming.py
+
+import csv
+import itertools
+
+from flask import Response, get_flashed_messages, stream_template, stream_with_context
+
+
+def peek(iterable):
+    """
+    Indica se o iterável tem algum item sem perder o primeiro elemento.
+    Retorna (tem_itens, iterador) — o iterador devolvido deve ser usado no
+    lugar do original.
+    """
+    iterator = iter(iterable)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return False, iter(())
+    return True, itertools.chain((first,), iterator)
+
+
+def stream_page(template_name, **context):
+    """
+    Renderiza o template em partes, enviando o HTML ao navegador conforme as
+    linhas são lidas do banco (use com os métodos iter_* dos models).
+
+    As mensagens flash são lidas antes do início do streaming: a sessão é
+    gravada junto com os cabeçalhos, então consumi-las só durante a
+    renderização faria com que reaparecessem na próxima página.
+    """
+    get_flashed_messages(with_categories=True)
+    return stream_template(template_name, **context)
+
+
+class _LineBuffer:
+    """Destino para csv.writer que devolve a linha formatada em vez de gravá-la."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(filename, header, rows):
+    """
+    Gera uma resposta CSV (separador ';', como o Excel em pt-BR espera)
+    escrita linha a linha a partir de um iterável, sem montar o arquivo em
+    memória.
+    """
+    writer = csv.writer(_LineBuffer(), delimiter=';')
+
+    def generate():
+        yield '\ufeff' + writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = Response(stream_with_context(generate()), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
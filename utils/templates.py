@@ -0,0 +1,66 @@
+# utils/templates.py
+
+import os
+
+import click
+from flask import current_app, render_template
+from flask.cli import AppGroup
+from jinja2 import FileSystemBytecodeCache
+
+templates_cli = AppGroup('templates', help='Cache de compilação dos templates Jinja.')
+
+
+def precompile_templates(app):
+    """
+    Compila todos os templates HTML da aplicação. Com o cache de bytecode
+    ativo, o código compilado é gravado em JINJA_CACHE_DIR e reaproveitado
+    pelos demais processos. Retorna a lista de templates compilados.
+    """
+    env = app.jinja_env
+    names = env.list_templates(extensions=['html'])
+    for name in names:
+        env.get_template(name)
+    return names
+
+
+def warmup_templates(app):
+    """
+    Compila e renderiza o esqueleto de cada página (com contexto vazio),
+    para que a primeira requisição real não pague o custo de compilação.
+    Templates que dependem de variáveis obrigatórias apenas são compilados.
+    """
+    names = precompile_templates(app)
+    rendered = 0
+    with app.test_request_context():
+        for name in names:
+            try:
+                render_template(name)
+                rendered += 1
+            except Exception as e:
+                app.logger.debug(
+                    f"Aquecimento: template '{name}' apenas compilado ({e}).")
+    app.logger.info(
+        f"Aquecimento de templates: {len(names)} compilados, {rendered} renderizados.")
+
+
+@templates_cli.command('compile')
+def compile_command():
+    """Pré-compila todos os templates de templates/ para o cache de bytecode."""
+    if current_app.jinja_env.bytecode_cache is None:
+        raise click.ClickException(
+            "Cache de bytecode desativado. Defina JINJA_CACHE_DIR.")
+    names = precompile_templates(current_app)
+    click.echo(
+        f"{len(names)} templates compilados em {current_app.config['JINJA_CACHE_DIR']}.")
+
+
+def init_app(app):
+    """
+    Ativa o cache persistente de bytecode dos templates (JINJA_CACHE_DIR)
+    e registra o comando 'flask templates'.
+    """
+    cache_dir = app.config.get('JINJA_CACHE_DIR')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    app.cli.add_command(templates_cli)